@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# radix_trie.py
+
+"""Weighted radix trie (compressed trie) for ranked prefix completion.
+
+Each edge is labeled with a string, and no node without a key has just one
+child, so there are at most 2n nodes for n keys.  Each key carries a weight.
+Every node caches the top cache_k (weight, key) entries of its subtree, heaviest
+first with ties broken by key.  complete(p, k) with k <= cache_k walks down the
+trie for p and returns the cached list, so it costs O(len(p) + k) however many
+keys there are.  An insert or delete refreshes only the caches on the path from
+the root to the key.
+"""
+
+import heapq
+from itertools import islice
+
+
+class RadixTrieNode:
+
+	def __init__(self, label=""):
+		self.label = label  # string on the edge from the parent
+		self.children = {}  # first character of the child's label -> child
+		self.key = None  # the full key if a key ends at this node
+		self.weight = None
+		self.top = []  # up to cache_k (-weight, key) pairs from this subtree, sorted
+
+	def __str__(self):
+		return self.label
+
+
+class RadixTrie:
+
+	def __init__(self, cache_k=10):
+		"""Create an empty trie that caches the top cache_k completions at every node."""
+		self.cache_k = cache_k
+		self.root = RadixTrieNode()
+		self.size = 0
+
+	@classmethod
+	def from_items(cls, items, cache_k=10):
+		"""Build a trie from (key, weight) pairs, filling the caches in one postorder pass."""
+		trie = cls(cache_k)
+		for key, weight in items:
+			trie._insert(key, weight)
+		trie._refresh_subtree(trie.root)
+		return trie
+
+	def __len__(self):
+		return self.size
+
+	def _refresh(self, node):
+		"""Recompute node.top from the node's own key and its children's caches."""
+		lists = [child.top for child in node.children.values()]
+		if node.key is not None:
+			lists.append([(-node.weight, node.key)])
+		node.top = list(islice(heapq.merge(*lists), self.cache_k))
+
+	def _refresh_subtree(self, node):
+		for child in node.children.values():
+			self._refresh_subtree(child)
+		self._refresh(node)
+
+	def _insert(self, key, weight):
+		"""Insert key without refreshing caches.  Return the path of nodes from the root."""
+		node = self.root
+		path = [node]
+		rest = key
+		while rest:
+			child = node.children.get(rest[0])
+			if child is None:
+				child = RadixTrieNode(rest)
+				node.children[rest[0]] = child
+				path.append(child)
+				node = child
+				break
+			label = child.label
+			common = 0
+			limit = min(len(label), len(rest))
+			while common < limit and label[common] == rest[common]:
+				common += 1
+			if common < len(label):
+				# Split the edge: a new middle node takes over the common part.
+				middle = RadixTrieNode(label[:common])
+				node.children[rest[0]] = middle
+				child.label = label[common:]
+				middle.children[child.label[0]] = child
+				self._refresh(middle)
+				child = middle
+			path.append(child)
+			node = child
+			rest = rest[common:]
+		if node.key is None:
+			self.size += 1
+		node.key = key
+		node.weight = weight
+		return path
+
+	def insert(self, key, weight=0):
+		"""Insert key with the given weight, or change its weight if it is already present."""
+		path = self._insert(key, weight)
+		for node in reversed(path):
+			self._refresh(node)
+
+	def _path(self, key):
+		"""Return the nodes from the root to the node where key ends, or None if key is absent."""
+		node = self.root
+		path = [node]
+		rest = key
+		while rest:
+			child = node.children.get(rest[0])
+			if child is None or not rest.startswith(child.label):
+				return None
+			rest = rest[len(child.label):]
+			node = child
+			path.append(node)
+		return path if node.key is not None else None
+
+	def search(self, key):
+		"""Return the weight of key, or None if key is not present."""
+		path = self._path(key)
+		return path[-1].weight if path is not None else None
+
+	def __contains__(self, key):
+		return self._path(key) is not None
+
+	def delete(self, key):
+		"""Delete key.  Return True if it was present, False if not."""
+		path = self._path(key)
+		if path is None:
+			return False
+		node = path[-1]
+		node.key = None
+		node.weight = None
+		self.size -= 1
+		# Remove a leaf that no longer holds a key, then splice out a keyless node
+		# that is left with one child.
+		if node is not self.root and not node.children:
+			parent = path[-2]
+			del parent.children[node.label[0]]
+			path.pop()
+			node = parent
+		if node is not self.root and node.key is None and len(node.children) == 1:
+			(child,) = node.children.values()
+			child.label = node.label + child.label
+			path[-2].children[child.label[0]] = child
+			path[-1] = child
+		for node in reversed(path):
+			self._refresh(node)
+		return True
+
+	def _locate(self, prefix):
+		"""Return the highest node whose subtree holds exactly the keys starting with prefix, or None."""
+		node = self.root
+		rest = prefix
+		while rest:
+			child = node.children.get(rest[0])
+			if child is None:
+				return None
+			label = child.label
+			if rest.startswith(label):
+				rest = rest[len(label):]
+			elif label.startswith(rest):
+				rest = ""
+			else:
+				return None
+			node = child
+		return node
+
+	def complete(self, prefix, k=None):
+		"""Return up to k (key, weight) pairs for the keys starting with prefix, heaviest first.
+
+		Arguments:
+		prefix -- string that every returned key starts with
+		k -- number of completions wanted; defaults to cache_k.  With k <= cache_k the
+		     answer comes straight from the cache, otherwise the subtree is searched.
+		"""
+		if k is None:
+			k = self.cache_k
+		node = self._locate(prefix)
+		if node is None or k <= 0:
+			return []
+		if k <= self.cache_k:
+			best = node.top[:k]
+		else:
+			best = heapq.nsmallest(k, ((-weight, key) for key, weight in self._items(node)))
+		return [(key, -negative) for negative, key in best]
+
+	def _items(self, node):
+		"""Generate the (key, weight) pairs in node's subtree in key order."""
+		if node.key is not None:
+			yield node.key, node.weight
+		for first in sorted(node.children):
+			yield from self._items(node.children[first])
+
+	def items(self):
+		"""Generate every (key, weight) pair in key order."""
+		return self._items(self.root)
+
+	def count_nodes(self):
+		count = 0
+		stack = [self.root]
+		while stack:
+			node = stack.pop()
+			count += 1
+			stack.extend(node.children.values())
+		return count
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time
+
+	words = {"romane": 5, "romanus": 3, "romulus": 8, "rubens": 2, "ruber": 7, "rubicon": 1, "rubicundus": 4, "rom": 6}
+	trie = RadixTrie.from_items(words.items(), cache_k=3)
+	print(trie.complete("r"))  # [('romulus', 8), ('ruber', 7), ('rom', 6)]
+	print(trie.complete("rub", 10))  # all four rub- words, heaviest first
+	print(trie.complete("romx"))  # []
+	trie.insert("rubicon", 9)
+	trie.delete("romulus")
+	print(trie.complete("r"))  # [('rubicon', 9), ('ruber', 7), ('rom', 6)]
+	print(len(trie), trie.count_nodes(), "nodes")
+
+	# Random keys against a brute-force ranking.
+	random.seed(12)
+	reference = {}
+	trie = RadixTrie(cache_k=5)
+	for step in range(4000):
+		key = "".join(random.choice("abc") for _ in range(random.randint(0, 6)))
+		if random.random() < 0.7:
+			weight = random.randrange(20)
+			trie.insert(key, weight)
+			reference[key] = weight
+		else:
+			assert trie.delete(key) == (key in reference)
+			reference.pop(key, None)
+		prefix = key[:random.randint(0, len(key))]
+		for k in [3, 8]:
+			expected = sorted(((-w, s) for s, w in reference.items() if s.startswith(prefix)))[:k]
+			assert trie.complete(prefix, k) == [(s, -w) for w, s in expected]
+	assert list(trie.items()) == sorted(reference.items())
+	print("random insert/delete/complete checks passed;", len(trie), "keys")
+
+	# Keystroke cost does not grow with the number of keys.
+	for n in [10000, 100000]:
+		keys = {"".join(random.choice("abcdefghij") for _ in range(12)): random.random() for _ in range(n)}
+		trie = RadixTrie.from_items(keys.items(), cache_k=10)
+		start = time.perf_counter()
+		for _ in range(10000):
+			trie.complete("abc")
+		print("%d keys: %.2f us per completion" % (n, (time.perf_counter() - start) / 10000 * 1e6))
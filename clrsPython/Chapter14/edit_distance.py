@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# edit_distance.py
+
+"""Edit (Levenshtein) distance and fuzzy lookup of strings by edit distance.
+
+edit_distance is the textbook dynamic program, kept to two rows of the table.
+myers_edit_distance computes the same value with Myers' bit-parallel algorithm,
+in the form Hyyro gave for whole-string (global) distance.  It stores one column
+of the table as bit vectors of vertical +1/-1 differences, so each character of
+the text costs a few word operations on integers of len(pattern) bits.  Python
+integers have unbounded length, so patterns of any length work.  Given
+max_distance, it stops as soon as the distance must exceed that bound.
+
+NgramIndex finds the strings within a given edit distance of a query.  It pads
+each indexed string and takes its q-grams, and an inverted index maps each q-gram
+to the strings containing it.  One edit destroys at most q of the query's q-grams.
+So a string within distance k shares at least (distinct query q-grams - q*k) of
+them with the query, and only strings that pass this count (and a length filter)
+are verified with myers_edit_distance.
+"""
+
+
+def edit_distance(X, Y):
+	"""Return the minimum number of single-character insertions, deletions and
+	substitutions that turn sequence X into sequence Y.  Takes O(mn) time and O(n) space."""
+	previous = list(range(len(Y) + 1))
+	for i in range(1, len(X) + 1):
+		current = [i] + [0] * len(Y)
+		for j in range(1, len(Y) + 1):
+			if X[i-1] == Y[j-1]:
+				current[j] = previous[j-1]
+			else:
+				current[j] = 1 + min(previous[j-1], previous[j], current[j-1])
+		previous = current
+	return previous[len(Y)]
+
+
+def pattern_masks(pattern):
+	"""Return a dictionary mapping each character of pattern to the bit mask of its positions."""
+	peq = {}
+	bit = 1
+	for c in pattern:
+		peq[c] = peq.get(c, 0) | bit
+		bit <<= 1
+	return peq
+
+
+def myers_edit_distance(pattern, text, max_distance=None, peq=None):
+	"""Compute the edit distance between pattern and text with bit-parallel operations.
+
+	Arguments:
+	pattern -- a string or sequence of hashable items
+	text -- another string or sequence
+	max_distance -- if given, return None as soon as the distance must exceed it
+	peq -- pattern_masks(pattern), if already computed for repeated calls
+
+	Returns:
+	The edit distance, or None if it exceeds max_distance.
+	"""
+	m = len(pattern)
+	n = len(text)
+	if max_distance is not None and abs(m - n) > max_distance:
+		return None
+	if m == 0:
+		return n
+	if peq is None:
+		peq = pattern_masks(pattern)
+	mask = (1 << m) - 1
+	high = 1 << (m - 1)
+	pv = mask  # vertical differences of the current column: +1 ...
+	mv = 0     # ... and -1
+	score = m  # bottom entry of the current column
+	remaining = n
+	for c in text:
+		eq = peq.get(c, 0)
+		xv = eq | mv
+		xh = ((((eq & pv) + pv) ^ pv) | eq) & mask
+		ph = (mv | ~(xh | pv)) & mask
+		mh = pv & xh
+		if ph & high:
+			score += 1
+		elif mh & high:
+			score -= 1
+		# The top row of the table grows by 1 per column, so shift in a +1.
+		ph = ((ph << 1) | 1) & mask
+		mh = (mh << 1) & mask
+		pv = (mh | ~(xv | ph)) & mask
+		mv = ph & xv
+		remaining -= 1
+		if max_distance is not None and score - remaining > max_distance:
+			return None
+	return score
+
+
+class NgramIndex:
+
+	def __init__(self, strings=(), q=3):
+		"""Index the given strings by their padded q-grams."""
+		self.q = q
+		self.strings = []
+		self.postings = {}  # q-gram -> list of indices into strings
+		self.by_length = {}  # length -> list of indices into strings
+		for s in strings:
+			self.add(s)
+
+	def grams(self, s):
+		"""Return the set of q-grams of s, padded so every character is in q of them."""
+		padded = "\x02" * (self.q - 1) + s + "\x03" * (self.q - 1)
+		return {padded[i:i + self.q] for i in range(len(padded) - self.q + 1)}
+
+	def add(self, s):
+		"""Add string s to the index and return its index."""
+		index = len(self.strings)
+		self.strings.append(s)
+		for gram in self.grams(s):
+			self.postings.setdefault(gram, []).append(index)
+		self.by_length.setdefault(len(s), []).append(index)
+		return index
+
+	def __len__(self):
+		return len(self.strings)
+
+	def candidates(self, query, max_distance):
+		"""Return the indices of strings that could be within max_distance of query."""
+		m = len(query)
+		grams = self.grams(query)
+		threshold = len(grams) - self.q * max_distance
+		if threshold <= 0:
+			# Too few q-grams to filter on; fall back to the length filter alone.
+			return [i for length in range(max(0, m - max_distance), m + max_distance + 1)
+					for i in self.by_length.get(length, ())]
+		counts = {}
+		for gram in grams:
+			for i in self.postings.get(gram, ()):
+				counts[i] = counts.get(i, 0) + 1
+		strings = self.strings
+		return [i for i, count in counts.items()
+				if count >= threshold and abs(len(strings[i]) - m) <= max_distance]
+
+	def search(self, query, max_distance=2, k=None):
+		"""Return up to k (string, distance) pairs within max_distance of query,
+		closest first and ties in string order.  k=None returns all of them."""
+		peq = pattern_masks(query)
+		matches = []
+		for i in self.candidates(query, max_distance):
+			s = self.strings[i]
+			distance = myers_edit_distance(query, s, max_distance, peq)
+			if distance is not None:
+				matches.append((distance, s))
+		matches.sort()
+		if k is not None:
+			matches = matches[:k]
+		return [(s, distance) for distance, s in matches]
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time
+
+	print(edit_distance("kitten", "sitting"), myers_edit_distance("kitten", "sitting"))  # 3 3
+	print(myers_edit_distance("kitten", "sitting", max_distance=2))  # None
+
+	random.seed(14)
+	for _ in range(3000):
+		X = "".join(random.choice("abc") for _ in range(random.randint(0, 12)))
+		Y = "".join(random.choice("abc") for _ in range(random.randint(0, 12)))
+		d = edit_distance(X, Y)
+		assert myers_edit_distance(X, Y) == d
+		for bound in range(4):
+			assert myers_edit_distance(X, Y, bound) == (d if d <= bound else None)
+	long_x = "".join(random.choice("ACGT") for _ in range(300))
+	long_y = "".join(random.choice("ACGT") for _ in range(280))
+	assert myers_edit_distance(long_x, long_y) == edit_distance(long_x, long_y)
+	print("myers_edit_distance agrees with edit_distance")
+
+	# Fuzzy lookup among many names.
+	syllables = ["ban", "ton", "ham", "wick", "stead", "ley", "bury", "field", "cross", "green", "park", "mere"]
+	names = sorted({" ".join("".join(random.choice(syllables) for _ in range(random.randint(1, 3)))
+							 for _ in range(random.randint(1, 2))) for _ in range(20000)})
+	index = NgramIndex(names)
+	queries = []
+	for _ in range(200):
+		name = list(random.choice(names))
+		for _ in range(random.randint(0, 2)):
+			name[random.randrange(len(name))] = random.choice("abcdefghijklmnopqrstuvwxyz")
+		queries.append("".join(name))
+
+	start = time.perf_counter()
+	results = [index.search(query, 2, k=5) for query in queries]
+	indexed = time.perf_counter() - start
+	start = time.perf_counter()
+	scanned = []
+	for query in queries[:5]:
+		matches = sorted((d, name) for name in names for d in [edit_distance(query, name)] if d <= 2)[:5]
+		scanned.append([(name, d) for d, name in matches])
+	scan = time.perf_counter() - start
+	assert scanned == results[:5]
+	print("%d names: %.2f ms per query with the index, %.0f ms per query scanning with edit_distance"
+		  % (len(names), indexed / len(queries) * 1000, scan / 5 * 1000))
+	print(queries[0], "->", results[0])
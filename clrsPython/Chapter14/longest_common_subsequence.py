@@ -38,6 +38,7 @@ UP = "\u2191"           # up arrow
 LEFT = "\u2190"         # left arrow
 
 import numpy as np
+from itertools import accumulate
 
 
 def lcs_length(X, Y, m, n):
@@ -100,6 +101,106 @@ def print_lcs(b, X, i, j):
 		print_lcs(b, X, i, j-1)
 
 
+def lcs_length_linear_space(X, Y):
+	"""Compute the length of an LCS of two sequences, keeping only two rows of the c table.
+
+	Arguments:
+	X -- a sequence represented as a string or list/array
+	Y -- another sequence represented as a string or list/array
+
+	Returns:
+	The length of an LCS of X and Y.  Takes O(mn) time and O(min(m, n)) space.
+	"""
+	if len(Y) > len(X):
+		X, Y = Y, X  # rows run along the shorter sequence
+	n = len(Y)
+	previous = [0] * (n + 1)
+	for i in range(1, len(X) + 1):
+		current = [0] * (n + 1)
+		x = X[i-1]
+		for j in range(1, n + 1):
+			if x == Y[j-1]:
+				current[j] = previous[j-1] + 1
+			elif previous[j] >= current[j-1]:
+				current[j] = previous[j]
+			else:
+				current[j] = current[j-1]
+		previous = current
+	return previous[n]
+
+
+def _lcs_bit_vector(X, Y):
+	"""Run the bit-parallel LCS recurrence of X against Y.
+
+	Bit j of the result is 0 exactly where the LCS length of X and Y[:j+1]
+	exceeds that of X and Y[:j], so the zero bits among the lowest j bits count
+	the LCS length of X and Y[:j].  Each element of X costs a few operations on
+	integers of len(Y) bits (Allison-Dix / Hyyro).
+	"""
+	n = len(Y)
+	match = {}  # element -> bit mask of its positions in Y
+	bit = 1
+	for y in Y:
+		match[y] = match.get(y, 0) | bit
+		bit <<= 1
+	mask = (1 << n) - 1
+	v = mask
+	for x in X:
+		u = v & match.get(x, 0)
+		v = ((v + u) | (v - u)) & mask
+	return v
+
+
+def lcs_length_bit_parallel(X, Y):
+	"""Compute the length of an LCS of two sequences with Python integers as bit vectors.
+
+	Arguments:
+	X -- a sequence represented as a string or list/array
+	Y -- another sequence represented as a string or list/array
+
+	Returns:
+	The length of an LCS of X and Y.  Takes O(m * n/w) word operations for word size w.
+	"""
+	if len(Y) > len(X):
+		X, Y = Y, X  # bit vectors run along the shorter sequence
+	v = _lcs_bit_vector(X, Y)
+	return len(Y) - bin(v).count("1")
+
+
+def lcs_row(X, Y):
+	"""Return the last row of the c table: row[j] is the LCS length of X and Y[:j], for j = 0, ..., n."""
+	n = len(Y)
+	zeros = ~_lcs_bit_vector(X, Y) & ((1 << n) - 1)
+	bits = format(zeros, "b").zfill(n)[::-1] if n > 0 else ""
+	return [0] + list(accumulate(bit == "1" for bit in bits))
+
+
+def hirschberg_lcs(X, Y):
+	"""Find an LCS of two sequences in linear space with Hirschberg's divide and conquer.
+
+	Arguments:
+	X -- a sequence represented as a string or list/array
+	Y -- another sequence represented as a string or list/array
+
+	Returns:
+	A list of the elements of an LCS of X and Y.  X is split in half, and the
+	last rows of the forward table for the first half and of the reversed table
+	for the second half give the split point of Y.  Each row is computed
+	bit-parallel.  Takes O(m + n) space beyond the recursion, which is O(lg m) deep.
+	"""
+	m = len(X)
+	n = len(Y)
+	if m == 0 or n == 0:
+		return []
+	if m == 1:
+		return [X[0]] if X[0] in Y else []
+	mid = m // 2
+	forward = lcs_row(X[:mid], Y)
+	backward = lcs_row(X[mid:][::-1], Y[::-1])
+	k = max(range(n + 1), key=lambda j: forward[j] + backward[n - j])
+	return hirschberg_lcs(X[:mid], Y[:k]) + hirschberg_lcs(X[mid:], Y[k:])
+
+
 # Testing
 if __name__ == "__main__":
 
@@ -124,3 +225,37 @@ if __name__ == "__main__":
 	c, b = lcs_length(X, Y, m, n)
 	print_lcs(b, X, m, n)  # should be GTCGTCGGAAGCCGGCCGAA
 	print()
+
+	# Linear-space and bit-parallel versions.
+	print(lcs_length_linear_space(X, Y), lcs_length_bit_parallel(X, Y))  # should be 20 20
+	print("".join(hirschberg_lcs(X, Y)))  # an LCS of length 20
+
+	import random
+	import time
+	random.seed(14)
+	for _ in range(2000):
+		X = "".join(random.choice("ABC") for _ in range(random.randint(0, 15)))
+		Y = "".join(random.choice("ABC") for _ in range(random.randint(0, 15)))
+		length = int(lcs_length(X, Y, len(X), len(Y))[0][len(X), len(Y)])
+		assert lcs_length_linear_space(X, Y) == length == lcs_length_bit_parallel(X, Y)
+		Z = hirschberg_lcs(X, Y)
+		assert len(Z) == length
+		rest = iter(X)
+		assert all(z in rest for z in Z)  # Z is a subsequence of X ...
+		rest = iter(Y)
+		assert all(z in rest for z in Z)  # ... and of Y
+	print("linear-space, bit-parallel and Hirschberg results agree with lcs_length")
+
+	# Long sequences of station ids.
+	X = [random.randrange(300) for _ in range(20000)]
+	Y = [random.randrange(300) for _ in range(20000)]
+	start = time.perf_counter()
+	length = lcs_length_bit_parallel(X, Y)
+	print("bit-parallel length %d in %.2f s" % (length, time.perf_counter() - start))
+	start = time.perf_counter()
+	Z = hirschberg_lcs(X, Y)
+	print("Hirschberg LCS of length %d in %.2f s" % (len(Z), time.perf_counter() - start))
+	X, Y = X[:2000], Y[:2000]
+	start = time.perf_counter()
+	length = lcs_length_linear_space(X, Y)
+	print("two-row length %d of 2000-element prefixes in %.2f s" % (length, time.perf_counter() - start))
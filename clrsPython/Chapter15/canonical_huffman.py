@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# canonical_huffman.py
+
+"""Canonical Huffman coding of bytes, with table-driven encoding and decoding.
+
+The Huffman tree only decides how long each byte's codeword is.  The codewords
+are then canonical: sorted by (length, byte), each one is the previous one plus
+1, shifted left when the length grows.  So the 256 code lengths alone describe
+the code, and the compressed file stores them instead of the tree.
+
+Input is read in large blocks.  The encoder looks up each byte's codeword as a
+string of '0'/'1' characters and joins a whole block at once.  It turns the
+whole bytes into output with int(bits, 2).to_bytes and carries the at most 7
+leftover bits into the next block.  The decoder never walks the tree.  A table
+indexed by the next TABLE_BITS bits of input gives every complete codeword in
+those bits at once, as decoded bytes plus the number of bits used, so one step
+yields several bytes.  Codewords longer than TABLE_BITS are rare, and they are
+decoded from the canonical limit of each length.
+
+A step depends on where the previous one ended, so the steps cannot simply be
+vectorised.  But Huffman codes resynchronise: decoding from a wrong bit position
+soon lands on a codeword boundary of the true decoding.  The decoder cuts each
+block of compressed data into segments of SEGMENT_BITS bits and starts a chain
+of steps at the start of every segment, and NumPy takes one step of every chain
+at a time.  Then it follows the true path into each segment from where it left
+the segment before, and that walk stops at the first bit the segment's own
+chain visited.  From there on the chain is the true path.  The chains do not
+always resynchronise: if every codeword has one length that does not divide
+SEGMENT_BITS, they never do.  So if a walk leaves a segment without meeting its
+chain, the rest of the block, and of the input, is decoded one step at a time,
+and the first block is kept to PROBE_SEGMENTS segments so that such input costs
+little before the decoder finds out.  The compressed file is read
+DECODE_BLOCK_SIZE bytes at a time, and the undecoded end of each block is
+carried into the next one.
+
+On Moby-Dick the chains decode about 3 times as fast as one step at a time,
+about 12 MB/s against 4 MB/s on the machine where this was measured.  On
+base64 or other input with codewords of one length, decoding runs at the speed
+of the step-at-a-time loop.
+
+File format: b"CHUF", the number of input bytes as 8 big-endian bytes, 256 code
+lengths of 1 byte each, and then the codewords, padded with 0 bits to a byte.
+"""
+
+import bisect
+import heapq
+
+import numpy as np
+
+MAGIC = b"CHUF"
+TABLE_BITS = 12  # bits resolved per decoding step; at most 16, as windows are cut from 24-bit words
+LONG_BITS = 40  # longest codeword decoded without going bit by bit
+SEGMENT_BITS = 512  # bits per segment of a decoding block, each followed by its own chain
+PROBE_SEGMENTS = 64  # segments in the first decoding block, a cheap test of whether the chains resynchronise
+BLOCK_SIZE = 1 << 20  # bytes read at a time
+# Decoding a block takes NumPy arrays of up to about 50 bytes per compressed byte, so about 12 MB.
+DECODE_BLOCK_SIZE = 1 << 18  # compressed bytes per decoding block
+
+
+def code_lengths(freq):
+	"""Return the Huffman codeword length of each byte value.
+
+	Arguments:
+	freq -- a sequence of 256 counts, freq[b] being the number of occurrences of byte b
+
+	Returns:
+	A list of 256 lengths, 0 for bytes that do not occur.  A lone byte value gets length 1.
+	"""
+	lengths = [0] * 256
+	queue = [(f, b, [b]) for b, f in enumerate(freq) if f > 0]
+	if len(queue) == 1:
+		lengths[queue[0][1]] = 1
+		return lengths
+	heapq.heapify(queue)
+	while len(queue) > 1:  # combine the two least frequent subtrees
+		f1, tie1, bytes1 = heapq.heappop(queue)
+		f2, tie2, bytes2 = heapq.heappop(queue)
+		for b in bytes1:
+			lengths[b] += 1
+		for b in bytes2:
+			lengths[b] += 1
+		heapq.heappush(queue, (f1 + f2, min(tie1, tie2), bytes1 + bytes2))
+	return lengths
+
+
+class CanonicalHuffmanCode:
+
+	def __init__(self, lengths):
+		"""Build the canonical codewords and the encoding and decoding tables for a list of 256 code lengths."""
+		self.lengths = list(lengths)
+		self.symbols = sorted((b for b in range(256) if self.lengths[b] > 0), key=lambda b: (self.lengths[b], b))
+		self.codes = [0] * 256
+		self.max_length = max(self.lengths)
+
+		# Assign canonical codewords, and record the first codeword and symbol index of each length.
+		self.first_code = [0] * (self.max_length + 2)
+		self.first_index = [0] * (self.max_length + 2)
+		self.count = [0] * (self.max_length + 2)
+		code = 0
+		length = self.lengths[self.symbols[0]] if self.symbols else 0
+		for i, b in enumerate(self.symbols):
+			code <<= self.lengths[b] - length
+			length = self.lengths[b]
+			if self.count[length] == 0:
+				self.first_code[length] = code
+				self.first_index[length] = i
+			self.count[length] += 1
+			self.codes[b] = code
+			code += 1
+
+		# Encoding table: byte -> codeword as a string of bits.
+		self.bit_strings = [format(self.codes[b], "0%db" % self.lengths[b]) if self.lengths[b] else ""
+							for b in range(256)]
+
+		# Decoding tables: first the single codeword at the start of each TABLE_BITS-bit window ...
+		size = 1 << TABLE_BITS
+		single = [None] * size
+		for b in self.symbols:
+			length = self.lengths[b]
+			if length <= TABLE_BITS:
+				low = self.codes[b] << (TABLE_BITS - length)
+				for w in range(low, low + (1 << (TABLE_BITS - length))):
+					single[w] = (b, length)
+		# ... then every complete codeword in the window, decoded left to right.
+		self.table_bytes = [b""] * size
+		self.table_bits = [0] * size  # 0 means the first codeword is longer than TABLE_BITS
+		mask = size - 1
+		for w in range(size):
+			decoded = bytearray()
+			used = 0
+			while used < TABLE_BITS:
+				entry = single[(w << used) & mask]
+				if entry is None or used + entry[1] > TABLE_BITS:
+					break
+				decoded.append(entry[0])
+				used += entry[1]
+			self.table_bytes[w] = bytes(decoded)
+			self.table_bits[w] = used
+		self.advance = np.array(self.table_bits, dtype=np.int32)
+		# The pieces a step can decode, padded with 0 bytes to the same length and stored by columns:
+		# piece w < size is table_bytes[w], and piece size + b is the byte b, for a codeword longer than
+		# TABLE_BITS.
+		pieces = self.table_bytes + [bytes((b,)) for b in range(256)]
+		width = max(map(len, pieces))
+		self.piece_length = np.array([len(piece) for piece in pieces], dtype=np.int64)
+		self.piece_columns = np.frombuffer(b"".join(piece.ljust(width, b"\0") for piece in pieces),
+										   dtype=np.uint8).reshape(len(pieces), width).T.copy()
+		# Long codewords: the LONG_BITS bits at a position start with a codeword of the least length
+		# whose canonical limit (one past its last codeword), left-justified to LONG_BITS bits, exceeds them.
+		self.limits = []
+		code = 0
+		for length in range(1, min(self.max_length, LONG_BITS) + 1):
+			code += self.count[length]
+			self.limits.append(code << (LONG_BITS - length))
+			code <<= 1
+
+	def encode_blocks(self, blocks):
+		"""Generate the compressed bytes for an iterable of input blocks (bytes),
+		padding the last byte with 0 bits."""
+		bit_strings = self.bit_strings
+		carry = ""
+		for block in blocks:
+			bits = carry + "".join(map(bit_strings.__getitem__, block))
+			whole = len(bits) & ~7
+			if whole:
+				yield int(bits[:whole], 2).to_bytes(whole >> 3, "big")
+			carry = bits[whole:]
+		if carry:
+			yield int(carry.ljust(8, "0"), 2).to_bytes(1, "big")
+
+	def _decode_long(self, data, p):
+		"""Decode the codeword starting at bit p of data from the LONG_BITS bits there, or one bit
+		at a time if it is longer than that.  Return (byte, length)."""
+		j = p >> 3
+		x = (int.from_bytes(data[j:j + 6], "big") >> (8 - (p & 7))) & ((1 << LONG_BITS) - 1)
+		length = bisect.bisect_right(self.limits, x) + 1
+		if length <= len(self.limits):
+			return self.symbols[self.first_index[length] + (x >> (LONG_BITS - length)) - self.first_code[length]], length
+		code = 0
+		for length in range(1, self.max_length + 1):
+			position = p + length - 1
+			bit = (data[position >> 3] >> (7 - (position & 7))) & 1 if position >> 3 < len(data) else 0
+			code = (code << 1) | bit
+			offset = code - self.first_code[length]
+			if self.count[length] > 0 and 0 <= offset < self.count[length]:
+				return self.symbols[self.first_index[length] + offset], length
+		raise ValueError("Invalid codeword in compressed data.")
+
+	def _step(self, word, buffer, q):
+		"""Take one decoding step from each of the bit positions in q.  Return arrays of the
+		pieces decoded and of the numbers of bits used."""
+		piece = (word[q >> 3] >> (24 - TABLE_BITS - (q & 7))) & ((1 << TABLE_BITS) - 1)
+		bits = self.advance[piece]
+		for i in np.flatnonzero(bits == 0).tolist():  # codewords longer than TABLE_BITS
+			b, bits[i] = self._decode_long(buffer, int(q[i]))
+			piece[i] = (1 << TABLE_BITS) + b
+		return piece, bits
+
+	def _walk(self, word, buffer, q, count):
+		"""Take decoding steps one at a time from bit q until one starts at or after count.
+		Return the list of pieces decoded and the bit where the next step starts."""
+		word = memoryview(word)
+		table_bits = self.table_bits
+		shift = 24 - TABLE_BITS
+		mask = (1 << TABLE_BITS) - 1
+		pieces = []
+		while q < count:
+			piece = (word[q >> 3] >> (shift - (q & 7))) & mask
+			bits = table_bits[piece]
+			if bits == 0:  # a codeword longer than TABLE_BITS
+				b, bits = self._decode_long(buffer, q)
+				piece = (1 << TABLE_BITS) + b
+			pieces.append(piece)
+			q += bits
+		return pieces, q
+
+	def _decode_block(self, buffer, p, count, chains=True):
+		"""Decode the codewords of buffer that start at bit p or at a later bit before count.
+
+		Arguments:
+		buffer -- compressed bytes, with at least lookahead bytes after bit count
+		p -- bit position in buffer of the first codeword
+		count -- bit position where this block ends
+		chains -- whether to decode with chains of steps, rather than one step at a time
+
+		Returns:
+		output -- the decoded bytes
+		p -- bit position of the first codeword at or after count
+		chains -- False if the chains failed to resynchronise, and the block was finished one step at a time
+		"""
+		# The TABLE_BITS-bit window at bit 8j + o is bits o to o + TABLE_BITS - 1 of the 24 bits from byte j.
+		# Three 0 bytes at the end give a window of 0 bits, which always starts with a short codeword.
+		wide = np.frombuffer(buffer + bytes(3), dtype=np.uint8).astype(np.int32)
+		word = (wide[:-2] << 16) | (wide[1:-1] << 8) | wide[2:]
+		starts = np.arange(p, count, SEGMENT_BITS, dtype=np.int32)
+		if not chains or len(starts) < 2:
+			pieces, p = self._walk(word, buffer, p, count)
+			return self._assemble(np.array(pieces, dtype=np.int32)), p, chains
+		idle = 8 * len(buffer)
+
+		# Start a chain of steps at the start of every segment, and follow all of them at once to
+		# the end of their segments.  Only the chain from p is sure to be on codeword boundaries.
+		# A chain that has left its segment waits on the 0 bits at idle until the others are done.
+		ends = np.minimum(starts + SEGMENT_BITS, count)
+		exits = np.empty(len(starts), dtype=np.int32)  # where each chain leaves its segment
+		positions, pieces = [], []  # per step, where each chain is (-1 once it has left) and what it decodes
+		q = starts
+		active = np.ones(len(starts), dtype=bool)
+		while True:
+			piece, bits = self._step(word, buffer, q)
+			positions.append(np.where(active, q, -1))
+			pieces.append(piece)
+			following = q + bits
+			leaving = active & (following >= ends)
+			exits[leaving] = following[leaving]
+			active &= ~leaving
+			if not active.any():
+				break
+			q = np.where(active, following, idle)
+		positions = np.stack(positions, axis=1)  # one row per chain
+		seen = np.zeros(count + 1, dtype=bool)  # the last entry takes the -1 positions
+		seen[positions] = True
+
+		# Walk from where each chain leaves its segment into the next segment, until the walk meets that
+		# segment's chain.  Steps only move forward, so from there on the chain is the true path.  If the
+		# walk leaves the segment first, the chains are not resynchronising (as with codewords all of one
+		# length that does not divide SEGMENT_BITS): the true path is known up to the first such segment,
+		# and the rest of the block is decoded one step at a time.
+		merge = np.full(len(starts), count, dtype=np.int32)  # where the walk meets each chain
+		merge[0] = p
+		lost = len(starts)  # the first segment whose walk leaves it without meeting its chain
+		walk = []  # per step of the walks, the piece decoded in each segment or -1
+		q = exits[:-1]
+		segment = np.arange(1, len(starts))
+		while segment.size:
+			inside = q < ends[segment]
+			if not inside.all():
+				exits[segment[~inside]] = q[~inside]
+				lost = min(lost, int(segment[~inside][0]))
+				keep = inside & (segment < lost)
+				q = q[keep]
+				segment = segment[keep]
+			met = seen[q]
+			if met.any():
+				merge[segment[met]] = q[met]
+				q = q[~met]
+				segment = segment[~met]
+			if not segment.size:
+				break
+			piece, bits = self._step(word, buffer, q)
+			walk.append(np.full(len(starts), -1, dtype=np.int32))
+			walk[-1][segment] = piece
+			q = q + bits
+
+		# The true path is the walk into each segment followed by the chain from where the walk meets it.
+		rows = min(lost + 1, len(starts))
+		pieces = np.stack(walk + pieces, axis=1)[:rows]
+		pieces[:, len(walk):][positions[:rows] < merge[:rows, None]] = -1
+		pieces = pieces[pieces >= 0]
+		if lost == len(starts):
+			return self._assemble(pieces), int(exits[-1]), True
+		rest, p = self._walk(word, buffer, int(exits[lost]), count)
+		return self._assemble(np.concatenate([pieces, np.array(rest, dtype=np.int32)])), p, False
+
+	def _assemble(self, pieces):
+		"""Return the bytes of an array of pieces, as numbered for _step."""
+		# Write each piece as a whole row of piece_columns, last column first: the padding written past
+		# the end of a piece is then overwritten by the pieces after it.
+		lengths = self.piece_length[pieces]
+		at = np.cumsum(lengths)
+		total = int(at[-1]) if len(at) else 0
+		at -= lengths
+		output = np.empty(total + len(self.piece_columns), dtype=np.uint8)
+		for k in range(len(self.piece_columns) - 1, -1, -1):
+			output[at + k] = self.piece_columns[k][pieces]
+		return output[:total].tobytes()
+
+	def decode(self, data, n, block_size=DECODE_BLOCK_SIZE):
+		"""Generate the decoded output, in pieces, of the first n bytes encoded in data.
+
+		Arguments:
+		data -- the compressed bytes, or an iterable of blocks of them, such as reads from a file
+		n -- number of bytes to decode
+		block_size -- compressed bytes per decoding block, when data is a single bytes object
+		"""
+		if n == 0:
+			return
+		if len(self.symbols) == 1:  # one distinct byte, one bit per byte
+			yield bytes([self.symbols[0]]) * n
+			return
+		if isinstance(data, (bytes, bytearray, memoryview)):
+			blocks = (data[start:start + block_size] for start in range(0, len(data), block_size))
+		else:
+			blocks = iter(data)
+		lookahead = max(8, (self.max_length + 7) // 8 + 1)  # bytes read past the end of a block
+		buffer = b""  # undecoded bytes carried from the last block, then the new block
+		p = 0  # bit position in buffer
+		remaining = n
+		chains = True  # until the chains fail to resynchronise, then one step at a time to the end
+		probed = False  # whether the first PROBE_SEGMENTS segments have been decoded
+		finished = False
+		while not finished:
+			block = next(blocks, None)
+			if block is None:
+				finished = True
+				block = bytes(lookahead)
+			buffer += block
+			count = 8 * (len(buffer) - lookahead)
+			while p < count:
+				end = count if probed else min(count, p + PROBE_SEGMENTS * SEGMENT_BITS)
+				output, p, chains = self._decode_block(buffer, p, end, chains)
+				probed = True
+				if len(output) >= remaining:
+					yield output[:remaining]
+					return
+				remaining -= len(output)
+				yield output
+			buffer = buffer[p >> 3:]
+			p &= 7
+
+
+def _read_blocks(filename, block_size=BLOCK_SIZE):
+	with open(filename, "rb") as f:
+		block = f.read(block_size)
+		while block:
+			yield block
+			block = f.read(block_size)
+
+
+def compress_file(input_filename, compressed_filename, block_size=BLOCK_SIZE):
+	"""Compress a file with a canonical Huffman code for its bytes.  Reads the input twice,
+	once to count bytes and once to encode them, in blocks of block_size bytes."""
+	freq = np.zeros(256, dtype=np.int64)
+	n = 0
+	for block in _read_blocks(input_filename, block_size):
+		freq += np.bincount(np.frombuffer(block, dtype=np.uint8), minlength=256)
+		n += len(block)
+	lengths = code_lengths(freq.tolist())
+	code = CanonicalHuffmanCode(lengths)
+	with open(compressed_filename, "wb") as out:
+		out.write(MAGIC + n.to_bytes(8, "big") + bytes(lengths))
+		for piece in code.encode_blocks(_read_blocks(input_filename, block_size)):
+			out.write(piece)
+
+
+def decompress_file(compressed_filename, decompressed_filename):
+	"""Decompress a file written by compress_file."""
+	with open(compressed_filename, "rb") as f, open(decompressed_filename, "wb") as out:
+		header = f.read(268)
+		if header[:4] != MAGIC:
+			raise ValueError("Not a canonical Huffman file.")
+		n = int.from_bytes(header[4:12], "big")
+		code = CanonicalHuffmanCode(header[12:268])
+		for piece in code.decode(iter(lambda: f.read(DECODE_BLOCK_SIZE), b""), n):
+			out.write(piece)
+
+
+# Testing
+if __name__ == "__main__":
+
+	import filecmp
+	import os
+	import random
+	import time
+
+	from huffman import HuffmanTree
+
+	print(code_lengths([45, 13, 12, 16, 9, 5] + [0] * 250)[:6])  # textbook example: 1, 3, 3, 3, 4, 4
+
+	# Round trips on random data, including long codewords from skewed counts.
+	random.seed(15)
+	for trial in range(200):
+		n = random.choice([0, 1, 2, 10, 1000, 5000])
+		weights = [random.choice([1, 2, 2 ** random.randint(0, 25)]) for _ in range(256)]
+		data = bytes(random.choices(range(256), weights=weights, k=n))
+		freq = [data.count(b) for b in range(256)]
+		code = CanonicalHuffmanCode(code_lengths(freq))
+		blocks = [data[i:i + 333] for i in range(0, len(data), 333)]
+		encoded = b"".join(code.encode_blocks(blocks))
+		assert b"".join(code.decode(encoded, len(data), block_size=97)) == data
+	print("random round trips passed")
+
+	# Throughput on Moby-Dick, against HuffmanTree.
+	directory = os.path.dirname(os.path.abspath(__file__))
+	original = os.path.join(directory, "moby-dick.txt")
+	compressed = os.path.join(directory, "moby-dick_canonical.huf")
+	decompressed = os.path.join(directory, "moby-dick_canonical_decompressed.txt")
+	size = os.path.getsize(original)
+	start = time.perf_counter()
+	compress_file(original, compressed)
+	compress_time = time.perf_counter() - start
+	start = time.perf_counter()
+	decompress_file(compressed, decompressed)
+	decompress_time = time.perf_counter() - start
+	print("%.1f MB -> %.1f MB; compress %.2f s (%.0f MB/s), decompress %.2f s (%.0f MB/s), identical: %s"
+		  % (size / 1e6, os.path.getsize(compressed) / 1e6, compress_time, size / 1e6 / compress_time,
+			 decompress_time, size / 1e6 / decompress_time, filecmp.cmp(original, decompressed, shallow=False)))
+
+	start = time.perf_counter()
+	tree = HuffmanTree(original, os.path.join(directory, "moby-dick_compressed.txt"),
+					   os.path.join(directory, "moby-dick_decompressed.txt"))
+	tree.compress()
+	tree_compress = time.perf_counter() - start
+	start = time.perf_counter()
+	tree.decompress()
+	print("HuffmanTree: compress %.2f s, decompress %.2f s" % (tree_compress, time.perf_counter() - start))
+	for name in [compressed, decompressed, "moby-dick_compressed.txt", "moby-dick_decompressed.txt"]:
+		os.remove(os.path.join(directory, name))
+
+	# Codewords all of one length, 6 bits for base64 and 7 bits for 128 equally likely bytes: the chains
+	# never resynchronise, and decoding goes one step at a time.
+	import base64
+	for label, data in [("base64, 6-bit codes", base64.b64encode(random.randbytes(150000))),
+						("128 byte values, 7-bit codes", bytes(random.choices(range(128), k=1 << 20)))]:
+		original = os.path.join(directory, "fixed_length.bin")
+		with open(original, "wb") as f:
+			f.write(data)
+		start = time.perf_counter()
+		compress_file(original, compressed)
+		compress_time = time.perf_counter() - start
+		start = time.perf_counter()
+		decompress_file(compressed, decompressed)
+		decompress_time = time.perf_counter() - start
+		print("%s: %.1f MB; compress %.2f s, decompress %.2f s (%.1f MB/s), identical: %s"
+			  % (label, len(data) / 1e6, compress_time, decompress_time, len(data) / 1e6 / decompress_time,
+				 filecmp.cmp(original, decompressed, shallow=False)))
+		for name in [original, compressed, decompressed]:
+			os.remove(name)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# b_plus_tree.py
+
+"""B+-tree: a B-tree variant that keeps every key in the leaves.
+
+Internal nodes hold only separator keys that guide searches.  The leaves hold
+the keys and their values in sorted order, and each leaf links to the next, so
+an ordered scan finds its first leaf in O(log_t n) and then follows the links.
+With minimum degree t, every node except the root has t-1 to 2t-1 keys (leaves)
+or t to 2t children (internal nodes), as in BTree.  Searching within a node uses
+binary search.
+
+bulk_load builds a tree bottom-up from sorted input in O(n): it packs the leaves
+left to right, then builds each level of internal nodes over the one below.
+Inserting n keys one at a time costs O(n log_t n) with node splits along the way.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class BPlusTreeLeaf:
+
+	def __init__(self, keys=None, values=None):
+		self.keys = keys if keys is not None else []
+		self.values = values if values is not None else []
+		self.next = None  # next leaf in key order
+
+	def __str__(self):
+		return str(self.keys)
+
+
+class BPlusTreeInternal:
+
+	def __init__(self, keys=None, children=None):
+		self.keys = keys if keys is not None else []  # keys[i] <= every key in children[i+1]
+		self.children = children if children is not None else []
+
+	def __str__(self):
+		return str(self.keys)
+
+
+class BPlusTree:
+
+	def __init__(self, t=64):
+		"""Create an empty B+-tree with minimum degree t >= 2."""
+		if t < 2:
+			raise ValueError("The minimum degree must be at least 2.")
+		self.t = t
+		self.max_keys = 2 * t - 1
+		self.root = BPlusTreeLeaf()
+		self.size = 0
+
+	@classmethod
+	def bulk_load(cls, items, t=64):
+		"""Build a B+-tree from (key, value) pairs sorted by strictly increasing key.
+
+		Leaves are filled to 2t-1 keys, except that the last two leaves (and the last
+		two nodes of each internal level) share their keys evenly so that neither is
+		underfull.
+		"""
+		tree = cls(t)
+		leaves = []
+		keys, values = [], []
+		previous = None
+		for key, value in items:
+			if leaves or keys:
+				if not previous < key:
+					raise ValueError("bulk_load needs keys in strictly increasing order.")
+			previous = key
+			keys.append(key)
+			values.append(value)
+			if len(keys) == tree.max_keys:
+				leaves.append(BPlusTreeLeaf(keys, values))
+				keys, values = [], []
+		if keys:
+			leaves.append(BPlusTreeLeaf(keys, values))
+		if not leaves:
+			return tree
+		if len(leaves) > 1 and len(leaves[-1].keys) < t - 1:
+			left, right = leaves[-2], leaves[-1]
+			keys, values = left.keys + right.keys, left.values + right.values
+			half = len(keys) // 2
+			left.keys, left.values = keys[:half], values[:half]
+			right.keys, right.values = keys[half:], values[half:]
+		for left, right in zip(leaves, leaves[1:]):
+			left.next = right
+		tree.size = sum(len(leaf.keys) for leaf in leaves)
+
+		# Build internal levels: each entry is (node, smallest key in its subtree).
+		level = [(leaf, leaf.keys[0]) for leaf in leaves]
+		max_children = 2 * t
+		while len(level) > 1:
+			groups = [level[i:i + max_children] for i in range(0, len(level), max_children)]
+			if len(groups) > 1 and len(groups[-1]) < t:
+				merged = groups[-2] + groups[-1]
+				half = len(merged) // 2
+				groups[-2:] = [merged[:half], merged[half:]]
+			level = [(BPlusTreeInternal([low for _, low in group[1:]], [node for node, _ in group]), group[0][1])
+					 for group in groups]
+		tree.root = level[0][0]
+		return tree
+
+	def __len__(self):
+		return self.size
+
+	def _find_leaf(self, k):
+		"""Return the leaf whose key range contains k."""
+		node = self.root
+		while isinstance(node, BPlusTreeInternal):
+			node = node.children[bisect_right(node.keys, k)]
+		return node
+
+	def search(self, k, default=None):
+		"""Return the value stored with key k, or default if k is not present."""
+		leaf = self._find_leaf(k)
+		i = bisect_left(leaf.keys, k)
+		if i < len(leaf.keys) and leaf.keys[i] == k:
+			return leaf.values[i]
+		return default
+
+	def __contains__(self, k):
+		leaf = self._find_leaf(k)
+		i = bisect_left(leaf.keys, k)
+		return i < len(leaf.keys) and leaf.keys[i] == k
+
+	def insert(self, k, value=None):
+		"""Insert key k with a value, replacing the value if k is already present."""
+		split = self._insert(self.root, k, value)
+		if split is not None:
+			separator, right = split
+			self.root = BPlusTreeInternal([separator], [self.root, right])
+
+	def _insert(self, node, k, value):
+		"""Insert into the subtree rooted at node; return (separator, new right node) if node split."""
+		if isinstance(node, BPlusTreeLeaf):
+			i = bisect_left(node.keys, k)
+			if i < len(node.keys) and node.keys[i] == k:
+				node.values[i] = value
+				return None
+			node.keys.insert(i, k)
+			node.values.insert(i, value)
+			self.size += 1
+			if len(node.keys) <= self.max_keys:
+				return None
+			right = BPlusTreeLeaf(node.keys[self.t:], node.values[self.t:])
+			del node.keys[self.t:]
+			del node.values[self.t:]
+			right.next = node.next
+			node.next = right
+			return right.keys[0], right
+
+		i = bisect_right(node.keys, k)
+		split = self._insert(node.children[i], k, value)
+		if split is None:
+			return None
+		separator, child = split
+		node.keys.insert(i, separator)
+		node.children.insert(i + 1, child)
+		if len(node.children) <= 2 * self.t:
+			return None
+		# 2t+1 children: keep t, move t+1 to the right, and push the middle key up.
+		up = node.keys[self.t - 1]
+		right = BPlusTreeInternal(node.keys[self.t:], node.children[self.t:])
+		del node.keys[self.t - 1:]
+		del node.children[self.t:]
+		return up, right
+
+	def delete(self, k):
+		"""Delete key k.  Return True if it was present, False if not."""
+		deleted = self._delete(self.root, k)
+		if isinstance(self.root, BPlusTreeInternal) and len(self.root.children) == 1:
+			self.root = self.root.children[0]
+		return deleted
+
+	def _delete(self, node, k):
+		"""Delete k from the subtree rooted at node, leaving node possibly underfull."""
+		if isinstance(node, BPlusTreeLeaf):
+			i = bisect_left(node.keys, k)
+			if i == len(node.keys) or node.keys[i] != k:
+				return False
+			del node.keys[i]
+			del node.values[i]
+			self.size -= 1
+			return True
+		i = bisect_right(node.keys, k)
+		child = node.children[i]
+		deleted = self._delete(child, k)
+		if deleted:
+			if isinstance(child, BPlusTreeLeaf):
+				if len(child.keys) < self.t - 1:
+					self._fix_leaf(node, i)
+			elif len(child.children) < self.t:
+				self._fix_internal(node, i)
+		return deleted
+
+	def _fix_leaf(self, parent, i):
+		"""Refill the underfull leaf parent.children[i] from a sibling, or merge it with one."""
+		child = parent.children[i]
+		left = parent.children[i - 1] if i > 0 else None
+		right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+		if left is not None and len(left.keys) >= self.t:
+			child.keys.insert(0, left.keys.pop())
+			child.values.insert(0, left.values.pop())
+			parent.keys[i - 1] = child.keys[0]
+		elif right is not None and len(right.keys) >= self.t:
+			child.keys.append(right.keys.pop(0))
+			child.values.append(right.values.pop(0))
+			parent.keys[i] = right.keys[0]
+		elif left is not None:  # merge child into left
+			left.keys += child.keys
+			left.values += child.values
+			left.next = child.next
+			del parent.keys[i - 1]
+			del parent.children[i]
+		else:  # merge right into child
+			child.keys += right.keys
+			child.values += right.values
+			child.next = right.next
+			del parent.keys[i]
+			del parent.children[i + 1]
+
+	def _fix_internal(self, parent, i):
+		"""Refill the underfull internal node parent.children[i] from a sibling, or merge it with one."""
+		child = parent.children[i]
+		left = parent.children[i - 1] if i > 0 else None
+		right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+		if left is not None and len(left.children) > self.t:
+			child.keys.insert(0, parent.keys[i - 1])
+			child.children.insert(0, left.children.pop())
+			parent.keys[i - 1] = left.keys.pop()
+		elif right is not None and len(right.children) > self.t:
+			child.keys.append(parent.keys[i])
+			child.children.append(right.children.pop(0))
+			parent.keys[i] = right.keys.pop(0)
+		elif left is not None:  # merge child into left, pulling the separator down
+			left.keys += [parent.keys[i - 1]] + child.keys
+			left.children += child.children
+			del parent.keys[i - 1]
+			del parent.children[i]
+		else:  # merge right into child
+			child.keys += [parent.keys[i]] + right.keys
+			child.children += right.children
+			del parent.keys[i]
+			del parent.children[i + 1]
+
+	def range(self, lo=None, hi=None):
+		"""Generate the (key, value) pairs with lo <= key < hi in key order.
+		lo=None starts at the smallest key; hi=None runs to the largest."""
+		if lo is None:
+			leaf = self.root
+			while isinstance(leaf, BPlusTreeInternal):
+				leaf = leaf.children[0]
+			i = 0
+		else:
+			leaf = self._find_leaf(lo)
+			i = bisect_left(leaf.keys, lo)
+		while leaf is not None:
+			keys, values = leaf.keys, leaf.values
+			if hi is not None and keys and keys[-1] >= hi:
+				for j in range(i, bisect_left(keys, hi)):
+					yield keys[j], values[j]
+				return
+			for j in range(i, len(keys)):
+				yield keys[j], values[j]
+			leaf = leaf.next
+			i = 0
+
+	def prefix(self, p):
+		"""Generate the (key, value) pairs whose key starts with p, in key order.
+		Works for str and bytes keys, and for tuple keys with a tuple prefix."""
+		length = len(p)
+		for key, value in self.range(p):
+			if key[:length] != p:
+				return
+			yield key, value
+
+	def items(self):
+		"""Generate every (key, value) pair in key order."""
+		return self.range()
+
+	def height(self):
+		"""Return the number of levels."""
+		levels = 1
+		node = self.root
+		while isinstance(node, BPlusTreeInternal):
+			node = node.children[0]
+			levels += 1
+		return levels
+
+	def is_b_plus_tree(self):
+		"""Return True if node sizes, key order, separators, leaf depths and leaf links are all valid."""
+		leaves = []
+
+		def check(node, lo, hi, depth, is_root):
+			if isinstance(node, BPlusTreeLeaf):
+				if not is_root and not self.t - 1 <= len(node.keys) <= self.max_keys:
+					return False
+				if len(node.keys) != len(node.values):
+					return False
+				if any(a >= b for a, b in zip(node.keys, node.keys[1:])):
+					return False
+				if node.keys and ((lo is not None and node.keys[0] < lo) or (hi is not None and node.keys[-1] >= hi)):
+					return False
+				leaves.append((node, depth))
+				return True
+			if len(node.children) != len(node.keys) + 1:
+				return False
+			if not (2 if is_root else self.t) <= len(node.children) <= 2 * self.t:
+				return False
+			bounds = [lo] + node.keys + [hi]
+			return all(check(child, bounds[j], bounds[j + 1], depth + 1, False) for j, child in enumerate(node.children))
+
+		if not check(self.root, None, None, 0, True):
+			return False
+		if len({depth for _, depth in leaves}) > 1:
+			return False
+		return all(a.next is b for (a, _), (b, _) in zip(leaves, leaves[1:] + [(None, 0)]))
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time as timer
+
+	# Random inserts and deletes against a dict.
+	random.seed(1828)
+	for t in [2, 3, 8]:
+		tree = BPlusTree(t)
+		reference = {}
+		for step in range(3000):
+			k = random.randrange(500)
+			if random.random() < 0.6:
+				tree.insert(k, -k)
+				reference[k] = -k
+			else:
+				assert tree.delete(k) == (k in reference)
+				reference.pop(k, None)
+			if step % 100 == 0:
+				assert tree.is_b_plus_tree()
+		assert list(tree.items()) == sorted(reference.items()) and len(tree) == len(reference)
+		assert list(tree.range(100, 200)) == [(k, v) for k, v in sorted(reference.items()) if 100 <= k < 200]
+		print("t = %d: %d keys, height %d, valid %s" % (t, len(tree), tree.height(), tree.is_b_plus_tree()))
+
+	# Bulk loading versus single inserts, time-ordered journey events.
+	n = 300000
+	events = sorted((random.randrange(86400), j) for j in range(n))
+	start = timer.perf_counter()
+	bulk = BPlusTree.bulk_load(((event, "journey %d" % event[1]) for event in events), t=64)
+	bulk_time = timer.perf_counter() - start
+	shuffled = list(events)
+	random.shuffle(shuffled)
+	start = timer.perf_counter()
+	incremental = BPlusTree(64)
+	for event in shuffled:
+		incremental.insert(event, "journey %d" % event[1])
+	insert_time = timer.perf_counter() - start
+	print("%d events: bulk_load %.3f s, inserts %.3f s; both valid: %s, same items: %s"
+			% (n, bulk_time, insert_time, bulk.is_b_plus_tree() and incremental.is_b_plus_tree(),
+			   list(bulk.items()) == list(incremental.items())))
+	start = timer.perf_counter()
+	morning = list(bulk.range((8 * 3600,), (9 * 3600,)))
+	print(len(morning), "events between 08:00 and 09:00 (%.4f s)" % (timer.perf_counter() - start))
+
+	# Prefix scans over names.
+	names = sorted({"".join(random.choice("abcdefgh") for _ in range(random.randint(3, 9))) for _ in range(50000)})
+	index = BPlusTree.bulk_load(((name, i) for i, name in enumerate(names)), t=32)
+	found = [name for name, _ in index.prefix("bad")]
+	print(found[:5], len(found) == sum(name.startswith("bad") for name in names))
@@ -132,9 +132,13 @@ class BTree:
 		"""Create an empty root node, based on B_Tree_Create."""
 		self.t = t 					# minimum degree of the B-tree
 		self.max_keys = 2 * t - 1 	# maximum degree of the B-tree
-		self.root = BTreeNode(0, self.max_keys, True)
+		self.root = self.new_node(0, True)
 		self.root.disk_write()
 
+	def new_node(self, n, leaf):
+		"""Allocate a new node with n keys, a leaf if leaf is True."""
+		return BTreeNode(n, self.max_keys, leaf)
+
 	def search(self, k):
 		"""Search for a node with key k starting at the root.
 
@@ -153,7 +157,7 @@ class BTree:
 		i -- this node is c[i] of x
 		"""
 		y = x.c[i]  # full node to split
-		z = BTreeNode(self.t - 1, self.max_keys, y.leaf)  # z will take half of y
+		z = self.new_node(self.t - 1, y.leaf)  # z will take half of y
 		z.key[: self.t - 1] = y.key[self.t: 2 * self.t - 1]  # z gets y's greatest keys
 
 		if not y.leaf:
@@ -184,7 +188,7 @@ class BTree:
 
 	def split_root(self):
 		"""Split the root of this B-tree."""
-		s = BTreeNode(0, self.max_keys, False)  # s will be the new root
+		s = self.new_node(0, False)  # s will be the new root
 		s.c[0] = self.root
 		self.root = s
 		self.split_child(s, 0)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# paged_b_tree.py
+
+"""A B-tree stored in fixed-size pages of a single file.
+
+BTree's search, insert and delete run unchanged.  Only the nodes differ: a
+PagedBTreeNode is a small handle holding a page number, and its n, leaf, key and
+c attributes are read through an LRU buffer pool that faults pages in from the
+file.  Children are stored on disk as page numbers, and c[i] returns a handle for
+the child's page, so at most the pool's worth of nodes is ever in memory.
+
+Page 0 is a header: page size, minimum degree t, key format, root page, head of
+the free-page list and the page count.  Every other page is either a node,
+serialized with struct as (leaf, n, keys, child page numbers), or a free page
+whose first 8 bytes hold the next free page.  The key and child lists of a
+cached page mark the page dirty whenever they are assigned to, so a modified
+page is written back when it is evicted or flushed, whether or not disk_write was
+called yet.  disk_write only marks a page dirty; flush and close write dirty pages
+and the header.  A lookup reads at most one page per level, so O(log_t n) pages.
+"""
+
+import os
+import struct
+from collections import OrderedDict
+
+from clrsPython.Chapter18.b_tree import BTree, BTreeNode
+
+_MAGIC = b"CLRSBTRE"
+_HEADER = struct.Struct("<8sII16sqqq")  # magic, page_size, t, key_format, root, free head, page count
+_NODE_HEADER = struct.Struct("<II")  # leaf, n
+_NEXT_FREE = struct.Struct("<q")
+
+
+class _Page:
+	"""The decoded contents of one node page while it is in the buffer pool."""
+
+	__slots__ = ("leaf", "n", "key", "c", "dirty")
+
+	def __init__(self, leaf, n, keys, children):
+		self.leaf = leaf
+		self.n = n
+		self.dirty = False
+		self.key = _KeyList(self, keys)
+		self.c = children
+
+
+class _KeyList(list):
+	"""A list of keys that marks its page dirty when assigned to."""
+
+	__slots__ = ("page",)
+
+	def __init__(self, page, keys):
+		super().__init__(keys)
+		self.page = page
+
+	def __setitem__(self, i, value):
+		self.page.dirty = True
+		super().__setitem__(i, value)
+
+
+class _ChildList:
+	"""Child page numbers of a node, read and assigned as node handles."""
+
+	__slots__ = ("tree", "page", "ids")
+
+	def __init__(self, tree, page, ids):
+		self.tree = tree
+		self.page = page
+		self.ids = ids
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self.tree.handle(page_id) for page_id in self.ids[i]]
+		return self.tree.handle(self.ids[i])
+
+	def __setitem__(self, i, value):
+		self.page.dirty = True
+		if isinstance(i, slice):
+			self.ids[i] = [-1 if node is None else node.page_id for node in value]
+		else:
+			self.ids[i] = -1 if value is None else value.page_id
+
+	def __len__(self):
+		return len(self.ids)
+
+
+class PagedBTreeNode(BTreeNode):
+
+	def __init__(self, tree, page_id):
+		"""A handle for the node stored in page page_id of tree's file."""
+		self.tree = tree
+		self.page_id = page_id
+
+	@property
+	def n(self):
+		return self.tree.fetch(self.page_id).n
+
+	@n.setter
+	def n(self, value):
+		page = self.tree.fetch(self.page_id)
+		page.n = value
+		page.dirty = True
+
+	@property
+	def leaf(self):
+		return self.tree.fetch(self.page_id).leaf
+
+	@property
+	def key(self):
+		return self.tree.fetch(self.page_id).key
+
+	@property
+	def c(self):
+		return self.tree.fetch(self.page_id).c
+
+	def disk_read(self):
+		"""Bring this node's page into the buffer pool."""
+		self.tree.fetch(self.page_id)
+
+	def disk_write(self):
+		"""Mark this node's page dirty; it is written when evicted or flushed."""
+		self.tree.fetch(self.page_id).dirty = True
+
+	def free(self):
+		"""Return this node's page to the free-page list."""
+		self.tree.free_page(self.page_id)
+
+	def __eq__(self, other):
+		return isinstance(other, PagedBTreeNode) and self.page_id == other.page_id and self.tree is other.tree
+
+	def __hash__(self):
+		return hash(self.page_id)
+
+
+class PagedBTree(BTree):
+
+	def __init__(self, path, t=None, key_format="q", page_size=4096, cache_pages=64):
+		"""Open the B-tree stored in a file, creating the file if it does not exist.
+
+		Arguments:
+		path -- the file
+		t -- minimum degree; by default the largest that fits a node in one page.
+		Ignored when opening an existing file, as are key_format and page_size.
+		key_format -- struct format of one key, e.g. "q" for 64-bit integers or "qi" for
+		(int, int) tuples; keys with more than one field are tuples
+		page_size -- bytes per page
+		cache_pages -- number of node pages the buffer pool holds (at least 8)
+		"""
+		self.cache_pages = max(8, cache_pages)
+		self.pool = OrderedDict()  # page number -> _Page, least recently used first
+		self.last_id, self.last_page = -1, None
+		self.reads = 0  # pages read from the file
+		self.writes = 0  # pages written to the file
+		exists = os.path.exists(path) and os.path.getsize(path) > 0
+		self.file = open(path, "r+b" if exists else "w+b")
+		if exists:
+			header = _HEADER.unpack(self.file.read(_HEADER.size))
+			if header[0] != _MAGIC:
+				raise ValueError("%s is not a paged B-tree file." % path)
+			page_size, t, key_format = header[1], header[2], header[3].rstrip(b"\0").decode()
+			self._root_page, self.free_head, self.page_count = header[4:]
+		self.page_size = page_size
+		self.key_format = key_format
+		key_struct = struct.Struct("<" + key_format)
+		self.key_fields = len(key_struct.unpack(bytes(key_struct.size)))
+		if t is None:
+			t = (page_size - _NODE_HEADER.size + key_struct.size) // (2 * key_struct.size + 16)
+		if len(key_format) > 16:
+			raise ValueError("The key format is limited to 16 characters.")
+		if t < 2:
+			raise ValueError("A page of %d bytes cannot hold a node." % page_size)
+		max_keys = 2 * t - 1
+		self.node_struct = struct.Struct("<II" + key_format * max_keys + "q" * (max_keys + 1))
+		if self.node_struct.size > page_size:
+			raise ValueError("A node with t = %d does not fit in a page of %d bytes." % (t, page_size))
+
+		if exists:
+			self.t = t
+			self.max_keys = max_keys
+		else:
+			self._root_page = -1
+			self.free_head = 0  # 0 means empty: page 0 is the header
+			self.page_count = 1
+			BTree.__init__(self, t)
+			self.flush()
+
+	@property
+	def root(self):
+		return self.handle(self._root_page)
+
+	@root.setter
+	def root(self, node):
+		self._root_page = node.page_id
+
+	def handle(self, page_id):
+		"""Return a node handle for a page number, or None for -1."""
+		return None if page_id == -1 else PagedBTreeNode(self, page_id)
+
+	def new_node(self, n, leaf):
+		"""Allocate a page for a new node with n keys."""
+		if self.free_head:
+			page_id = self.free_head
+			self.file.seek(page_id * self.page_size)
+			self.free_head = _NEXT_FREE.unpack(self.file.read(_NEXT_FREE.size))[0]
+		else:
+			page_id = self.page_count
+			self.page_count += 1
+		children = None if leaf else _ChildList(self, None, [-1] * (self.max_keys + 1))
+		page = _Page(leaf, n, [None] * self.max_keys, children)
+		if children is not None:
+			children.page = page
+		page.dirty = True
+		self._cache(page_id, page)
+		self.last_id, self.last_page = page_id, page
+		return PagedBTreeNode(self, page_id)
+
+	def fetch(self, page_id):
+		"""Return the decoded page, reading it from the file if it is not in the pool."""
+		if page_id == self.last_id:  # already the most recently used page
+			return self.last_page
+		page = self.pool.get(page_id)
+		if page is not None:
+			self.pool.move_to_end(page_id)
+			self.last_id, self.last_page = page_id, page
+			return page
+		self.file.seek(page_id * self.page_size)
+		values = self.node_struct.unpack(self.file.read(self.node_struct.size))
+		self.reads += 1
+		leaf, n = values[0] == 1, values[1]
+		f = self.key_fields
+		max_keys = self.max_keys
+		if f == 1:
+			keys = list(values[2:2 + n])
+		else:
+			keys = [values[2 + f * i: 2 + f * (i + 1)] for i in range(n)]
+		keys += [None] * (max_keys - n)
+		children = None
+		if not leaf:
+			children = _ChildList(self, None, list(values[2 + f * max_keys:]))
+		page = _Page(leaf, n, keys, children)
+		if children is not None:
+			children.page = page
+		self._cache(page_id, page)
+		self.last_id, self.last_page = page_id, page
+		return page
+
+	def _cache(self, page_id, page):
+		"""Add a page to the pool, writing back the least recently used page if it is full."""
+		self.pool[page_id] = page
+		if len(self.pool) > self.cache_pages:
+			old_id, old_page = self.pool.popitem(last=False)
+			if old_page.dirty:
+				self._write(old_id, old_page)
+
+	def _write(self, page_id, page):
+		"""Serialize a page into the file."""
+		f = self.key_fields
+		values = [1 if page.leaf else 0, page.n]
+		for i in range(self.max_keys):
+			key = page.key[i] if i < page.n else None
+			if key is None:
+				values.extend([0] * f)
+			elif f == 1:
+				values.append(key)
+			else:
+				values.extend(key)
+		values.extend(page.c.ids[:self.max_keys + 1] if page.c is not None else [-1] * (self.max_keys + 1))
+		self.file.seek(page_id * self.page_size)
+		self.file.write(self.node_struct.pack(*values).ljust(self.page_size, b"\0"))
+		page.dirty = False
+		self.writes += 1
+
+	def free_page(self, page_id):
+		"""Put a page on the free-page list and drop it from the pool."""
+		self.pool.pop(page_id, None)
+		if page_id == self.last_id:
+			self.last_id, self.last_page = -1, None
+		self.file.seek(page_id * self.page_size)
+		self.file.write(_NEXT_FREE.pack(self.free_head))
+		self.free_head = page_id
+
+	def delete(self, k):
+		"""Delete key k, returning the old root's page to the free list if the tree shrinks."""
+		old_root = self._root_page
+		BTree.delete(self, k)
+		if self._root_page != old_root:
+			self.free_page(old_root)
+
+	def flush(self):
+		"""Write every dirty page and the header to the file."""
+		for page_id, page in self.pool.items():
+			if page.dirty:
+				self._write(page_id, page)
+		self.file.seek(0)
+		header = _HEADER.pack(_MAGIC, self.page_size, self.t, self.key_format.encode(),
+							  self._root_page, self.free_head, self.page_count)
+		self.file.write(header.ljust(self.page_size, b"\0"))
+		self.file.flush()
+
+	def close(self):
+		"""Flush and close the file."""
+		if not self.file.closed:
+			self.flush()
+			self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def height(self):
+		"""Return the number of levels (pages read by a lookup that misses the pool)."""
+		levels = 1
+		node = self.root
+		while not node.leaf:
+			node = node.c[0]
+			levels += 1
+		return levels
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import tempfile
+	import time as timer
+
+	directory = tempfile.mkdtemp()
+
+	# Small tree with a tiny pool, checked against the B-tree properties throughout.
+	path = os.path.join(directory, "small.btree")
+	with PagedBTree(path, t=3, cache_pages=8) as tree:
+		values = list(range(300))
+		random.shuffle(values)
+		for value in values:
+			tree.insert(value)
+		print(tree.is_btree(), tree.page_count, "pages,", tree.reads, "reads,", tree.writes, "writes")
+		random.shuffle(values)
+		for value in values[:250]:
+			tree.delete(value)
+		print(tree.is_btree(), all(tree.search(v) is None for v in values[:250]), all(tree.search(v) is not None for v in values[250:]))
+		for value in values[:100]:  # reuses freed pages
+			tree.insert(value)
+		print(tree.is_btree(), tree.page_count, "pages")
+
+	# Reopen and search.
+	with PagedBTree(path) as tree:
+		node, i = tree.search(values[0])
+		print(node.key[i] == values[0], tree.search(-1))
+
+	# Larger tree: 4 KiB pages, (time, id) tuple keys, cold lookups read one page per level.
+	path = os.path.join(directory, "journeys.btree")
+	n = 50000
+	start = timer.perf_counter()
+	with PagedBTree(path, key_format="qi", cache_pages=256) as tree:
+		keys = [(random.randrange(10 ** 9), j) for j in range(n)]
+		for key in keys:
+			tree.insert(key)
+		print(n, "inserts: %.2f s, t = %d, height %d, %d pages, %d reads, %d writes"
+				% (timer.perf_counter() - start, tree.t, tree.height(), tree.page_count, tree.reads, tree.writes))
+		probe = keys[n // 2]
+	with PagedBTree(path, cache_pages=8) as tree:
+		reads = tree.reads
+		print(tree.search(probe) is not None, "found with", tree.reads - reads, "page reads")
+		reads = tree.reads
+		print(tree.search((-1, 0)), "after", tree.reads - reads, "page reads")
+	print(os.path.getsize(path) // 1024, "KiB file")
@@ -33,14 +33,22 @@
 # Either of the following import statements works.
 # from disjoint_set_list import make_set, find_set, union
 from disjoint_set_forest import make_set, find_set, union
+from disjoint_set_array import DisjointSetArray
 
 
-def connected_components(G):
+def connected_components(G, flat_sets=False):
 	"""Compute tge connected components of graph G.
 
 	G -- an undirected graph implemented with adjacency lists
+	flat_sets -- if True, return a DisjointSetArray over the vertices instead of a
+	list of ForestNode objects.  Use its component_labels() to get a label per vertex.
 	"""
 	card_V = G.get_card_V()
+	if flat_sets:
+		sets = DisjointSetArray(card_V)
+		sets.union_many((u, edge.get_v()) for u in range(card_V) for edge in G.get_adj_list(u))
+		return sets
+
 	nodes = [None] * card_V
 
 	# Make a singleton set for each vertex.
@@ -64,8 +72,10 @@ def same_component(u, v, sets):
 
 	Arguments:
 	u, v -- indices of distinct vertices
-	sets -- list of nodes for the vertices
+	sets -- list of nodes for the vertices, or a DisjointSetArray
 	"""
+	if isinstance(sets, DisjointSetArray):
+		return sets.same_set(u, v)
 	return find_set(sets[u]) == find_set(sets[v])
 
 
@@ -95,3 +105,8 @@ if __name__ == "__main__":
 		print('a and e are in the same component')
 	else:
 		print('a and e are not in the same component')
+
+	# Same components from the flat-array disjoint-set forest.
+	flat = connected_components(graph1, True)
+	print(flat.component_labels())
+	print(same_component(vertices.index('a'), vertices.index('d'), flat))
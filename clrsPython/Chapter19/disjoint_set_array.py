@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# disjoint_set_array.py
+
+"""Disjoint-set forest stored in two flat lists instead of one ForestNode per element.
+
+Elements are the integers 0..n-1.  find_set uses iterative path halving (every
+node on the find path is pointed at its grandparent), so there is no recursion
+and no per-element object, and with union by rank the amortized cost per
+operation is still O(alpha(n)).
+"""
+
+
+class DisjointSetArray:
+
+	def __init__(self, n):
+		"""Make n singleton sets {0}, {1}, ..., {n-1}."""
+		self.parent = list(range(n))
+		self.rank = [0] * n
+		self.card_sets = n
+
+	def make_set(self):
+		"""Add a new singleton set and return its element."""
+		x = len(self.parent)
+		self.parent.append(x)
+		self.rank.append(0)
+		self.card_sets += 1
+		return x
+
+	def find_set(self, x):
+		"""Return the root of the tree containing x, halving the find path on the way."""
+		parent = self.parent
+		while parent[x] != x:
+			parent[x] = parent[parent[x]]
+			x = parent[x]
+		return x
+
+	def same_set(self, x, y):
+		"""Return True if x and y are in the same set."""
+		return self.find_set(x) == self.find_set(y)
+
+	def link(self, x, y):
+		"""Link together two sets, given their roots.  Return the new root."""
+		rank = self.rank
+		# The root with larger rank becomes the parent of the root with the smaller rank.
+		if rank[x] > rank[y]:
+			self.parent[y] = x
+			self.card_sets -= 1
+			return x
+		self.parent[x] = y
+		if rank[x] == rank[y]:
+			rank[y] += 1
+		self.card_sets -= 1
+		return y
+
+	def union(self, x, y):
+		"""Unite the sets containing x and y.  Return True if two sets were merged,
+		False if x and y were already in the same set."""
+		x = self.find_set(x)
+		y = self.find_set(y)
+		if x == y:
+			return False
+		self.link(x, y)
+		return True
+
+	def union_many(self, pairs):
+		"""Unite the sets of every (x, y) pair.  Return the number of merges performed."""
+		parent = self.parent
+		merged = 0
+		for x, y in pairs:
+			# find_set inlined for both endpoints; this loop is the hot path for bulk loads.
+			while parent[x] != x:
+				parent[x] = parent[parent[x]]
+				x = parent[x]
+			while parent[y] != y:
+				parent[y] = parent[parent[y]]
+				y = parent[y]
+			if x != y:
+				self.link(x, y)
+				merged += 1
+		return merged
+
+	def component_labels(self):
+		"""Return a list mapping each element to a dense set label 0..card_sets-1,
+		numbered in order of each set's smallest element."""
+		n = len(self.parent)
+		labels = [-1] * n
+		root_label = {}
+		for x in range(n):
+			r = self.find_set(x)
+			label = root_label.get(r)
+			if label is None:
+				label = root_label[r] = len(root_label)
+			labels[x] = label
+		return labels
+
+	def components(self):
+		"""Return a list of sets, each a list of its elements in increasing order."""
+		groups = [[] for _ in range(self.card_sets)]
+		for x, label in enumerate(self.component_labels()):
+			groups[label].append(x)
+		return groups
+
+
+# Testing
+if __name__ == "__main__":
+
+	sets = DisjointSetArray(10)
+	print(sets.union_many([(0, 1), (2, 3), (1, 3), (5, 6), (3, 0)]))  # 4
+	print(sets.same_set(0, 2), sets.same_set(0, 5))  # True False
+	print(sets.component_labels())  # [0, 0, 0, 0, 1, 2, 2, 3, 4, 5]
+	print(sets.components())
+	print(sets.card_sets)  # 6
+
+	# A long chain is fine: find_set does not recurse.
+	n = 200000
+	chain = DisjointSetArray(n)
+	chain.union_many((i, i + 1) for i in range(n - 1))
+	print(chain.card_sets, chain.same_set(0, n - 1))  # 1 True
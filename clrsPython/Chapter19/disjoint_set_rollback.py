@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# disjoint_set_rollback.py
+
+"""Disjoint-set forest stored in flat arrays, with union by rank and an undo stack.
+
+There is no path compression, so every union changes exactly one parent pointer
+(and maybe one rank) and can be undone in O(1).  Union by rank alone keeps
+find_set at O(lg n).  Elements are the integers 0..n-1.
+"""
+
+
+class DisjointSetRollback:
+
+	def __init__(self, n):
+		"""Make n singleton sets {0}, {1}, ..., {n-1}."""
+		self.parent = list(range(n))
+		self.rank = [0] * n
+		self.history = []  # one (child_root, parent_root, rank_bumped) entry per successful union
+		self.card_sets = n
+
+	def find_set(self, x):
+		"""Return the root of the tree containing x (no path compression)."""
+		parent = self.parent
+		while parent[x] != x:
+			x = parent[x]
+		return x
+
+	def same_set(self, x, y):
+		"""Return True if x and y are in the same set."""
+		return self.find_set(x) == self.find_set(y)
+
+	def union(self, x, y):
+		"""Unite the sets containing x and y.  Return True if two sets were merged,
+		False if x and y were already in the same set (nothing is recorded)."""
+		x = self.find_set(x)
+		y = self.find_set(y)
+		if x == y:
+			return False
+		rank = self.rank
+		# The root with larger rank becomes the parent of the root with the smaller rank.
+		if rank[x] > rank[y]:
+			x, y = y, x
+		self.parent[x] = y
+		bumped = rank[x] == rank[y]
+		if bumped:
+			rank[y] += 1
+		self.history.append((x, y, bumped))
+		self.card_sets -= 1
+		return True
+
+	def snapshot(self):
+		"""Return a token identifying the current state, for use with rollback."""
+		return len(self.history)
+
+	def undo(self):
+		"""Undo the most recent successful union."""
+		x, y, bumped = self.history.pop()
+		self.parent[x] = x
+		if bumped:
+			self.rank[y] -= 1
+		self.card_sets += 1
+
+	def rollback(self, snapshot):
+		"""Undo unions until the state identified by snapshot is restored."""
+		while len(self.history) > snapshot:
+			self.undo()
+
+
+# Testing
+if __name__ == "__main__":
+
+	sets = DisjointSetRollback(8)
+	sets.union(0, 1)
+	sets.union(2, 3)
+	mark = sets.snapshot()
+	sets.union(1, 3)
+	sets.union(4, 5)
+	print(sets.same_set(0, 2), sets.card_sets)  # True 4
+	sets.rollback(mark)
+	print(sets.same_set(0, 2), sets.card_sets)  # False 6
+	print(sets.same_set(2, 3))  # True
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# offline_connectivity.py
+
+"""Offline dynamic connectivity by divide and conquer over time.
+
+Time is a sequence of query slots 0..q-1.  Every edge is alive during some
+intervals of slots.  Each interval is stored in the O(lg q) nodes of a segment
+tree over the slots that exactly cover it.  A depth-first walk of the segment
+tree unites an edge's endpoints when entering a node that stores it and rolls
+the unions back when leaving, so at each leaf the disjoint-set forest holds
+exactly the edges alive in that slot.  Total time is O((m lg q + q) lg n) for
+m edge intervals.
+"""
+
+from clrsPython.Chapter19.disjoint_set_rollback import DisjointSetRollback
+
+
+def offline_connectivity(card_V, edge_intervals, queries, static_edges=()):
+	"""Answer one connectivity query per time slot.
+
+	Arguments:
+	card_V -- number of vertices, numbered 0..card_V-1
+	edge_intervals -- iterable of (u, v, first, last): edge (u, v) is alive in slots first..last inclusive
+	queries -- list of (a, b) pairs; queries[i] is asked in slot i
+	static_edges -- iterable of (u, v) edges alive in every slot
+
+	Returns:
+	A list of booleans, the i-th telling whether queries[i] was connected in slot i.
+	"""
+	q = len(queries)
+	answers = [False] * q
+	sets = DisjointSetRollback(card_V)
+	for u, v in static_edges:
+		sets.union(u, v)
+	if q == 0:
+		return answers
+
+	# Segment tree over slots, stored as a heap-ordered list of edge buckets.
+	size = 1
+	while size < q:
+		size *= 2
+	buckets = [[] for _ in range(2 * size)]
+	for u, v, first, last in edge_intervals:
+		if first < 0:
+			first = 0
+		if last > q - 1:
+			last = q - 1
+		lo = first + size
+		hi = last + size + 1
+		while lo < hi:  # standard bottom-up cover of [first, last]
+			if lo & 1:
+				buckets[lo].append((u, v))
+				lo += 1
+			if hi & 1:
+				hi -= 1
+				buckets[hi].append((u, v))
+			lo //= 2
+			hi //= 2
+
+	def walk(node, lo, hi):
+		"""Process segment-tree node covering slots lo..hi-1."""
+		if lo >= q:
+			return
+		mark = sets.snapshot()
+		for u, v in buckets[node]:
+			sets.union(u, v)
+		if hi - lo == 1:
+			a, b = queries[lo]
+			answers[lo] = sets.same_set(a, b)
+		else:
+			mid = (lo + hi) // 2
+			walk(2 * node, lo, mid)
+			walk(2 * node + 1, mid, hi)
+		sets.rollback(mark)
+
+	walk(1, 0, size)
+	return answers
+
+
+# Testing
+if __name__ == "__main__":
+
+	# Path 0-1-2-3; edge (1, 2) is missing in slots 1..2, edge (0, 3) appears in slot 2.
+	intervals = [(1, 2, 0, 0), (1, 2, 3, 3), (0, 3, 2, 3)]
+	queries = [(0, 3), (0, 3), (0, 3), (1, 2)]
+	print(offline_connectivity(4, intervals, queries, static_edges=[(0, 1), (2, 3)]))
+	# [True, False, True, True]
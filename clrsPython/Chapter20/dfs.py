@@ -113,6 +113,59 @@ def dfs_visit(G, u, discover_func, finish_func):
 		finish_func(u)  # do something with vertex v upon finishing it
 
 
+def dfs_iterative(G, start_dfs_tree=None, discover_func=None, finish_func=None, order=None):
+	"""Perform depth-first search like dfs, but with an explicit stack instead of recursion.
+
+	Takes the same arguments, calls the callbacks in the same order and returns the
+	same d, f and pi lists as dfs.  All state is local to the call, so it is safe to
+	run concurrently from several threads and does not hit the recursion limit on
+	long paths.  The stack holds (vertex, adjacency-list iterator) pairs, and each
+	iterator resumes where it left off when its vertex is back on top.
+	"""
+	card_V = G.get_card_V()
+	color = [WHITE] * card_V
+	pi = [None] * card_V
+	d = [None] * card_V 	# discovery times
+	f = [None] * card_V 	# finish times
+	time = 0
+
+	if order is None:
+		order = range(card_V)
+
+	for s in order:
+		if color[s] != WHITE:
+			continue
+		if start_dfs_tree is not None:
+			start_dfs_tree()
+		if discover_func is not None:
+			discover_func(s)
+		time += 1
+		d[s] = time
+		color[s] = GRAY
+		stack = [(s, G.get_adj_list(s))]
+		while stack:
+			u, edges = stack[-1]
+			for edge in edges:  # resume exploring u's edges
+				v = edge.get_v()
+				if color[v] == WHITE:
+					if discover_func is not None:
+						discover_func(v)
+					pi[v] = u
+					time += 1
+					d[v] = time
+					color[v] = GRAY
+					stack.append((v, G.get_adj_list(v)))
+					break  # descend into v; u's iterator is kept on the stack
+			else:  # all of u's edges explored
+				stack.pop()
+				time += 1
+				f[u] = time
+				color[u] = BLACK
+				if finish_func is not None:
+					finish_func(u)
+	return d, f, pi
+
+
 # Testing
 if __name__ == "__main__":
 
@@ -133,3 +186,12 @@ if __name__ == "__main__":
 			print(pi[v])
 		else:
 			print(vertices[pi[v]])
+	print((d, f, pi) == dfs_iterative(graph1))
+
+	# A path far longer than the recursion limit.
+	card_V = 100000
+	graph2 = AdjacencyListGraph(card_V)
+	for u in range(card_V - 1):
+		graph2.insert_edge(u, u + 1)
+	d, f, pi = dfs_iterative(graph2)
+	print(d[card_V - 1], f[0])  # 100000 200000
@@ -30,7 +30,7 @@
 #                                                                       #
 #########################################################################
 
-from dfs import dfs
+from dfs import dfs_iterative
 from counting_sort import counting_sort
 
 
@@ -45,7 +45,7 @@ def strongly_connected_components(G):
 	if not G.is_directed():
 		raise RuntimeError("Graph must be directed.")
 	# Compute finishing times. 
-	d, f, pi = dfs(G)
+	d, f, pi = dfs_iterative(G)
 	G_transpose = G.transpose()
 
 	# Create a list of the vertices in order of decreasing finish times.
@@ -58,7 +58,69 @@ def strongly_connected_components(G):
 	# of decreasing finish times. Upon creating each depth-first tree, start
 	# a new component. When discovering a vertex, add it to the component being constructed.
 	components = []
-	dfs(G_transpose, lambda: components.append([]), lambda u: components[-1].append(u), None, sorted_vertices)
+	dfs_iterative(G_transpose, lambda: components.append([]), lambda u: components[-1].append(u), None, sorted_vertices)
+	return components
+
+
+def strongly_connected_components_tarjan(G):
+	"""Compute the strongly connected components of a directed graph with Tarjan's algorithm.
+
+	One depth-first search instead of two and no transpose graph.  The search uses an
+	explicit stack of (vertex, adjacency-list iterator) pairs, as in dfs_iterative, and
+	all state is local, so it is reentrant and not limited by the recursion depth.
+
+	G -- a directed graph, represented by adjacency lists
+
+	Returns:
+	A list of components, each a list of vertices.  Components come out in reverse
+	topological order of the component graph (sinks first).
+	"""
+	if not G.is_directed():
+		raise RuntimeError("Graph must be directed.")
+	card_V = G.get_card_V()
+	index = [None] * card_V  # order of discovery
+	low = [0] * card_V  # smallest index reachable through the subtree and one back edge
+	on_stack = [False] * card_V
+	stack = []  # vertices whose component is not yet known
+	components = []
+	counter = 0
+
+	for s in range(card_V):
+		if index[s] is not None:
+			continue
+		index[s] = low[s] = counter
+		counter += 1
+		stack.append(s)
+		on_stack[s] = True
+		work = [(s, G.get_adj_list(s))]
+		while work:
+			u, edges = work[-1]
+			for edge in edges:
+				v = edge.get_v()
+				if index[v] is None:  # tree edge: descend into v
+					index[v] = low[v] = counter
+					counter += 1
+					stack.append(v)
+					on_stack[v] = True
+					work.append((v, G.get_adj_list(v)))
+					break
+				elif on_stack[v] and index[v] < low[u]:
+					low[u] = index[v]
+			else:  # u is finished
+				work.pop()
+				if work:
+					p = work[-1][0]
+					if low[u] < low[p]:
+						low[p] = low[u]
+				if low[u] == index[u]:  # u is the root of a component
+					component = []
+					while True:
+						w = stack.pop()
+						on_stack[w] = False
+						component.append(w)
+						if w == u:
+							break
+					components.append(component)
 	return components
 
 
@@ -94,3 +156,6 @@ if __name__ == "__main__":
 	components = strongly_connected_components(graph2)
 	for component in components:
 		print([vertices[i] for i in component])
+	print("Tarjan:")
+	for component in strongly_connected_components_tarjan(graph2):
+		print([vertices[i] for i in component])
@@ -31,13 +31,7 @@
 #########################################################################
 
 from dll_sentinel import DLLSentinel
-from dfs import dfs
-
-
-def finish(u):
-	"""Prepend onto the linked list as each vertex is finished."""
-	global ordered_list
-	ordered_list.prepend(u)
+from dfs import dfs_iterative
 
 
 def topological_sort(G):
@@ -49,11 +43,12 @@ def topological_sort(G):
 	Returns:
 	A linked list giving the topologically sorted order of the vertices.
 	"""
-	global ordered_list
 	if not G.is_directed():
 		raise RuntimeError("Graph must be directed.")
 	ordered_list = DLLSentinel()
-	dfs(G, None, None, finish)  # no start_dfs_tree or discovery_func
+	# Prepend onto the linked list as each vertex is finished.  The list is local and the
+	# DFS is iterative, so concurrent calls and long chains are both fine.
+	dfs_iterative(G, None, None, ordered_list.prepend)  # no start_dfs_tree or discovery_func
 	return ordered_list
 
 
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# dynamic_mst.py
+
+"""Minimum spanning forest maintained under edge insertions and deletions.
+
+Insertion of (u, v, w): if u and v are in different trees the edge joins them;
+otherwise it closes a cycle with the tree path from u to v, and it replaces the
+heaviest edge on that path if it is lighter.  Finding the path takes O(V).
+
+Deletion of a non-tree edge changes nothing.  Deletion of a tree edge splits its
+tree in two; the lightest non-tree edge crossing the cut (if any) reconnects
+them.  Both sides are explored alternately so that only the smaller side and its
+incident edges are scanned.
+"""
+
+from clrsPython.Chapter19.disjoint_set_array import DisjointSetArray
+
+
+def _key(u, v):
+    """Canonical dictionary key for the undirected edge (u, v)."""
+    return (u, v) if u < v else (v, u)
+
+
+class DynamicMST:
+
+    def __init__(self, card_V):
+        """Initialize an empty forest on vertices 0..card_V-1."""
+        self.adj = [{} for _ in range(card_V)]       # all edges: adj[u][v] = weight
+        self.tree_adj = [{} for _ in range(card_V)]  # tree edges only
+        self.tree_weight = 0
+
+    @classmethod
+    def from_edges(cls, card_V, edges):
+        """Build the structure for a graph given as (u, v, weight) triples, using Kruskal's algorithm."""
+        dmst = cls(card_V)
+        for u, v, w in edges:
+            if u == v:
+                continue
+            old = dmst.adj[u].get(v)
+            if old is None or w < old:
+                dmst.adj[u][v] = w
+                dmst.adj[v][u] = w
+        sets = DisjointSetArray(card_V)
+        for w, u, v in sorted((w, u, v) for u in range(card_V) for v, w in dmst.adj[u].items() if u < v):
+            if sets.union(u, v):
+                dmst._link(u, v, w)
+        return dmst
+
+    def get_card_V(self):
+        """Return the number of vertices."""
+        return len(self.adj)
+
+    def add_vertex(self):
+        """Add an isolated vertex and return its index."""
+        self.adj.append({})
+        self.tree_adj.append({})
+        return len(self.adj) - 1
+
+    def is_tree_edge(self, u, v):
+        """Return True if (u, v) is currently in the spanning forest."""
+        return v in self.tree_adj[u]
+
+    def tree_edges(self):
+        """Return the forest as a list of (u, v, weight) with u < v."""
+        return [(u, v, w) for u in range(len(self.tree_adj)) for v, w in self.tree_adj[u].items() if u < v]
+
+    def get_total_weight(self):
+        """Return the total weight of the spanning forest."""
+        return self.tree_weight
+
+    def _link(self, u, v, w):
+        self.tree_adj[u][v] = w
+        self.tree_adj[v][u] = w
+        self.tree_weight += w
+
+    def _cut(self, u, v):
+        w = self.tree_adj[u].pop(v)
+        del self.tree_adj[v][u]
+        self.tree_weight -= w
+
+    def _tree_path(self, u, v):
+        """Return the tree path from u to v as a list of vertices, or None if they are in different trees."""
+        pi = {u: None}
+        stack = [u]
+        while stack:
+            x = stack.pop()
+            if x == v:
+                path = [v]
+                while pi[path[-1]] is not None:
+                    path.append(pi[path[-1]])
+                return path
+            for y in self.tree_adj[x]:
+                if y not in pi:
+                    pi[y] = x
+                    stack.append(y)
+        return None
+
+    def insert_edge(self, u, v, weight):
+        """Insert edge (u, v) with the given weight, or change the weight of an existing edge."""
+        if u == v:
+            raise RuntimeError("Cannot insert self-loop (" + str(u) + ", " + str(v) + ")")
+        if v in self.adj[u]:
+            self.delete_edge(u, v)
+        self.adj[u][v] = weight
+        self.adj[v][u] = weight
+
+        path = self._tree_path(u, v)
+        if path is None:  # different trees: the edge joins them
+            self._link(u, v, weight)
+            return
+        # Find the heaviest edge on the cycle's tree path.
+        heaviest = None
+        heaviest_w = weight
+        for i in range(len(path) - 1):
+            w = self.tree_adj[path[i]][path[i + 1]]
+            if w > heaviest_w:
+                heaviest, heaviest_w = i, w
+        if heaviest is not None:
+            self._cut(path[heaviest], path[heaviest + 1])
+            self._link(u, v, weight)
+
+    def delete_edge(self, u, v):
+        """Delete edge (u, v) if it exists, repairing the forest with the lightest replacement edge."""
+        if v not in self.adj[u]:
+            return
+        del self.adj[u][v]
+        del self.adj[v][u]
+        if v not in self.tree_adj[u]:
+            return
+        self._cut(u, v)
+
+        # Grow both sides of the cut in lockstep; stop when one is exhausted.
+        sides = ({u}, {v})
+        stacks = ([u], [v])
+        turn = 0
+        while stacks[0] and stacks[1]:
+            x = stacks[turn].pop()
+            for y in self.tree_adj[x]:
+                if y not in sides[turn]:
+                    sides[turn].add(y)
+                    stacks[turn].append(y)
+            turn = 1 - turn
+        small = sides[0] if not stacks[0] else sides[1]
+
+        # Every graph edge leaving the smaller side goes to the other side of the cut.
+        best = None
+        for x in small:
+            for y, w in self.adj[x].items():
+                if y not in small and (best is None or w < best[2]):
+                    best = (x, y, w)
+        if best is not None:
+            self._link(*best)
+
+    def delete_vertex_edges(self, u):
+        """Delete every edge incident on u (for example when station u closes)."""
+        for v in list(self.adj[u]):
+            self.delete_edge(u, v)
+
+
+# Testing
+if __name__ == "__main__":
+
+    import random
+    import time as timer
+    from adjacency_list_graph import AdjacencyListGraph
+    from mst import prim, kruskal_fast, get_total_weight
+
+    # Textbook example.
+    vertices = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
+    edges = [('a', 'b', 4), ('a', 'h', 8), ('b', 'c', 8), ('b', 'h', 11), ('c', 'd', 7),
+             ('c', 'f', 4), ('c', 'i', 2), ('d', 'e', 9), ('d', 'f', 14), ('e', 'f', 10),
+             ('f', 'g', 2), ('g', 'h', 1), ('g', 'i', 6), ('h', 'i', 7)]
+    dmst = DynamicMST.from_edges(len(vertices), [(vertices.index(a), vertices.index(b), w) for a, b, w in edges])
+    print("weight =", dmst.get_total_weight())  # 37
+    dmst.delete_edge(vertices.index('c'), vertices.index('i'))
+    print("after deleting (c, i): weight =", dmst.get_total_weight())  # 41
+    dmst.insert_edge(vertices.index('a'), vertices.index('e'), 1)
+    print("after inserting (a, e, 1): weight =", dmst.get_total_weight())  # 33
+    print()
+
+    # Mutation-heavy replay: incremental maintenance versus recomputing with Prim after every change.
+    random.seed(1828)
+    card_V = 400
+    base = {_key(i, i + 1): random.randint(1, 20) for i in range(card_V - 1)}  # never deleted: stays connected
+    extra = {}
+    while len(extra) < 3 * card_V:
+        u, v = random.sample(range(card_V), 2)
+        if _key(u, v) not in base:
+            extra[_key(u, v)] = random.randint(1, 20)
+    mutations = []
+    live = dict(extra)
+    for _ in range(300):
+        if live and random.random() < 0.5:
+            e = random.choice(list(live))
+            del live[e]
+            mutations.append(("delete", e, None))
+        else:
+            u, v = random.sample(range(card_V), 2)
+            e = _key(u, v)
+            if e in base:
+                continue
+            live[e] = random.randint(1, 20)
+            mutations.append(("insert", e, live[e]))
+
+    dmst = DynamicMST.from_edges(card_V, [(u, v, w) for (u, v), w in list(base.items()) + list(extra.items())])
+    start = timer.perf_counter()
+    incremental_weights = []
+    for op, (u, v), w in mutations:
+        if op == "insert":
+            dmst.insert_edge(u, v, w)
+        else:
+            dmst.delete_edge(u, v)
+        incremental_weights.append(dmst.get_total_weight())
+    incremental_time = timer.perf_counter() - start
+
+    current = dict(base)
+    current.update(extra)
+    start = timer.perf_counter()
+    recompute_weights = []
+    for op, e, w in mutations:
+        if op == "insert":
+            current[e] = w
+        else:
+            del current[e]
+        graph = AdjacencyListGraph(card_V, False, True)
+        for (u, v), weight in current.items():
+            graph.insert_edge(u, v, weight)
+        recompute_weights.append(get_total_weight(prim(graph, 0)))
+    recompute_time = timer.perf_counter() - start
+
+    # Cross-check the final state against Kruskal as well.
+    us, vs, ws = zip(*[(u, v, w) for (u, v), w in current.items()])
+    print("weights agree:", incremental_weights == recompute_weights,
+          dmst.get_total_weight() == sum(kruskal_fast(card_V, us, vs, ws)[2]))
+    print(len(mutations), "mutations on", card_V, "vertices,", len(current), "edges")
+    print("incremental: %.4f s, recompute with Prim: %.4f s, speedup %.0fx"
+          % (incremental_time, recompute_time, recompute_time / incremental_time))
@@ -31,8 +31,10 @@
 #########################################################################
 
 from merge_sort import merge_sort
+from counting_sort import counting_sort_indices
 from adjacency_list_graph import AdjacencyListGraph
 from disjoint_set_forest import make_set, find_set, union
+from disjoint_set_array import DisjointSetArray
 from min_heap_priority_queue import MinHeapPriorityQueue
 
 
@@ -66,18 +68,26 @@ class KruskalEdge:
         return "(" + str(self.u) + ", " + str(self.v) + "), weight: " + str(self.weight)
 
 
-def kruskal(G):
-    """ Return the minimum spanning tree of a weighted, undirected graph G using Kruskal's algorithm."""
+def kruskal(G, flat_sets=False):
+    """ Return the minimum spanning tree of a weighted, undirected graph G using Kruskal's algorithm.
+
+    Arguments:
+    G -- an undirected, weighted graph, represented by adjacency lists
+    flat_sets -- if True, use the flat-array DisjointSetArray instead of one ForestNode per vertex
+    """
     if G.is_directed():
         raise RuntimeError("Graph should be undirected.")
 
     card_V = G.get_card_V()
     # Initialize an undirected, weighted, minimum spanning tree.
     mst = AdjacencyListGraph(card_V, False, True)
-    # Keep an array of handles to disjoint-set objects.
-    forest = [None] * card_V
-    for v in range(card_V):
-        forest[v] = make_set(v)
+    if flat_sets:
+        forest = DisjointSetArray(card_V)
+    else:
+        # Keep an array of handles to disjoint-set objects.
+        forest = [None] * card_V
+        for v in range(card_V):
+            forest[v] = make_set(v)
 
     # Make an array of weighted edges and sort it by weight.
     edges = []
@@ -89,6 +99,13 @@ def kruskal(G):
     merge_sort(edges)  # sort in nondecreasing order by weight
 
     # Examine each edge.
+    if flat_sets:
+        for edge in edges:
+            # union returns False if the endpoints are already in the same tree.
+            if forest.union(edge.get_u(), edge.get_v()):
+                mst.insert_edge(edge.get_u(), edge.get_v(), edge.get_weight())
+        return mst
+
     for edge in edges:
         u = forest[edge.get_u()]
         v = forest[edge.get_v()]
@@ -100,6 +117,74 @@ def kruskal(G):
     return mst
 
 
+def kruskal_edge_arrays(G):
+    """Return the edges of an undirected, weighted graph G as parallel lists (us, vs, weights),
+    each edge listed once with u < v."""
+    us, vs, weights = [], [], []
+    for u in range(G.get_card_V()):
+        for edge in G.get_adj_list(u):
+            v = edge.get_v()
+            if u < v:
+                us.append(u)
+                vs.append(v)
+                weights.append(edge.get_weight())
+    return us, vs, weights
+
+
+def kruskal_fast(card_V, us, vs, weights):
+    """Kruskal's algorithm over a parallel-array edge list, returning the MST as an edge array.
+
+    Edges are never wrapped in objects.  If all weights are nonnegative integers no larger
+    than the number of edges plus card_V, they are ordered with a counting sort; otherwise
+    Python's sort is used.  The scan stops as soon as card_V - 1 tree edges are found.
+
+    Arguments:
+    card_V -- number of vertices, numbered 0..card_V-1
+    us, vs, weights -- parallel lists giving the endpoints and weight of each undirected edge
+
+    Returns:
+    Parallel lists (mst_us, mst_vs, mst_weights) of the tree edges in the order they were added.
+    For a disconnected graph this is a minimum spanning forest.
+    """
+    m = len(weights)
+    if m == 0:
+        return [], [], []
+    k = max(weights)
+    if all(type(w) is int for w in weights) and min(weights) >= 0 and k <= m + card_V:
+        order = counting_sort_indices(weights, k)
+    else:
+        order = sorted(range(m), key=weights.__getitem__)
+
+    parent = list(range(card_V))
+    rank = [0] * card_V
+    mst_us, mst_vs, mst_weights = [], [], []
+    remaining = card_V - 1
+    for e in order:
+        # Flat-array find with path halving, as in DisjointSetArray, inlined for speed.
+        x = us[e]
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        y = vs[e]
+        while parent[y] != y:
+            parent[y] = parent[parent[y]]
+            y = parent[y]
+        if x == y:
+            continue
+        if rank[x] > rank[y]:
+            x, y = y, x
+        parent[x] = y
+        if rank[x] == rank[y]:
+            rank[y] += 1
+        mst_us.append(us[e])
+        mst_vs.append(vs[e])
+        mst_weights.append(weights[e])
+        remaining -= 1
+        if remaining == 0:  # the tree is complete; no later edge can be added
+            break
+    return mst_us, mst_vs, mst_weights
+
+
 def prim(G, r):
     """ Return the minimum spanning tree of a weighted, undirected graph G using Prim's algorithm.
 
@@ -180,6 +265,7 @@ if __name__ == "__main__":
     print_undirected_edges(kruskal1, vertices)
     kruskal_weight = get_total_weight(kruskal1)
     print("Kruskal weight =", kruskal_weight)
+    print("Kruskal weight with flat-array sets =", get_total_weight(kruskal(graph1, True)))
     print("MST with Prim's algorithm:")
     prim1 = prim(graph1, 0)
     print_undirected_edges(prim1, vertices)
@@ -204,3 +290,9 @@ if __name__ == "__main__":
     prim_weight2 = get_total_weight(prim2)
     print("Prim weight =", prim_weight2)
     print(prim_weight2 == kruskal_weight2)
+    print()
+
+    # Fast Kruskal on parallel edge arrays.
+    fast_us, fast_vs, fast_weights = kruskal_fast(card_V, *kruskal_edge_arrays(graph2))
+    print("Fast Kruskal edges =", len(fast_weights), ", weight =", sum(fast_weights))
+    print(sum(fast_weights) == kruskal_weight2)
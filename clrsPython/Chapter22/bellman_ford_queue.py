@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# bellman_ford_queue.py
+
+"""Queue-based Bellman-Ford (SPFA) with subtree disassembly.
+
+Only vertices whose distance changed are queued, and only their out-edges are
+relaxed, so the search stops as soon as no distance changes instead of always
+making |V| - 1 passes.
+
+Negative cycles are found with Tarjan's subtree disassembly.  The shortest-path
+tree is kept as a preorder list with depths.  When d[v] improves through an edge
+(u, v), every descendant of v is detached from the tree: their distances are
+stale, so scanning them now would be wasted work.  If u itself is one of those
+descendants, then the tree path from v to u plus the edge (u, v) is a
+negative-weight cycle, and it is returned as soon as it forms.  Because each
+detached vertex was walked once, the check costs no more than the disassembly.
+"""
+
+
+def _csr_arrays(G):
+	"""Return (card_V, offsets, targets, weights) for a CSRGraph or an AdjacencyListGraph."""
+	if hasattr(G, "offsets"):
+		return G.get_card_V(), G.offsets, G.targets, G.weights
+	card_V = G.get_card_V()
+	offsets = [0] * (card_V + 1)
+	targets, weights = [], []
+	for u in range(card_V):
+		for edge in G.get_adj_list(u):
+			targets.append(edge.get_v())
+			weights.append(edge.get_weight())
+		offsets[u + 1] = len(targets)
+	return card_V, offsets, targets, weights
+
+
+def bellman_ford_queue(G, s):
+	"""Solve the single-source shortest-paths problem with possibly negative edge weights.
+
+	Arguments:
+	G -- a directed, weighted graph: an AdjacencyListGraph or a CSRGraph
+	s -- index of the source vertex, or a list of source vertices (all at distance 0)
+
+	Returns:
+	d -- distances from the source(s)
+	pi -- predecessors
+	cycle -- None if no negative-weight cycle is reachable from the source(s); otherwise
+	a list of vertices [v0, v1, ..., vk] such that (v0, v1), ..., (vk, v0) is a
+	negative-weight cycle.  d and pi are not meaningful in that case.
+	"""
+	card_V, offsets, targets, weights = _csr_arrays(G)
+	sources = [s] if isinstance(s, int) else list(s)
+	inf = float('inf')
+	d = [inf] * card_V
+	pi = [None] * card_V
+
+	# Shortest-path tree as a doubly linked preorder list; depth -1 means not in the tree.
+	nxt = [-1] * card_V
+	prv = [-1] * card_V
+	depth = [-1] * card_V
+	in_queue = bytearray(card_V)
+	queue = []
+	head = 0
+
+	last = -1
+	for source in sources:
+		if depth[source] != -1:
+			continue
+		d[source] = 0
+		depth[source] = 0
+		prv[source] = last
+		if last != -1:
+			nxt[last] = source
+		last = source
+		queue.append(source)
+		in_queue[source] = 1
+
+	while head < len(queue):
+		u = queue[head]
+		head += 1
+		in_queue[u] = 0
+		if depth[u] == -1:  # detached since it was queued; its distance is stale
+			continue
+		du = d[u]
+		for i in range(offsets[u], offsets[u + 1]):
+			v = targets[i]
+			dv = du + weights[i]
+			if dv >= d[v]:
+				continue
+			d[v] = dv
+
+			if depth[v] != -1:
+				# Cut v's subtree [v, ..., end] out of the preorder list, detaching descendants.
+				if v == u:
+					return d, pi, [u]  # negative self-loop
+				root_depth = depth[v]
+				x = nxt[v]
+				end = v
+				while x != -1 and depth[x] > root_depth:
+					if x == u:  # u is below v: the tree path v ~> u plus (u, v) is a cycle
+						cycle = [u]
+						while cycle[-1] != v:
+							cycle.append(pi[cycle[-1]])
+						cycle.reverse()
+						return d, pi, cycle
+					depth[x] = -1
+					end = x
+					x = nxt[x]
+				before, after = prv[v], nxt[end]
+				if before != -1:
+					nxt[before] = after
+				if after != -1:
+					prv[after] = before
+
+			# Reattach v as the first child of u.
+			pi[v] = u
+			depth[v] = depth[u] + 1
+			after = nxt[u]
+			nxt[v] = after
+			prv[v] = u
+			nxt[u] = v
+			if after != -1:
+				prv[after] = v
+
+			if not in_queue[v]:
+				in_queue[v] = 1
+				queue.append(v)
+
+		if head > 4096 and head * 2 > len(queue):  # drop the consumed prefix now and then
+			del queue[:head]
+			head = 0
+
+	return d, pi, None
+
+
+# Testing
+if __name__ == "__main__":
+
+	from adjacency_list_graph import AdjacencyListGraph
+	from bellman_ford import bellman_ford
+
+	# Textbook example.
+	vertices = ['s', 't', 'x', 'y', 'z']
+	edges = [('s', 't', 6), ('s', 'y', 7), ('t', 'x', 5), ('t', 'y', 8), ('t', 'z', -4),
+			 ('x', 't', -2), ('y', 'x', -3), ('y', 'z', 9), ('z', 's', 2), ('z', 'x', 7)]
+	graph1 = AdjacencyListGraph(len(vertices), True, True)
+	for edge in edges:
+		graph1.insert_edge(vertices.index(edge[0]), vertices.index(edge[1]), edge[2])
+	# d should be [0, 2, 4, 7, -2], pi should be [None, x, y, s, t]
+	d, pi, cycle = bellman_ford_queue(graph1, vertices.index('s'))
+	print("Negative-weight cycle:", cycle)
+	for i in range(len(vertices)):
+		print(vertices[i] + ": d = " + str(d[i]) + ", pi = " + ("None" if pi[i] is None else vertices[pi[i]]))
+	print(d == bellman_ford(graph1, vertices.index('s'))[0])
+	print()
+
+	# Negative-weight cycle.
+	graph2 = graph1.copy()
+	graph2.insert_edge(vertices.index('s'), vertices.index('x'), -5)
+	d, pi, cycle = bellman_ford_queue(graph2, vertices.index('s'))
+	print("Negative-weight cycle:", [vertices[v] for v in cycle])
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# connection_scan.py
+
+"""Connection Scan Algorithm (CSA) for timetable queries.
+
+A connection is one train run between two adjacent stations: (departure
+station, arrival station, departure time, arrival time).  All connections of
+the timetable are kept in flat parallel lists sorted by departure time, so an
+earliest-arrival query is a single forward scan: a connection can be taken if
+its departure station has been reached by its departure time, and taking it may
+improve the arrival time at its arrival station.  There is no graph, no heap and
+no per-query setup beyond one list per station.  The scan stops once
+connections depart no earlier than the best arrival at the target.
+
+Latest-departure queries ("leave as late as possible and still arrive by t")
+scan the connections backwards in order of arrival time instead.  Both orders
+are computed once with radix_sort on integer timestamps.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from clrsPython.Chapter8.radix_sort import radix_sort
+from clrsPython.Chapter22.time_expanded_network import scheduled_trips
+
+INF = float('inf')
+
+
+def radix_order(keys):
+	"""Return the stable sorting permutation of a list of integers >= 0, using radix_sort.
+
+	Each key is packed with its index into one integer, key << b | index, so sorting
+	the packed integers sorts by key and breaks ties by index.
+	"""
+	n = len(keys)
+	if n == 0:
+		return []
+	index_bits = max(1, (n - 1).bit_length())
+	packed = [(key << index_bits) | i for i, key in enumerate(keys)]
+	digits = (max(keys).bit_length() + index_bits + 15) // 16
+	radix_sort(packed, n, digits, 1 << 16)
+	mask = (1 << index_bits) - 1
+	return [p & mask for p in packed]
+
+
+class ConnectionScan:
+
+	def __init__(self, card_stations, trips):
+		"""Store the connections of a timetable in departure-time order.
+
+		Arguments:
+		card_stations -- number of stations, numbered 0..card_stations-1
+		trips -- iterable of connections (u, v, departure, arrival, line) with integer
+		times >= 0 and arrival > departure
+		"""
+		trips = list(trips)
+		order = radix_order([trip[2] for trip in trips])
+		self.card_stations = card_stations
+		self.dep_station = [trips[k][0] for k in order]
+		self.arr_station = [trips[k][1] for k in order]
+		self.dep_time = [trips[k][2] for k in order]
+		self.arr_time = [trips[k][3] for k in order]
+		self.line = [trips[k][4] for k in order]
+		self.by_arrival = radix_order(self.arr_time)
+		self.arr_time_by_arrival = [self.arr_time[c] for c in self.by_arrival]
+
+	@classmethod
+	def from_timetable(cls, card_stations, links, headways=None, default_headway=5,
+					   service_start=300, service_end=1440):
+		"""Build the connections of a periodic timetable (see scheduled_trips)."""
+		return cls(card_stations, scheduled_trips(links, headways, default_headway, service_start, service_end))
+
+	def get_card_connections(self):
+		"""Return the number of connections."""
+		return len(self.dep_time)
+
+	def _scan(self, a, depart_time, b=None):
+		"""Forward scan from station a; stops early once station b's arrival is final."""
+		dep_station, arr_station = self.dep_station, self.arr_station
+		dep_time, arr_time = self.dep_time, self.arr_time
+		arrival = [INF] * self.card_stations
+		in_connection = [None] * self.card_stations
+		arrival[a] = depart_time
+		target = INF
+		for c in range(bisect_left(dep_time, depart_time), len(dep_time)):
+			t = dep_time[c]
+			if t >= target:
+				break
+			if arrival[dep_station[c]] <= t:
+				v = arr_station[c]
+				if arr_time[c] < arrival[v]:
+					arrival[v] = arr_time[c]
+					in_connection[v] = c
+					if v == b:
+						target = arr_time[c]
+		return arrival, in_connection
+
+	def earliest_arrival(self, a, b, depart_time):
+		"""Return the earliest arrival at station b when leaving station a at depart_time.
+
+		Returns:
+		None if b cannot be reached, otherwise (arrival_time, legs) where legs is a list
+		of rides (from_station, to_station, departure, arrival, line), consecutive
+		connections on the same line with no wait merged into one ride.
+		"""
+		if a == b:
+			return depart_time, []
+		arrival, in_connection = self._scan(a, depart_time, b)
+		if arrival[b] == INF:
+			return None
+		journey = []
+		v = b
+		while v != a:
+			c = in_connection[v]
+			journey.append(c)
+			v = self.dep_station[c]
+		journey.reverse()
+		return arrival[b], self._legs(journey)
+
+	def earliest_arrivals_from(self, a, depart_time):
+		"""Return a list giving, for every station, the earliest arrival when leaving
+		station a at depart_time (inf if unreachable; depart_time for a itself)."""
+		return self._scan(a, depart_time)[0]
+
+	def latest_departure(self, a, b, arrive_by):
+		"""Return the latest departure from station a that still reaches station b by arrive_by.
+
+		Returns:
+		None if no journey arrives in time, otherwise (departure_time, legs) with legs as
+		in earliest_arrival.
+		"""
+		if a == b:
+			return arrive_by, []
+		dep_station, arr_station = self.dep_station, self.arr_station
+		dep_time, arr_time = self.dep_time, self.arr_time
+		by_arrival = self.by_arrival
+		latest = [-INF] * self.card_stations
+		out_connection = [None] * self.card_stations
+		latest[b] = arrive_by
+		for k in range(bisect_right(self.arr_time_by_arrival, arrive_by) - 1, -1, -1):
+			c = by_arrival[k]
+			if arr_time[c] <= latest[a]:  # it and everything after it departs before latest[a]
+				break
+			if arr_time[c] <= latest[arr_station[c]]:
+				u = dep_station[c]
+				if dep_time[c] > latest[u]:
+					latest[u] = dep_time[c]
+					out_connection[u] = c
+		if latest[a] == -INF:
+			return None
+		journey = []
+		u = a
+		while u != b:
+			c = out_connection[u]
+			journey.append(c)
+			u = arr_station[c]
+		return latest[a], self._legs(journey)
+
+	def _legs(self, journey):
+		"""Merge a list of connection indices into rides."""
+		legs = []
+		for c in journey:
+			u, v = self.dep_station[c], self.arr_station[c]
+			dep, arr, line = self.dep_time[c], self.arr_time[c], self.line[c]
+			if legs and legs[-1][1] == u and legs[-1][3] == dep and legs[-1][4] == line:
+				legs[-1] = (legs[-1][0], v, legs[-1][2], arr, line)
+			else:
+				legs.append((u, v, dep, arr, line))
+		return legs
+
+
+# Testing
+if __name__ == "__main__":
+
+	import heapq
+	import random
+	import time as timer
+	from time_expanded_network import TimeExpandedNetwork
+
+	# Small line A - B - C - D with a branch C - E on another line.
+	stations = ['A', 'B', 'C', 'D', 'E']
+	links = []
+	for u, v, t, line in [('A', 'B', 2, 'Red'), ('B', 'C', 3, 'Red'), ('C', 'D', 2, 'Red'), ('C', 'E', 4, 'Blue')]:
+		links.append((stations.index(u), stations.index(v), t, line))
+		links.append((stations.index(v), stations.index(u), t, line))
+	csa = ConnectionScan.from_timetable(len(stations), links, {'Red': 5, 'Blue': 15}, service_start=480, service_end=600)
+	print(csa.get_card_connections(), "connections")
+	for query, (a, b, t) in [("earliest arrival", ('A', 'E', 481)), ("latest departure", ('A', 'E', 514))]:
+		method = csa.earliest_arrival if query == "earliest arrival" else csa.latest_departure
+		time, legs = method(stations.index(a), stations.index(b), t)
+		print("%s %s -> %s, %d: %d" % (query, a, b, t, time))  # 499, then 505
+		for u, v, dep, arr, line in legs:
+			print("  %s %s -> %s  %d -> %d" % (line, stations[u], stations[v], dep, arr))
+	print()
+
+	# Synthetic full-day timetable on a random network with 8 lines.
+	random.seed(1828)
+	n = 300
+	links = []
+	for u in range(1, n):
+		v = random.randrange(max(0, u - 20), u)
+		t = random.randint(1, 5)
+		line = "L%d" % (u % 8)
+		links.append((u, v, t, line))
+		links.append((v, u, t, line))
+	headways = {"L%d" % i: 2 + i for i in range(8)}
+	start = timer.perf_counter()
+	csa = ConnectionScan.from_timetable(n, links, headways)
+	csa_build = timer.perf_counter() - start
+	start = timer.perf_counter()
+	network = TimeExpandedNetwork(n, links, headways)
+	network_build = timer.perf_counter() - start
+	print("%d connections: CSA built in %.3f s, time-expanded network in %.3f s"
+			% (csa.get_card_connections(), csa_build, network_build))
+
+	G = network.G
+	queries = [(random.randrange(n), random.randrange(n), random.randint(300, 1300)) for _ in range(30)]
+	csa_time = dag_time = dijkstra_time = 0
+	for a, b, depart in queries:
+		start = timer.perf_counter()
+		result = csa.earliest_arrival(a, b, depart)
+		csa_time += timer.perf_counter() - start
+
+		start = timer.perf_counter()
+		dag_result = network.earliest_arrival(a, b, depart)
+		dag_time += timer.perf_counter() - start
+
+		# Dijkstra on the time-expanded graph.
+		start = timer.perf_counter()
+		best = depart if a == b else INF
+		s = network.first_event(a, depart)
+		d = {s: 0}
+		heap = [(0, s)]
+		while heap and a != b:
+			du, u = heapq.heappop(heap)
+			if du > d[u]:
+				continue
+			if network.node_station[u] == b:
+				best = network.node_time[u]
+				break
+			for i in range(G.offsets[u], G.offsets[u + 1]):
+				v = G.targets[i]
+				if du + G.weights[i] < d.get(v, INF):
+					d[v] = du + G.weights[i]
+					heapq.heappush(heap, (d[v], v))
+		dijkstra_time += timer.perf_counter() - start
+
+		arrival = INF if result is None else result[0]
+		assert arrival == best == (INF if dag_result is None else dag_result[0])
+		if result is not None and a != b:  # leaving later than the latest departure misses arrival
+			latest, _ = csa.latest_departure(a, b, arrival)
+			assert latest >= depart
+			assert csa.earliest_arrival(a, b, latest)[0] == arrival
+			later = csa.earliest_arrival(a, b, latest + 1)
+			assert later is None or later[0] > arrival
+	print("30 queries agree")
+	print("CSA:                          %.4f s" % csa_time)
+	print("DAG pass, time-expanded:      %.4f s" % dag_time)
+	print("Dijkstra, time-expanded:      %.4f s" % dijkstra_time)
@@ -31,19 +31,22 @@
 #########################################################################
 
 from adjacency_list_graph import *
-from bellman_ford import bellman_ford
+from bellman_ford_queue import bellman_ford_queue
 
 
-def difference_constraints(constraints):
+def difference_constraints(constraints, return_cycle=False):
     """Solve a system of difference constraints.
 
     Input:
     constraints -- a list (or tuple) of lists (or tuples) of three values: i, j, w,
     indicating the constraint xi - xj <= w, where i, j >= 1.
+    return_cycle -- if True, also return the constraints on a negative-weight cycle
 
     Returns:
     feasible -- boolean indicating whether the system has a feasible solution
     solution -- a list of solution values for the xi
+    conflict -- only if return_cycle: None if feasible, otherwise a list of
+    constraints (i, j, w) whose sum is a contradiction 0 <= negative
     """
 
     # Determine the highest variable index.
@@ -61,8 +64,18 @@ def difference_constraints(constraints):
         constraint_graph.insert_edge(0, i, 0)
 
     # If no negative-weight cycle, then shortest-path weights from v0 are a solution.
-    d, pi, feasible = bellman_ford(constraint_graph, 0)
-    return feasible, d[1:]
+    d, pi, cycle = bellman_ford_queue(constraint_graph, 0)
+    feasible = cycle is None
+    if not return_cycle:
+        return feasible, d[1:]
+    if feasible:
+        return feasible, d[1:], None
+    # Edge (vj, vi) of the cycle is the constraint xi - xj <= w.
+    conflict = []
+    for k in range(len(cycle)):
+        j, i = cycle[k], cycle[(k + 1) % len(cycle)]
+        conflict.append((i, j, constraint_graph.find_edge(j, i).get_weight()))
+    return feasible, d[1:], conflict
 
 
 # Testing
@@ -76,3 +89,4 @@ if __name__ == "__main__":
     constraints2 = [(1, 2, 0), (1, 5, -1), (2, 5, 1), (3, 1, 4),
                     (4, 1, 4), (4, 3, -1), (5, 3, -3), (5, 4, -3)]
     print(difference_constraints(constraints2))
+    print(difference_constraints(constraints2, True)[2])
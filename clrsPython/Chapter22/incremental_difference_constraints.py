@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# incremental_difference_constraints.py
+
+"""Difference constraints added or tightened one at a time.
+
+The solver keeps the current solution x, which is the shortest-path weights
+from v0 in the constraint graph (as in difference_constraints).  Every edge
+(vj, vi) of weight w therefore has nonnegative reduced cost w + x[j] - x[i].
+When a new constraint xi - xj <= w is violated, x[i] must drop by
+delta = x[i] - (x[j] + w).  A vertex v drops only if it can be reached from vi
+by a path of reduced cost less than delta, so Dijkstra's algorithm on reduced
+costs, cut off at delta, visits exactly the region that changes.  If it reaches
+vj within the cutoff, the path from vi to vj plus the new edge is a
+negative-weight cycle: the constraint is rejected and the cycle is reported,
+and the solution is left as it was.
+"""
+
+import heapq
+
+
+class IncrementalDifferenceConstraints:
+
+	def __init__(self, n=0):
+		"""Start with variables x1, ..., xn and no constraints (all xi = 0)."""
+		self.x = [0] * (n + 1)  # x[0] is v0 and is unused
+		self.out = [{} for _ in range(n + 1)]  # out[j][i] = w for the constraint xi - xj <= w
+
+	def get_n(self):
+		"""Return the number of variables."""
+		return len(self.x) - 1
+
+	def _grow(self, n):
+		"""Make sure variables x1, ..., xn exist."""
+		while len(self.x) <= n:
+			self.x.append(0)
+			self.out.append({})
+
+	def add_constraint(self, i, j, w):
+		"""Add the constraint xi - xj <= w, or tighten it if one already exists.
+
+		Arguments:
+		i, j -- variable indices, i, j >= 1
+		w -- the bound
+
+		Returns:
+		feasible -- True if the constraint was added; False if it would make the system
+		infeasible, in which case it is not added
+		conflict -- None if feasible; otherwise a list of constraints (i, j, w),
+		starting with the new one, whose sum gives 0 <= a negative number
+		"""
+		self._grow(max(i, j))
+		old_w = self.out[j].get(i)
+		if old_w is not None and old_w <= w:
+			return True, None  # already implied
+		x = self.x
+		delta = x[i] - (x[j] + w)
+		if delta <= 0:  # satisfied by the current solution
+			self.out[j][i] = w
+			return True, None
+		if i == j:
+			return False, [(i, j, w)]
+
+		# Dijkstra from vi on reduced costs, only over vertices that drop.
+		dist = {i: 0}
+		pi = {i: None}
+		done = set()
+		heap = [(0, i)]
+		while heap:
+			du, u = heapq.heappop(heap)
+			if u in done:
+				continue
+			if u == j:  # reduced cost du < delta: path vi ~> vj plus (vj, vi) has weight du - delta < 0
+				cycle = [j]
+				while pi[cycle[-1]] is not None:
+					cycle.append(pi[cycle[-1]])
+				cycle.reverse()  # i, ..., j
+				conflict = [(i, j, w)]
+				for k in range(len(cycle) - 1):
+					a, b = cycle[k], cycle[k + 1]
+					conflict.append((b, a, self.out[a][b]))
+				return False, conflict
+			done.add(u)
+			xu = x[u]
+			for v, wv in self.out[u].items():
+				dv = du + wv + xu - x[v]
+				if dv < delta and (v not in dist or dv < dist[v]):
+					dist[v] = dv
+					pi[v] = u
+					heapq.heappush(heap, (dv, v))
+
+		# Feasible: every visited vertex drops by delta - dist.
+		for v in done:
+			x[v] -= delta - dist[v]
+		self.out[j][i] = w
+		return True, None
+
+	def remove_constraint(self, i, j):
+		"""Remove the constraint xi - xj <= w, if present.
+
+		The current solution stays feasible, but it is no longer necessarily the
+		one difference_constraints would return.
+		"""
+		if j < len(self.out):
+			self.out[j].pop(i, None)
+
+	def constraints(self):
+		"""Return a list of the current constraints as (i, j, w) triples."""
+		return [(i, j, w) for j in range(1, len(self.out)) for i, w in self.out[j].items()]
+
+	def solution(self):
+		"""Return a list of the current solution values x1, ..., xn."""
+		return self.x[1:]
+
+	def value(self, i):
+		"""Return the current solution value of xi."""
+		return self.x[i]
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time as timer
+	from difference_constraints import difference_constraints
+
+	# Example from textbook, one constraint at a time.
+	constraints1 = [(1, 2, 0), (1, 5, -1), (2, 5, 1), (3, 1, 5),
+					(4, 1, 4), (4, 3, -1), (5, 3, -3), (5, 4, -3)]
+	solver = IncrementalDifferenceConstraints()
+	for constraint in constraints1:
+		solver.add_constraint(*constraint)
+	print(solver.solution(), solver.solution() == difference_constraints(constraints1)[1])
+
+	# Tighten x3 - x1 <= 5 to x3 - x1 <= 4, which closes a negative-weight cycle.
+	print(solver.add_constraint(3, 1, 4))
+	print(solver.solution())  # unchanged
+
+	# Random systems: agree with difference_constraints after every addition.
+	random.seed(1828)
+	n = 30
+	for trial in range(20):
+		solver = IncrementalDifferenceConstraints(n)
+		constraints = {}
+		for _ in range(4 * n):
+			i, j = random.randint(1, n), random.randint(1, n)
+			if i == j or (i, j) in constraints:
+				continue
+			w = random.randint(-5, 20)
+			feasible, conflict = solver.add_constraint(i, j, w)
+			expected = difference_constraints([(a, b, c) for (a, b), c in constraints.items()] + [(i, j, w)])
+			assert feasible == expected[0]
+			if feasible:
+				constraints[(i, j)] = w
+				solution = solver.solution()
+				assert solution[:len(expected[1])] == expected[1]
+				assert not any(solution[len(expected[1]):])
+			else:
+				assert sum(c for _, _, c in conflict) < 0
+	print("random systems agree")
+
+	# Timing: a timetable-sized system built one constraint at a time.
+	n = 5000
+	start = timer.perf_counter()
+	solver = IncrementalDifferenceConstraints(n)
+	rejected = 0
+	for _ in range(5 * n):
+		i, j = random.randint(1, n), random.randint(1, n)
+		if i != j and not solver.add_constraint(i, j, random.randint(-3, 30))[0]:
+			rejected += 1
+	print("%d constraints over %d variables (%d rejected): %.3f s"
+			% (5 * n, n, rejected, timer.perf_counter() - start))
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# pareto_paths.py
+
+"""Multi-criteria shortest paths: every Pareto-optimal route by time, interchanges and walking.
+
+Martins' label-setting algorithm, a multi-criteria Dijkstra.  A label is a
+vector (minutes, boardings, walking minutes) at a search state, and one label
+dominates another if it is no worse in every criterion.  Each state keeps a bag
+of mutually non-dominated labels.  Labels leave a priority queue in
+lexicographic order, and a label that is still in its bag when it leaves is
+permanent, so it is expanded.
+
+A state is a station together with the line being ridden (or on foot), because
+whether the next link costs an interchange depends on the current line.  Labels
+count boardings; a route's interchanges are its boardings minus one.
+
+Labels are packed into single integers, minutes << 24 | boardings << 16 | walking,
+so a bag is a sorted list of ints.  Integer order is lexicographic order, so a
+label can only be dominated by labels at or before its position in the bag, and
+can only dominate labels after it.  The dominance tests are bit masks on ints,
+not tuple comparisons.  Queue entries carry the state in 24 more low bits.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+
+_WALK_BITS = 16
+_BOARD_BITS = 8
+_STATE_BITS = 24
+_WALK_MASK = (1 << _WALK_BITS) - 1
+_BOARD_MASK = (1 << _BOARD_BITS) - 1
+_STATE_MASK = (1 << _STATE_BITS) - 1
+
+
+def pack_label(minutes, boardings, walking):
+	"""Pack a label's criteria into one integer whose order is lexicographic order."""
+	return (((minutes << _BOARD_BITS) | boardings) << _WALK_BITS) | walking
+
+
+def unpack_label(label):
+	"""Return (minutes, boardings, walking) for a packed label."""
+	return label >> (_BOARD_BITS + _WALK_BITS), (label >> _WALK_BITS) & _BOARD_MASK, label & _WALK_MASK
+
+
+def _dominates(a, b):
+	"""Return True if packed label a is no worse than packed label b in every criterion."""
+	return (a >> (_BOARD_BITS + _WALK_BITS) <= b >> (_BOARD_BITS + _WALK_BITS)
+			and (a >> _WALK_BITS) & _BOARD_MASK <= (b >> _WALK_BITS) & _BOARD_MASK
+			and a & _WALK_MASK <= b & _WALK_MASK)
+
+
+class LabelStats:
+	"""Counters from one search, for watching how the number of labels grows."""
+
+	__slots__ = ("created", "settled", "dominated", "evicted", "pruned_by_target",
+				 "dropped_by_bound", "queue_peak", "station_labels")
+
+	def __init__(self, card_stations):
+		self.created = 0  # labels inserted into a bag
+		self.settled = 0  # labels taken from the queue while still in their bag
+		self.dominated = 0  # new labels rejected by a label already in the bag
+		self.evicted = 0  # labels removed from a bag by a new, dominating label
+		self.pruned_by_target = 0  # settled labels not expanded because a target label dominates them
+		self.dropped_by_bound = 0  # new labels rejected because their station's bags were full
+		self.queue_peak = 0
+		self.station_labels = [0] * card_stations  # peak number of labels held at each station
+
+	def max_station_labels(self):
+		"""Return the largest number of labels held at one station."""
+		return max(self.station_labels, default=0)
+
+	def as_dict(self):
+		"""Return the counters as a dict (station_labels summarized by its maximum)."""
+		result = {name: getattr(self, name) for name in self.__slots__ if name != "station_labels"}
+		result["max_station_labels"] = self.max_station_labels()
+		return result
+
+	def __str__(self):
+		return ", ".join("%s=%d" % item for item in self.as_dict().items())
+
+
+class ParetoRouter:
+
+	def __init__(self, card_stations, links, footpaths=(), interchange_minutes=0, max_labels_per_station=64):
+		"""Prepare the search states for a network of lines.
+
+		Arguments:
+		card_stations -- number of stations, numbered 0..card_stations-1
+		links -- iterable of directed links (u, v, minutes, line); any hashable line name
+		footpaths -- iterable of directed walking links (u, v, minutes)
+		interchange_minutes -- minutes added whenever a rider boards after the first boarding
+		max_labels_per_station -- bound on the labels held at one station (over all its
+		states); new labels beyond it are dropped, so results may then miss options
+		"""
+		self.card_stations = card_stations
+		self.interchange_minutes = interchange_minutes
+		self.max_labels_per_station = max_labels_per_station
+		self.line_names = []
+		line_ids = {}
+
+		# State 0..card_stations-1 is "at station u on foot"; ride states follow.
+		self.state_station = list(range(card_stations))
+		self.state_line = [-1] * card_stations
+		ride_state = {}
+		rides = [[] for _ in range(card_stations)]  # rides[u] = [(state at v, minutes, line id)]
+		for u, v, minutes, line in links:
+			if line not in line_ids:
+				line_ids[line] = len(self.line_names)
+				self.line_names.append(line)
+			line_id = line_ids[line]
+			if (v, line_id) not in ride_state:
+				ride_state[v, line_id] = len(self.state_station)
+				self.state_station.append(v)
+				self.state_line.append(line_id)
+			rides[u].append((ride_state[v, line_id], minutes, line_id))
+		walks = [[] for _ in range(card_stations)]
+		for u, v, minutes in footpaths:
+			walks[u].append((v, minutes))
+		if len(self.state_station) > _STATE_MASK:
+			raise ValueError("Too many (station, line) states.")
+		self.rides = rides
+		self.walks = walks
+
+	def search(self, a, b):
+		"""Find every Pareto-optimal route from station a to station b.
+
+		Returns:
+		routes -- list of (minutes, interchanges, walking_minutes, legs) sorted by minutes,
+		where legs is a list of (from_station, to_station, line, minutes) and line is None
+		for a walk
+		stats -- LabelStats for the search
+		"""
+		stats = LabelStats(self.card_stations)
+		if a == b:
+			return [(0, 0, 0, [])], stats
+		state_station, state_line = self.state_station, self.state_line
+		rides, walks = self.rides, self.walks
+		interchange_minutes = self.interchange_minutes
+		bags = [[] for _ in range(len(state_station))]
+		station_count = [0] * self.card_stations
+		parent = {}
+		targets = []  # settled labels at b, non-dominated among themselves
+
+		def insert(state, label, from_state, from_label):
+			bag = bags[state]
+			hi = bisect_right(bag, label)
+			for other in bag[:hi]:
+				if _dominates(other, label):
+					stats.dominated += 1
+					return
+			station = state_station[state]
+			kept = [other for other in bag[hi:] if not _dominates(label, other)]
+			removed = len(bag) - hi - len(kept)
+			if removed:
+				stats.evicted += removed
+				station_count[station] -= removed
+			if station_count[station] >= self.max_labels_per_station:
+				if removed:
+					del bag[hi:]
+					bag.extend(kept)
+				stats.dropped_by_bound += 1
+				return
+			bag[hi:] = [label] + kept
+			station_count[station] += 1
+			if station_count[station] > stats.station_labels[station]:
+				stats.station_labels[station] = station_count[station]
+			parent[state, label] = (from_state, from_label)
+			stats.created += 1
+			heapq.heappush(queue, (label << _STATE_BITS) | state)
+			if len(queue) > stats.queue_peak:
+				stats.queue_peak = len(queue)
+
+		queue = []
+		insert(a, pack_label(0, 0, 0), None, None)
+		while queue:
+			key = heapq.heappop(queue)
+			state = key & _STATE_MASK
+			label = key >> _STATE_BITS
+			bag = bags[state]
+			i = bisect_left(bag, label)
+			if i == len(bag) or bag[i] != label:
+				continue  # evicted after it was queued
+			stats.settled += 1
+			u = state_station[state]
+			if u == b:
+				if not any(_dominates(other, label) for _, other in targets):
+					targets.append((state, label))
+				continue
+			if any(_dominates(other, label) for _, other in targets):
+				stats.pruned_by_target += 1
+				continue
+
+			minutes, boardings, walking = unpack_label(label)
+			line = state_line[state]
+			for v_state, link_minutes, link_line in rides[u]:
+				if link_line == line:
+					insert(v_state, label + (link_minutes << (_BOARD_BITS + _WALK_BITS)), state, label)
+				elif boardings < _BOARD_MASK:
+					penalty = interchange_minutes if boardings else 0
+					insert(v_state, pack_label(minutes + link_minutes + penalty, boardings + 1, walking), state, label)
+			for v, walk_minutes in walks[u]:
+				if walking + walk_minutes <= _WALK_MASK:
+					insert(v, pack_label(minutes + walk_minutes, boardings, walking + walk_minutes), state, label)
+
+		# Report interchanges, not boardings: one boarding and none both mean no interchange.
+		results = []
+		for state, label in targets:
+			minutes, boardings, walking = unpack_label(label)
+			results.append((pack_label(minutes, max(0, boardings - 1), walking), state, label))
+		results.sort()
+		routes = []
+		for k, (result, state, label) in enumerate(results):
+			if not any(_dominates(other[0], result) for other in results[:k]):
+				minutes, interchanges, walking = unpack_label(result)
+				routes.append((minutes, interchanges, walking, self._legs(parent, state, label)))
+		return routes, stats
+
+	def _legs(self, parent, state, label):
+		"""Return the legs of the route ending with the given label, rides on one line merged."""
+		steps = []
+		while parent[state, label][0] is not None:
+			steps.append((state, label))
+			state, label = parent[state, label]
+		steps.reverse()
+		legs = []
+		previous_line = -1
+		for state, label in steps:
+			from_state, from_label = parent[state, label]
+			u, v = self.state_station[from_state], self.state_station[state]
+			line = self.state_line[state]
+			minutes = unpack_label(label)[0] - unpack_label(from_label)[0]
+			if line != -1 and line == previous_line:  # still on the same train
+				legs[-1] = (legs[-1][0], v, legs[-1][2], legs[-1][3] + minutes)
+			else:
+				legs.append((u, v, None if line == -1 else self.line_names[line], minutes))
+			previous_line = line
+		return legs
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time as timer
+
+	# A and D are joined by a fast route with a change (Red then Blue), a slow direct
+	# Green line, and a short walk from B to D.
+	stations = ['A', 'B', 'C', 'D']
+	links = []
+	for u, v, t, line in [('A', 'B', 3, 'Red'), ('B', 'D', 3, 'Blue'), ('A', 'C', 5, 'Green'), ('C', 'D', 6, 'Green')]:
+		links.append((stations.index(u), stations.index(v), t, line))
+		links.append((stations.index(v), stations.index(u), t, line))
+	footpaths = [(stations.index('B'), stations.index('D'), 5), (stations.index('D'), stations.index('B'), 5)]
+	router = ParetoRouter(len(stations), links, footpaths, interchange_minutes=2)
+	routes, stats = router.search(stations.index('A'), stations.index('D'))
+	for minutes, interchanges, walking, legs in routes:
+		print("%d min, %d interchanges, %d min walking:" % (minutes, interchanges, walking),
+				", ".join("%s %s->%s" % (line or "walk", stations[u], stations[v]) for u, v, line, _ in legs))
+	print(stats)
+	print()
+
+	# Brute force on small random networks: enumerate simple paths through (station, line) states.
+	def brute_force(router, a, b):
+		results = set()
+
+		def extend(state, minutes, boardings, walking, visited):
+			u = router.state_station[state]
+			if u == b:
+				results.add((minutes, max(0, boardings - 1), walking))
+				return
+			for v_state, link_minutes, line in router.rides[u]:
+				v = router.state_station[v_state]
+				if v in visited:
+					continue
+				if line == router.state_line[state]:
+					extend(v_state, minutes + link_minutes, boardings, walking, visited | {v})
+				else:
+					penalty = router.interchange_minutes if boardings else 0
+					extend(v_state, minutes + link_minutes + penalty, boardings + 1, walking, visited | {v})
+			for v, walk_minutes in router.walks[u]:
+				if v not in visited:
+					extend(v, minutes + walk_minutes, boardings, walking + walk_minutes, visited | {v})
+
+		extend(a, 0, 0, 0, {a})
+		return sorted(r for r in results if not any(o != r and all(x <= y for x, y in zip(o, r)) for o in results))
+
+	random.seed(1828)
+	for trial in range(200):
+		n = random.randint(2, 7)
+		links = []
+		for _ in range(random.randint(1, 2 * n)):
+			u, v = random.randrange(n), random.randrange(n)
+			if u != v:
+				links.append((u, v, random.randint(1, 9), random.choice('XYZ')))
+		footpaths = [(u, v, random.randint(1, 9)) for u, v in
+					 [(random.randrange(n), random.randrange(n)) for _ in range(random.randint(0, n))] if u != v]
+		router = ParetoRouter(n, links, footpaths, interchange_minutes=random.randint(0, 3))
+		a, b = random.randrange(n), random.randrange(n)
+		if a == b:
+			continue
+		routes, _ = router.search(a, b)
+		assert [route[:3] for route in routes] == brute_force(router, a, b), trial
+	print("random networks agree with brute force")
+
+	# Long journeys on a grid of lines: watch the labels grow, with and without a bound.
+	side = 30
+	links = []
+	for r in range(side):
+		for c in range(side):
+			u = r * side + c
+			if c + 1 < side:
+				links += [(u, u + 1, random.randint(1, 4), "row%d" % r), (u + 1, u, random.randint(1, 4), "row%d" % r)]
+			if r + 1 < side:
+				links += [(u, u + side, random.randint(1, 4), "col%d" % c), (u + side, u, random.randint(1, 4), "col%d" % c)]
+	footpaths = [(u, u + side + 1, 6) for u in range(side * side - side - 1) if u % side != side - 1]
+	for bound in [1000, 16]:
+		router = ParetoRouter(side * side, links, footpaths, interchange_minutes=2, max_labels_per_station=bound)
+		start = timer.perf_counter()
+		routes, stats = router.search(0, side * side - 1)
+		print("bound %d: %d routes in %.3f s" % (bound, len(routes), timer.perf_counter() - start))
+		print("  " + str(stats))
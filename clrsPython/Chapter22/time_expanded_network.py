@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# time_expanded_network.py
+
+"""Time-expanded timetable network and DAG shortest paths over it.
+
+Every scheduled departure of a train along a link (u, v) becomes two event
+nodes: a departure at u and an arrival at v, joined by a ride edge weighted by
+the run time.  The events at each station are chained in time order by wait
+edges weighted by the time between them.  Time only moves forward, so the graph
+is a DAG, and the nodes are numbered in order of (time, departures after
+arrivals) so that the numbering itself is a topological order.  Shortest
+paths from a departure event therefore need no topological sort and no heap: one
+pass over the nodes from the source onwards, relaxing each node's out-edges as
+in dag_shortest_paths.
+
+Departures on a line are phased so that trains run through: each station's
+phase is its running time from a root station of the line, so a train arriving
+at v at time t finds the line's next link leaving v at t as well.
+"""
+
+from bisect import bisect_left
+
+from clrsPython.UtilityFunctions.csr_graph import CSRGraph
+
+INF = float('inf')
+
+
+def dag_shortest_paths_topological(G, s, stop=None):
+	"""Solve single-source shortest paths on a DAG whose vertex numbers are a topological order.
+
+	Arguments:
+	G -- a weighted CSRGraph in which every edge (u, v) has u < v
+	s -- index of source vertex; vertices before s cannot be reached, so the pass starts at s
+	stop -- optional container of vertices; the pass ends once one of them has been reached,
+	at which point the distances of all vertices up to and including it are final
+
+	Returns:
+	d -- distances from source s (inf if unreached, or not reached before stopping)
+	pi -- predecessors
+	"""
+	card_V = G.get_card_V()
+	offsets, targets, weights = G.offsets, G.targets, G.weights
+	d = [INF] * card_V
+	pi = [None] * card_V
+	d[s] = 0
+	for u in range(s, card_V):
+		du = d[u]
+		if du == INF:
+			continue
+		if stop is not None and u in stop:
+			break
+		for i in range(offsets[u], offsets[u + 1]):
+			v = targets[i]
+			dv = du + weights[i]
+			if dv < d[v]:
+				d[v] = dv
+				pi[v] = u
+	return d, pi
+
+
+def _line_phases(links):
+	"""Return a dict mapping (line, u, v) to the departure phase of each directed link.
+
+	Within each connected piece of a line, offset[u] is the running time from a root
+	station along a breadth-first tree.  Trains heading away from the root leave u at
+	phase offset[u]; trains heading back leave at longest - offset[u].  Either way a
+	train's arrival at v matches the phase of the next link out of v, except across
+	the one non-tree link of a loop line.
+	"""
+	adjacent = {}
+	for u, v, run_time, line in links:
+		adjacent.setdefault(line, {}).setdefault(u, []).append((v, run_time))
+	phase = {}
+	for line, adj in adjacent.items():
+		offset = {}
+		for root in sorted(adj):
+			if root in offset:
+				continue
+			offset[root] = 0
+			piece = [root]
+			for u in piece:  # piece grows as a FIFO queue
+				for v, run_time in adj[u]:
+					if v not in offset:
+						offset[v] = offset[u] + run_time
+						piece.append(v)
+			longest = max(offset[u] for u in piece)
+			for u in piece:
+				for v, _run_time in adj[u]:
+					phase[line, u, v] = offset[u] if offset[v] >= offset[u] else longest - offset[u]
+	return phase
+
+
+def scheduled_trips(links, headways=None, default_headway=5, service_start=300, service_end=1440):
+	"""Return every scheduled departure along every link of a periodic timetable.
+
+	Arguments:
+	links -- iterable of directed links (u, v, run_time, line)
+	headways -- optional dict mapping a line to the minutes between its departures
+	default_headway -- headway for lines not in headways
+	service_start, service_end -- first and last departure time on every link, in
+	minutes after midnight
+
+	Returns:
+	A list of trips (u, v, departure, arrival, line), grouped by link.
+	"""
+	headways = headways or {}
+	links = list(links)
+	phase = _line_phases(links)
+	trips = []
+	for u, v, run_time, line in links:
+		headway = headways.get(line, default_headway)
+		first = service_start + phase[line, u, v] % headway
+		for t in range(first, service_end + 1, headway):
+			trips.append((u, v, t, t + run_time, line))
+	return trips
+
+
+class TimeExpandedNetwork:
+
+	def __init__(self, card_stations, links, headways=None, default_headway=5,
+				 service_start=300, service_end=1440):
+		"""Build the time-expanded network for a periodic timetable.
+
+		Arguments:
+		card_stations -- number of stations, numbered 0..card_stations-1
+		links -- iterable of directed links (u, v, run_time, line); run times must be positive
+		headways -- optional dict mapping a line to the minutes between its departures
+		default_headway -- headway for lines not in headways
+		service_start, service_end -- first and last departure time on every link, in
+		minutes after midnight
+		"""
+		self.card_stations = card_stations
+		self.service_start = service_start
+		self.service_end = service_end
+		trips = scheduled_trips(links, headways, default_headway, service_start, service_end)
+		self.trips = trips
+
+		# Events sorted by (time, kind); arrivals (kind 0) before departures (kind 1).
+		events = []
+		for k, (u, v, dep, arr, _line) in enumerate(trips):
+			events.append((dep, 1, u, k))
+			events.append((arr, 0, v, k))
+		events.sort()
+		card_V = len(events)
+		self.node_time = [event[0] for event in events]
+		self.node_station = [event[2] for event in events]
+		self.node_trip = [event[3] for event in events]
+		self.node_is_departure = bytearray(event[1] for event in events)
+
+		# Ride edges, then wait edges between consecutive events at a station.
+		departure_node = [0] * len(trips)
+		for x, event in enumerate(events):
+			if event[1] == 1:
+				departure_node[event[3]] = x
+		edges = []
+		station_events = [[] for _ in range(card_stations)]
+		for x, (t, kind, station, k) in enumerate(events):
+			if kind == 0:
+				edges.append((departure_node[k], x, t - trips[k][2]))
+			at_station = station_events[station]
+			if at_station:
+				previous = at_station[-1]
+				edges.append((previous, x, t - self.node_time[previous]))
+			at_station.append(x)
+		self.station_events = station_events
+		self.station_times = [[self.node_time[x] for x in nodes] for nodes in station_events]
+		self.G = CSRGraph.from_edges(card_V, edges, True, True)
+
+	def get_card_V(self):
+		"""Return the number of event nodes."""
+		return self.G.get_card_V()
+
+	def first_event(self, station, time):
+		"""Return the first event node at a station at or after the given time, or None."""
+		i = bisect_left(self.station_times[station], time)
+		if i == len(self.station_events[station]):
+			return None
+		return self.station_events[station][i]
+
+	def earliest_arrival(self, a, b, depart_time):
+		"""Return the earliest arrival at station b when leaving station a at depart_time.
+
+		Returns:
+		None if b cannot be reached within the service day, otherwise (arrival_time, legs)
+		where legs is a list of rides (from_station, to_station, departure, arrival, line),
+		consecutive links on the same train merged into one ride.
+		"""
+		if a == b:
+			return depart_time, []
+		s = self.first_event(a, depart_time)
+		if s is None:
+			return None
+		at_b = self.station_events[b]
+		first_b = bisect_left(self.station_times[b], self.node_time[s])
+		d, pi = dag_shortest_paths_topological(self.G, s, set(at_b[first_b:]))
+		for x in at_b[first_b:]:
+			if d[x] != INF:
+				return self.node_time[x], self._legs(pi, x)
+		return None
+
+	def earliest_arrivals_from(self, a, depart_time):
+		"""Return a list giving, for every station, the earliest arrival when leaving
+		station a at depart_time (inf if unreachable; depart_time for a itself)."""
+		result = [INF] * self.card_stations
+		result[a] = depart_time
+		s = self.first_event(a, depart_time)
+		if s is None:
+			return result
+		d, _ = dag_shortest_paths_topological(self.G, s)
+		node_time, node_station = self.node_time, self.node_station
+		for x in range(s, len(d)):
+			if d[x] != INF and node_time[x] < result[node_station[x]]:
+				result[node_station[x]] = node_time[x]
+		return result
+
+	def _legs(self, pi, x):
+		"""Return the rides on the path to event node x recorded in pi."""
+		legs = []
+		while pi[x] is not None:
+			y = pi[x]
+			if self.node_is_departure[y] and self.node_trip[y] == self.node_trip[x]:
+				u, v, dep, arr, line = self.trips[self.node_trip[x]]
+				if legs and legs[-1][0] == v and legs[-1][2] == arr and legs[-1][4] == line:
+					legs[-1] = (u, legs[-1][1], dep, legs[-1][3], line)
+				else:
+					legs.append((u, v, dep, arr, line))
+			x = y
+		legs.reverse()
+		return legs
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time as timer
+
+	# Small line A - B - C - D with a branch C - E on another line.
+	stations = ['A', 'B', 'C', 'D', 'E']
+	links = []
+	for u, v, t, line in [('A', 'B', 2, 'Red'), ('B', 'C', 3, 'Red'), ('C', 'D', 2, 'Red'), ('C', 'E', 4, 'Blue')]:
+		links.append((stations.index(u), stations.index(v), t, line))
+		links.append((stations.index(v), stations.index(u), t, line))
+	network = TimeExpandedNetwork(len(stations), links, {'Red': 5, 'Blue': 15}, service_start=480, service_end=600)
+	print(network.get_card_V(), "event nodes")
+	arrival, legs = network.earliest_arrival(stations.index('A'), stations.index('E'), 481)
+	print("A -> E leaving 481: arrive", arrival)  # 499: the Blue line leaves C at 495
+	for u, v, dep, arr, line in legs:
+		print("  %s %s -> %s  %d -> %d" % (line, stations[u], stations[v], dep, arr))
+	print(network.earliest_arrivals_from(stations.index('A'), 481))
+
+	# Random network: agree with a Dijkstra search over the same events.
+	import heapq
+	random.seed(1828)
+	n = 200
+	links = []
+	for u in range(1, n):
+		v = random.randrange(u)
+		t = random.randint(1, 6)
+		line = random.choice(['L1', 'L2', 'L3'])
+		links.append((u, v, t, line))
+		links.append((v, u, t, line))
+	start = timer.perf_counter()
+	network = TimeExpandedNetwork(n, links, {'L1': 3, 'L2': 4, 'L3': 7})
+	print(network.get_card_V(), "event nodes built in %.3f s" % (timer.perf_counter() - start))
+	G = network.G
+	dag_time = heap_time = 0
+	for trial in range(20):
+		a, b = random.randrange(n), random.randrange(n)
+		depart = random.randint(300, 1200)
+		start = timer.perf_counter()
+		result = network.earliest_arrival(a, b, depart)
+		dag_time += timer.perf_counter() - start
+
+		start = timer.perf_counter()
+		s = network.first_event(a, depart)
+		d = {s: 0}
+		heap = [(0, s)]
+		best = INF if a != b else depart
+		while heap and a != b:
+			du, u = heapq.heappop(heap)
+			if du > d[u]:
+				continue
+			if network.node_station[u] == b:
+				best = network.node_time[u]
+				break
+			for i in range(G.offsets[u], G.offsets[u + 1]):
+				v = G.targets[i]
+				if du + G.weights[i] < d.get(v, INF):
+					d[v] = du + G.weights[i]
+					heapq.heappush(heap, (d[v], v))
+		heap_time += timer.perf_counter() - start
+		assert (INF if result is None else result[0]) == best
+	print("20 queries agree with Dijkstra; DAG pass %.3f s, Dijkstra %.3f s" % (dag_time, heap_time))
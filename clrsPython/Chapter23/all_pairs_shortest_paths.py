@@ -92,6 +92,90 @@ def faster_apsp(W, n):
 	return L
 
 
+def min_plus_product(A, B, max_block_elements=1 << 22):
+	"""Return the min-plus product C of two NumPy arrays: C[i,j] = min over k of A[i,k] + B[k,j].
+
+	The same computation as extend_shortest_paths, vectorized with NumPy.  Broadcasting
+	a block of rows of A against a block of rows of B creates a temporary array of
+	shape (rows, ks, columns), so the rows and ks are split into blocks that keep the
+	temporary at no more than max_block_elements entries.
+
+	Arguments:
+	A -- an n x m array
+	B -- an m x p array
+	max_block_elements -- bound on the size of any temporary array
+	"""
+	n, m = A.shape
+	p = B.shape[1]
+	C = np.full((n, p), np.inf, dtype=np.result_type(A, B, np.float64))
+	if n == 0 or m == 0 or p == 0:
+		return C
+	k_block = max(1, min(m, max_block_elements // p))
+	i_block = max(1, min(n, max_block_elements // (k_block * p)))
+	for i in range(0, n, i_block):
+		rows = slice(i, min(n, i + i_block))
+		for k in range(0, m, k_block):
+			ks = slice(k, min(m, k + k_block))
+			# Temporary of shape (rows, ks, p); reduce over the ks axis.
+			candidate = (A[rows, ks, np.newaxis] + B[np.newaxis, ks, :]).min(axis=1)
+			np.minimum(C[rows], candidate, out=C[rows])
+	return C
+
+
+def faster_apsp_np(W, n, max_block_elements=1 << 22):
+	"""Compute all-pairs shortest paths by repeated squaring with min_plus_product.
+
+	Like faster_apsp, but each squaring is vectorized, and the squaring stops as
+	soon as a square equals its input, which happens once every shortest path is
+	covered (often after far fewer than lg(n-1) squarings).
+
+	Arguments:
+	W -- the weighted adjacency matrix for the graph, but with 0 on the diagonal
+	n -- each matrix is n x n
+	Returns:
+	L -- matrix of shortest-path weights
+	"""
+	L = np.array(W, dtype=np.float64)
+	r = 1
+	while r < n-1:
+		M = min_plus_product(L, L, max_block_elements)  # compute M = L^2
+		r *= 2
+		if np.array_equal(M, L):  # converged: further squarings change nothing
+			break
+		L = M
+	return L
+
+
+def bounded_hop_apsp(W, n, k, max_block_elements=1 << 22):
+	"""Compute shortest-path weights over paths of at most k edges (legs).
+
+	Because W has 0 on the diagonal, the k-th min-plus power of W holds the
+	shortest paths with at most k edges.  It is computed by binary exponentiation
+	(O(lg k) products), stopping early once the powers stop changing.
+
+	Arguments:
+	W -- the weighted adjacency matrix for the graph, but with 0 on the diagonal
+	n -- each matrix is n x n
+	k -- maximum number of edges on a path (k >= 0)
+	Returns:
+	L -- matrix where L[i,j] is the weight of a shortest path from i to j using at
+	most k edges, or infinity if no such path exists
+	"""
+	result = initialize_L_0(n)  # paths of 0 edges
+	power = np.array(W, dtype=np.float64)  # paths of at most 1 edge
+	while k > 0:
+		if k & 1:
+			result = min_plus_product(result, power, max_block_elements)
+		k >>= 1
+		if k == 0:
+			break
+		square = min_plus_product(power, power, max_block_elements)
+		if np.array_equal(square, power):  # power already covers all shortest paths
+			return min_plus_product(result, power, max_block_elements)
+		power = square
+	return result
+
+
 def initialize_L_0(n):
 	"""Create and return the L_0 matrix, with 0 on the diagonal and infinity everywhere else."""
 	L_0 = np.ndarray((n,n))
@@ -131,6 +215,9 @@ if __name__ == "__main__":
 	faster_L = faster_apsp(W, n)
 	print(faster_L)
 	print(np.array_equal(slow_L, faster_L))
+	print(np.array_equal(faster_L, faster_apsp_np(W, n)))
+	print(bounded_hop_apsp(W, n, 1))  # same as W
+	print(bounded_hop_apsp(W, n, 2))
 	print()
 
 	# Larger example.
@@ -145,3 +232,17 @@ if __name__ == "__main__":
 	faster_L = faster_apsp(W, n)
 	print(faster_L)
 	print(np.array_equal(slow_L, faster_L))
+	print(np.array_equal(faster_L, faster_apsp_np(W, n)))
+	print(np.array_equal(faster_L, bounded_hop_apsp(W, n, n - 1)))
+	print()
+
+	# Larger graph, vectorized only.
+	import time as timer
+	n = 600
+	graph3 = generate_random_graph(n, 0.02, False, True, True, 1, 30)
+	W = create_W(graph3, n)
+	start = timer.perf_counter()
+	L = faster_apsp_np(W, n)
+	print(n, "vertices: faster_apsp_np %.3f s" % (timer.perf_counter() - start))
+	L_3 = bounded_hop_apsp(W, n, 3)
+	print("pairs reachable in at most 3 edges:", int(np.isfinite(L_3).sum()), "of", int(np.isfinite(L).sum()))
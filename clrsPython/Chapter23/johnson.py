@@ -31,6 +31,7 @@
 #########################################################################
 
 import numpy as np
+from adjacency_list_graph import AdjacencyListGraph
 from bellman_ford import bellman_ford
 from dijkstra import dijkstra
 
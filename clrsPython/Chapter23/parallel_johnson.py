@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# parallel_johnson.py
+
+"""Johnson's algorithm with the per-source Dijkstra runs spread over a process pool.
+
+The potentials h are computed once with Bellman-Ford from a virtual source joined to
+every vertex by 0-weight edges.  The reweighted graph w'(u, v) = w(u, v) + h(u) - h(v)
+is stored as CSR arrays in shared memory, together with a preallocated n x n result
+matrix, so workers attach to both by name instead of receiving pickled copies.  Each
+worker runs Dijkstra (binary heap) for a chunk of sources and writes the
+un-reweighted distances d(u, v) = d'(u, v) - h(u) + h(v) straight into the shared
+result.
+"""
+
+import heapq
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+from clrsPython.UtilityFunctions.csr_graph import CSRGraph
+
+
+def johnson_potentials(G):
+	"""Return the list h of Johnson potentials for a weighted CSR graph.
+
+	Bellman-Ford from a virtual source with 0-weight edges to every vertex, so all
+	distances start at 0.  Passes stop as soon as one changes nothing.  Raises
+	RuntimeError if there is a negative-weight cycle.
+	"""
+	card_V = G.get_card_V()
+	offsets, targets, weights = G.offsets, G.targets, G.weights
+	h = [0] * card_V
+	for _ in range(card_V + 1):  # card_V + 1 vertices including the virtual source
+		changed = False
+		for u in range(card_V):
+			hu = h[u]
+			for i in range(offsets[u], offsets[u + 1]):
+				v = targets[i]
+				if hu + weights[i] < h[v]:
+					h[v] = hu + weights[i]
+					changed = True
+		if not changed:
+			return h
+	raise RuntimeError("The input graph contains a negative-weight cycle.")
+
+
+def _dijkstra_row(source, offsets, targets, weights, card_V):
+	"""Dijkstra's algorithm with a binary heap and lazy deletion; returns the distance list."""
+	inf = float('inf')
+	d = [inf] * card_V
+	d[source] = 0.0
+	done = bytearray(card_V)
+	heap = [(0.0, source)]
+	while heap:
+		du, u = heapq.heappop(heap)
+		if done[u]:
+			continue
+		done[u] = 1
+		for i in range(offsets[u], offsets[u + 1]):
+			v = targets[i]
+			dv = du + weights[i]
+			if dv < d[v]:
+				d[v] = dv
+				heapq.heappush(heap, (dv, v))
+	return d
+
+
+# Per-worker view of the shared arrays, set up once by _attach.
+_shared = {}
+
+
+def _attach(names, card_V, card_E):
+	"""Pool initializer: map the shared blocks and keep Python-list copies of the small CSR arrays."""
+	blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+	_shared["blocks"] = blocks  # keep the mappings alive
+	_shared["offsets"] = np.ndarray((card_V + 1,), dtype=np.int64, buffer=blocks["offsets"].buf).tolist()
+	_shared["targets"] = np.ndarray((card_E,), dtype=np.int64, buffer=blocks["targets"].buf).tolist()
+	_shared["weights"] = np.ndarray((card_E,), dtype=np.float64, buffer=blocks["weights"].buf).tolist()
+	_shared["h"] = np.ndarray((card_V,), dtype=np.float64, buffer=blocks["h"].buf)
+	_shared["result"] = np.ndarray((card_V, card_V), dtype=np.float64, buffer=blocks["result"].buf)
+	_shared["card_V"] = card_V
+
+
+def _solve_sources(sources):
+	"""Run Dijkstra from each source and write the un-reweighted row into the shared result."""
+	h = _shared["h"]
+	result = _shared["result"]
+	for u in sources:
+		row = _dijkstra_row(u, _shared["offsets"], _shared["targets"], _shared["weights"], _shared["card_V"])
+		result[u] = np.asarray(row) + h - h[u]
+	return len(sources)
+
+
+def johnson_parallel(G, processes=None, chunk_size=None):
+	"""Compute all-pairs shortest paths with Johnson's algorithm, Dijkstra runs in parallel.
+
+	Arguments:
+	G -- a weighted, directed graph: a CSRGraph or an AdjacencyListGraph
+	processes -- number of worker processes (default os.cpu_count()); 1 runs in this process
+	chunk_size -- sources per task (default spreads the sources over about 4 tasks per worker)
+
+	Returns:
+	An n x n NumPy array of shortest-path weights (inf where there is no path).
+	Raises RuntimeError if G contains a negative-weight cycle.
+	"""
+	if not isinstance(G, CSRGraph):
+		G = CSRGraph.from_adjacency_list_graph(G)
+	card_V = G.get_card_V()
+	card_E = len(G.targets)
+	h = johnson_potentials(G)
+
+	# Reweight once: w'(u, v) = w(u, v) + h(u) - h(v) >= 0.
+	offsets = np.asarray(G.offsets, dtype=np.int64)
+	targets = np.asarray(G.targets, dtype=np.int64)
+	tails = np.repeat(np.arange(card_V, dtype=np.int64), np.diff(offsets))
+	h_array = np.asarray(h, dtype=np.float64)
+	weights = np.asarray(G.weights, dtype=np.float64) + h_array[tails] - h_array[targets]
+
+	if processes is None:
+		processes = os.cpu_count() or 1
+	if processes <= 1 or card_V < 2:
+		result = np.empty((card_V, card_V))
+		offsets_list, targets_list, weights_list = offsets.tolist(), targets.tolist(), weights.tolist()
+		for u in range(card_V):
+			result[u] = np.asarray(_dijkstra_row(u, offsets_list, targets_list, weights_list, card_V)) + h_array - h_array[u]
+		return result
+
+	# Publish the reweighted graph, the potentials and the result matrix in shared memory.
+	arrays = {"offsets": offsets, "targets": targets, "weights": weights, "h": h_array}
+	blocks = {}
+	try:
+		for key, array in arrays.items():
+			blocks[key] = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+			np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[key].buf)[:] = array
+		blocks["result"] = shared_memory.SharedMemory(create=True, size=card_V * card_V * 8)
+		result = np.ndarray((card_V, card_V), dtype=np.float64, buffer=blocks["result"].buf)
+
+		if chunk_size is None:
+			chunk_size = max(1, card_V // (4 * processes))
+		chunks = [range(u, min(card_V, u + chunk_size)) for u in range(0, card_V, chunk_size)]
+		names = {key: block.name for key, block in blocks.items()}
+		with Pool(processes, initializer=_attach, initargs=(names, card_V, card_E)) as pool:
+			for _ in pool.imap_unordered(_solve_sources, chunks):
+				pass
+		return result.copy()
+	finally:
+		for block in blocks.values():
+			block.close()
+			block.unlink()
+
+
+# Testing
+if __name__ == "__main__":
+
+	import time as timer
+	from adjacency_list_graph import AdjacencyListGraph
+	from all_pairs_shortest_paths import create_W
+	from floyd_warshall import floyd_warshall
+	from johnson import johnson
+
+	# Textbook example
+	vertices = [1, 2, 3, 4, 5]
+	edges = [(1, 2, 3), (1, 3, 8), (1, 5, -4), (2, 4, 1), (2, 5, 7),
+				(3, 2, 4), (4, 1, 2), (4, 3, -5), (5, 4, 6)]
+	graph1 = AdjacencyListGraph(len(vertices), True, True)
+	for edge in edges:
+		graph1.insert_edge(vertices.index(edge[0]), vertices.index(edge[1]), edge[2])
+	parallel_d = johnson_parallel(graph1, processes=2)
+	print(parallel_d)
+	fw_d = floyd_warshall(create_W(graph1.adjacency_matrix(), len(vertices)), len(vertices))
+	print(np.array_equal(parallel_d, fw_d))
+
+	# Larger example with negative weights but no negative-weight cycle: shifting
+	# nonnegative weights by w + p(u) - p(v) leaves every cycle's weight unchanged.
+	import random
+	n = 300
+	p = [random.randint(0, 8) for _ in range(n)]
+	graph2 = AdjacencyListGraph(n, True, True)
+	for u, v in {(random.randrange(n), random.randrange(n)) for _ in range(10 * n)}:
+		graph2.insert_edge(u, v, random.randint(0, 20) + p[u] - p[v])
+	try:
+		start = timer.perf_counter()
+		parallel_d = johnson_parallel(graph2)
+		parallel_time = timer.perf_counter() - start
+		start = timer.perf_counter()
+		sequential_d = johnson(graph2)
+		sequential_time = timer.perf_counter() - start
+		print(np.array_equal(sequential_d, parallel_d))
+		print("johnson: %.3f s, johnson_parallel (%d processes): %.3f s"
+				% (sequential_time, os.cpu_count(), parallel_time))
+	except RuntimeError as e:
+		print(e)
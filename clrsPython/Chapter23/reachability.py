@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# reachability.py
+
+"""Transitive closure of a directed graph with bit-parallel rows.
+
+Vertices in the same strongly connected component reach exactly the same set of
+vertices, so the closure is computed on the component graph.  Tarjan's algorithm
+numbers the components in reverse topological order (sinks first), so one pass in
+that order can set each component's row to its own bit ORed with the rows of its
+successors.  A row is a Python int used as a bitset over components, so each OR
+handles 64 components per machine word.  The cost is O(V + E) for the components
+plus O(E_C * C / 64) word operations for the rows, where C and E_C are the numbers
+of components and component edges, instead of the O(V^3) of transitive_closure.
+
+The finished rows are packed into a card_C x ceil(card_C / 64) uint64 NumPy
+matrix, and each vertex keeps the word and bit mask of its component.  So a
+reachable(u, v) query reads one word and tests one bit, in O(1) time.
+"""
+
+import numpy as np
+from clrsPython.UtilityFunctions.csr_graph import CSRGraph
+
+
+def strongly_connected_component_ids(G):
+	"""Label each vertex of a CSR graph with its strongly connected component.
+
+	Iterative Tarjan, with a per-vertex position into its neighbor list in place
+	of recursion.
+
+	Returns:
+	comp -- list giving each vertex's component, numbered 0..card_C-1 in reverse
+	topological order of the component graph (every edge goes from a higher or
+	equal number to a lower or equal one)
+	card_C -- number of components
+	"""
+	offsets, targets = G.offsets, G.targets
+	card_V = G.get_card_V()
+	index = [-1] * card_V
+	low = [0] * card_V
+	pos = offsets[:-1]  # next edge to examine for each vertex
+	on_stack = bytearray(card_V)
+	stack = []
+	comp = [-1] * card_V
+	card_C = 0
+	counter = 0
+
+	for s in range(card_V):
+		if index[s] != -1:
+			continue
+		index[s] = low[s] = counter
+		counter += 1
+		stack.append(s)
+		on_stack[s] = 1
+		work = [s]
+		while work:
+			u = work[-1]
+			end = offsets[u + 1]
+			i = pos[u]
+			while i < end:
+				v = targets[i]
+				i += 1
+				if index[v] == -1:
+					index[v] = low[v] = counter
+					counter += 1
+					stack.append(v)
+					on_stack[v] = 1
+					work.append(v)
+					break
+				if on_stack[v] and index[v] < low[u]:
+					low[u] = index[v]
+			pos[u] = i
+			if work[-1] != u:  # descended into a new vertex
+				continue
+			work.pop()
+			if work and low[u] < low[work[-1]]:
+				low[work[-1]] = low[u]
+			if low[u] == index[u]:
+				while True:
+					w = stack.pop()
+					on_stack[w] = 0
+					comp[w] = card_C
+					if w == u:
+						break
+				card_C += 1
+	return comp, card_C
+
+
+class ReachabilityIndex:
+
+	def __init__(self, G):
+		"""Compute the transitive closure of a directed graph.
+
+		Arguments:
+		G -- a directed CSRGraph, or an AdjacencyListGraph (converted to CSR)
+		"""
+		if not isinstance(G, CSRGraph):
+			G = CSRGraph.from_adjacency_list_graph(G)
+		self.card_V = G.get_card_V()
+		self.comp, self.card_C = strongly_connected_component_ids(G)
+
+		members = [[] for _ in range(self.card_C)]
+		for u, c in enumerate(self.comp):
+			members[c].append(u)
+		self.members = members
+
+		# Sinks come first, so every successor's row is final before it is used.
+		offsets, targets, comp = G.offsets, G.targets, self.comp
+		rows = [0] * self.card_C
+		for c in range(self.card_C):
+			row = 1 << c
+			seen = {c}
+			for u in members[c]:
+				for v in targets[offsets[u]:offsets[u + 1]]:
+					d = comp[v]
+					if d not in seen:
+						seen.add(d)
+						row |= rows[d]
+			rows[c] = row
+
+		# Pack the rows into 64-bit words; vertex v's bit is mask[v] in word word[v] of a row.
+		self.words = (self.card_C + 63) // 64
+		packed = np.zeros((self.card_C, self.words), dtype=np.uint64)
+		for c, row in enumerate(rows):
+			packed[c] = np.frombuffer(row.to_bytes(8 * self.words, 'little'), dtype='<u8')
+		self.packed = packed
+		comp_array = np.array(self.comp, dtype=np.int64)
+		self.word = (comp_array >> 6).tolist()
+		self.mask = np.left_shift(np.uint64(1), (comp_array & 63).astype(np.uint64))
+
+	def reachable(self, u, v):
+		"""Return True if there is a path from u to v (every vertex reaches itself)."""
+		return bool(self.packed[self.comp[u], self.word[v]] & self.mask[v])
+
+	def reachable_from(self, u):
+		"""Return a sorted list of the vertices reachable from u."""
+		row = int.from_bytes(self.packed[self.comp[u]].astype('<u8').tobytes(), 'little')
+		result = []
+		while row:
+			low_bit = row & -row
+			result.extend(self.members[low_bit.bit_length() - 1])
+			row ^= low_bit
+		result.sort()
+		return result
+
+	def packed_rows(self):
+		"""Return the component closure as a card_C x ceil(card_C / 64) uint64 NumPy array;
+		bit d of row c (little-endian within and across words) is set if c reaches d."""
+		return self.packed.copy()
+
+	def closure_matrix(self):
+		"""Return the n x n boolean closure matrix, in the same form as transitive_closure."""
+		packed = self.packed.astype('<u8').view(np.uint8)
+		by_component = np.unpackbits(packed, axis=1, bitorder='little')[:, :self.card_C].astype(bool)
+		comp = np.array(self.comp, dtype=np.intp)
+		return by_component[np.ix_(comp, comp)]
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import time as timer
+	from adjacency_matrix_graph import AdjacencyMatrixGraph
+	from floyd_warshall import transitive_closure
+
+	# Textbook example for transitive closure.
+	vertices = [1, 2, 3, 4]
+	edges = [(2, 3), (2, 4), (3, 2), (4, 1), (4, 3)]
+	pairs = [(vertices.index(a), vertices.index(b)) for a, b in edges]
+	index = ReachabilityIndex(CSRGraph.from_edges(len(vertices), pairs))
+	print(index.closure_matrix())
+	print(index.reachable(1, 0), index.reachable(0, 1))  # True False
+	print([vertices[v] for v in index.reachable_from(2)])  # [1, 2, 3, 4]
+
+	# Random graphs: agree with transitive_closure.
+	random.seed(1828)
+	n = 60
+	for trial in range(5):
+		pairs = set()
+		for _ in range(random.randint(0, 2 * n)):
+			pairs.add((random.randrange(n), random.randrange(n)))
+		graph = AdjacencyMatrixGraph(n, True)
+		for u, v in pairs:
+			graph.insert_edge(u, v)
+		index = ReachabilityIndex(CSRGraph.from_edges(n, sorted(pairs)))
+		closure = transitive_closure(graph, n)
+		assert all(index.reachable(u, v) == closure[u][v] for u in range(n) for v in range(n))
+		print(np.array_equal(index.closure_matrix(), closure), end=' ')
+	print()
+
+	# Larger sparse directed graph.
+	n = 20000
+	pairs = [(random.randrange(n), random.randrange(n)) for _ in range(3 * n)]
+	start = timer.perf_counter()
+	index = ReachabilityIndex(CSRGraph.from_edges(n, pairs))
+	print(n, "vertices,", len(pairs), "edges,", index.card_C, "components: %.3f s" % (timer.perf_counter() - start))
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# sa_is.py
+
+"""Linear-time suffix array construction by induced sorting (SA-IS), and substring search.
+
+SA-IS (Nong, Zhang and Chan) classifies each suffix as S-type (smaller than the
+next suffix) or L-type (larger).  An S-type suffix just after an L-type one is
+leftmost-S (LMS).  Once the LMS suffixes are in sorted order, two left-to-right
+and right-to-left passes over bucketed positions induce the order of all the
+others.  Sorting the LMS substrings by induction, naming them, and recursing on
+the string of names (at most half as long) gives the LMS order, so the total
+time is O(n).  The text must be integer-encoded; encode_text does that for a
+string or a sequence of comparable items.
+
+SuffixArrayIndex keeps the text, its suffix array, and its LCP array (from
+suffix_array.compute_lcp, which is Kasai's algorithm).  It finds the block of
+suffixes that start with a pattern by binary search on the suffix array, as
+Manber and Myers do.  The binary search always visits the same tree of (L, M, R)
+triples, so the LCP array gives, for each midpoint M, the longest common prefix
+of SA[M] with SA[L] and with SA[R] (the LCP-LR arrays).  The search tracks how
+many pattern characters match at L and at R.  Comparing those with the LCP-LR
+values usually decides the side of M without looking at the text, and otherwise
+the comparison starts after the characters already matched.  A query takes
+O(m + lg n) time.
+"""
+
+from bisect import bisect_right
+
+from clrsPython.Chapter32.suffix_array import compute_lcp
+
+
+def encode_text(T):
+    """Map the characters of T to ranks 0, 1, ..., K-1 in sorted order.
+
+    Returns:
+    codes -- list with codes[i] the rank of T[i]
+    code_of -- dictionary from character to rank
+    """
+    code_of = {c: rank for rank, c in enumerate(sorted(set(T)))}
+    return [code_of[c] for c in T], code_of
+
+
+def sa_is(s, upper):
+    """Compute the suffix array of the integer sequence s in O(n + upper) time.
+
+    Arguments:
+    s -- list of integers in the range 0 to upper
+    upper -- largest value that may appear in s
+
+    Returns:
+    The suffix array SA: if SA[i] = j, then s[j:] is the ith suffix of s in lexicographic order.
+    """
+    n = len(s)
+    if n == 0:
+        return []
+    if n == 1:
+        return [0]
+    if n == 2:
+        return [0, 1] if s[0] < s[1] else [1, 0]
+
+    # is_s[i] is True if s[i:] is S-type (smaller than s[i+1:]).  The last suffix is L-type.
+    is_s = [False] * n
+    for i in range(n - 2, -1, -1):
+        is_s[i] = is_s[i + 1] if s[i] == s[i + 1] else s[i] < s[i + 1]
+
+    # Bucket boundaries: each character's bucket holds its L-type suffixes, then its S-type suffixes.
+    start_l = [0] * (upper + 2)  # start of the L-type part of each bucket
+    start_s = [0] * (upper + 1)  # start of the S-type part of each bucket
+    for i in range(n):
+        if is_s[i]:
+            start_l[s[i] + 1] += 1
+        else:
+            start_s[s[i]] += 1
+    for c in range(upper + 1):
+        start_s[c] += start_l[c]
+        start_l[c + 1] += start_s[c]
+
+    sa = [-1] * n
+
+    def induce(lms):
+        """Place the LMS suffixes in the given order, then induce L-type and S-type suffixes."""
+        for i in range(n):
+            sa[i] = -1
+        tail = start_s[:]
+        for j in lms:  # LMS suffixes into the S-type parts of their buckets
+            sa[tail[s[j]]] = j
+            tail[s[j]] += 1
+        head = start_l[:]
+        sa[head[s[n - 1]]] = n - 1  # the last suffix is L-type and smallest in its bucket
+        head[s[n - 1]] += 1
+        for i in range(n):  # L-type suffixes, left to right
+            j = sa[i] - 1
+            if j >= 0 and not is_s[j]:
+                sa[head[s[j]]] = j
+                head[s[j]] += 1
+        end = start_l[:]
+        for i in range(n - 1, -1, -1):  # S-type suffixes, right to left, into bucket ends
+            j = sa[i] - 1
+            if j >= 0 and is_s[j]:
+                end[s[j] + 1] -= 1
+                sa[end[s[j] + 1]] = j
+
+    lms_index = [-1] * (n + 1)  # position of each LMS suffix in the list lms; -1 otherwise
+    lms = []
+    for i in range(1, n):
+        if is_s[i] and not is_s[i - 1]:
+            lms_index[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+    induce(lms)
+
+    if m > 0:
+        # The induced order sorts the LMS substrings.  Name them, equal substrings getting equal names.
+        sorted_lms = [j for j in sa if lms_index[j] != -1]
+        names = [0] * m
+        name = 0
+        names[lms_index[sorted_lms[0]]] = 0
+        for k in range(1, m):
+            left, right = sorted_lms[k - 1], sorted_lms[k]
+            end_left = lms[lms_index[left] + 1] if lms_index[left] + 1 < m else n
+            end_right = lms[lms_index[right] + 1] if lms_index[right] + 1 < m else n
+            same = end_left - left == end_right - right
+            if same:
+                while left < end_left and s[left] == s[right]:
+                    left += 1
+                    right += 1
+                same = left < n and s[left] == s[right]
+            if not same:
+                name += 1
+            names[lms_index[sorted_lms[k]]] = name
+
+        # Sort the LMS suffixes by recursing on their names, then induce the final order.
+        reduced_sa = sa_is(names, name)
+        induce([lms[k] for k in reduced_sa])
+
+    return sa
+
+
+class SuffixArrayIndex:
+
+    def __init__(self, T):
+        """Index the string or sequence T for substring queries."""
+        self.text = T
+        self.codes, self.code_of = encode_text(T)
+        self.n = len(T)
+        self.SA = sa_is(self.codes, max(len(self.code_of) - 1, 0))
+        self.LCP = compute_lcp(self.codes, self.SA, self.n) if self.n > 0 else []
+        self.left_lcp = [0] * self.n  # left_lcp[M]: LCP of suffixes SA[L] and SA[M] in the search tree
+        self.right_lcp = [0] * self.n  # right_lcp[M]: LCP of suffixes SA[M] and SA[R] in the search tree
+        if self.n > 2:
+            self._fill_lcp_lr(0, self.n - 1)
+        self.starts = [0]  # starting positions of documents, if built by from_documents
+
+    def _fill_lcp_lr(self, L, R):
+        """Fill left_lcp and right_lcp for the midpoints of the search between SA[L] and SA[R].
+        Return the LCP of suffixes SA[L] and SA[R], the minimum of LCP[L+1..R]."""
+        if R - L == 1:
+            return self.LCP[R]
+        M = (L + R) // 2
+        self.left_lcp[M] = self._fill_lcp_lr(L, M)
+        self.right_lcp[M] = self._fill_lcp_lr(M, R)
+        return min(self.left_lcp[M], self.right_lcp[M])
+
+    @classmethod
+    def from_documents(cls, documents, separator="\n"):
+        """Index the concatenation of strings separated by separator; see document_at."""
+        index = cls(separator.join(documents))
+        position = 0
+        index.starts = []
+        for document in documents:
+            index.starts.append(position)
+            position += len(document) + len(separator)
+        return index
+
+    def _compare(self, P, i, k):
+        """Compare P with the suffix starting at i, knowing the first k characters match.
+
+        Returns:
+        k -- the length of the longest common prefix of P and the suffix
+        sign -- 0 if the suffix starts with P, -1 if the suffix is smaller than P, 1 if larger
+        """
+        codes, n, m = self.codes, self.n, len(P)
+        while k < m and i + k < n and codes[i + k] == P[k]:
+            k += 1
+        if k == m:
+            return k, 0
+        if i + k == n or codes[i + k] < P[k]:
+            return k, -1
+        return k, 1
+
+    def _bound(self, P, upper):
+        """Return the first index in SA whose suffix is not smaller than P (upper=False),
+        or the first one that is larger than P and does not start with it (upper=True)."""
+        SA, n = self.SA, self.n
+        if n == 0:
+            return 0
+
+        def before(sign):  # does a suffix with this comparison result come before the boundary?
+            return sign < 0 or (upper and sign == 0)
+
+        l, sign = self._compare(P, SA[0], 0)
+        if not before(sign):
+            return 0
+        r, sign = self._compare(P, SA[n - 1], 0)
+        if before(sign):
+            return n
+        # Now SA[L] is before the boundary and SA[R] is not; l and r are P's matched lengths there.
+        L, R = 0, n - 1
+        left_lcp, right_lcp = self.left_lcp, self.right_lcp
+        while R - L > 1:
+            M = (L + R) // 2
+            if l >= r:
+                if left_lcp[M] > l:  # SA[M] agrees with SA[L] past where SA[L] leaves P
+                    L = M
+                    continue
+                if left_lcp[M] < l:  # SA[M] leaves SA[L], and P, upward at left_lcp[M]
+                    R, r = M, left_lcp[M]
+                    continue
+                k, sign = self._compare(P, SA[M], l)
+            else:
+                if right_lcp[M] > r:  # SA[M] agrees with SA[R] past where SA[R] leaves P
+                    R = M
+                    continue
+                if right_lcp[M] < r:  # SA[M] leaves SA[R], and P, downward at right_lcp[M]
+                    L, l = M, right_lcp[M]
+                    continue
+                k, sign = self._compare(P, SA[M], r)
+            if before(sign):
+                L, l = M, k
+            else:
+                R, r = M, k
+        return R
+
+    def _encode(self, P):
+        """Encode P with the text's codes, or return None if P uses a character not in the text."""
+        code_of = self.code_of
+        codes = [code_of.get(c, -1) for c in P]
+        return None if -1 in codes else codes
+
+    def find_range(self, P):
+        """Return (lo, hi) such that SA[lo:hi] are the starting positions of occurrences of P."""
+        codes = self._encode(P)
+        if codes is None:
+            return 0, 0
+        lo = self._bound(codes, False)
+        hi = self._bound(codes, True)
+        return lo, hi
+
+    def count(self, P):
+        """Return the number of occurrences of P in the text."""
+        lo, hi = self.find_range(P)
+        return hi - lo
+
+    def locate(self, P):
+        """Return the sorted starting positions of the occurrences of P in the text."""
+        lo, hi = self.find_range(P)
+        return sorted(self.SA[lo:hi])
+
+    def __contains__(self, P):
+        return self.count(P) > 0
+
+    def document_at(self, position):
+        """Return (document number, offset within it) for a text position of a from_documents index."""
+        d = bisect_right(self.starts, position) - 1
+        return d, position - self.starts[d]
+
+    def longest_repeated_substring(self):
+        """Return a longest substring that occurs at least twice (using the LCP array)."""
+        if self.n < 2:
+            return self.text[:0]
+        i = max(range(self.n), key=self.LCP.__getitem__)
+        return self.text[self.SA[i]:self.SA[i] + self.LCP[i]]
+
+
+# Testing
+if __name__ == "__main__":
+    import os
+    import random
+    import time
+
+    from clrsPython.Chapter32.suffix_array import compute_suffix_array
+
+    for T in ["ratatat", "bippityboppityboo", "aaaaaa"]:
+        index = SuffixArrayIndex(T)
+        print(index.SA, index.LCP)  # same as suffix_array.py
+        assert index.SA == compute_suffix_array(T, len(T))
+
+    # Random texts against sorted suffixes and str.startswith at every position.
+    random.seed(48)
+    for _ in range(1000):
+        T = "".join(random.choice("abc") for _ in range(random.randint(0, 40)))
+        index = SuffixArrayIndex(T)
+        assert index.SA == sorted(range(len(T)), key=lambda i: T[i:])
+        for P in ["a", "ab", "bca", "cc", "d", T[3:7]]:
+            if P:
+                assert index.locate(P) == [i for i in range(len(T)) if T.startswith(P, i)]
+    print("SA-IS and searches agree with brute force")
+
+    # Build time against prefix doubling.
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Chapter15", "moby-dick.txt")) as f:
+        book = f.read()
+    text = book[:100000]
+    start = time.perf_counter()
+    doubling = compute_suffix_array(text, len(text))
+    doubling_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index = SuffixArrayIndex(text)
+    print("%d characters: prefix doubling %.2f s, SA-IS %.2f s (with LCP), same: %s"
+          % (len(text), doubling_time, time.perf_counter() - start, index.SA == doubling))
+
+    start = time.perf_counter()
+    index = SuffixArrayIndex(book)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    counts = [index.count(word) for word in ["whale", "Ahab", "the sea", "harpoon", "Queequeg", "Starbuck"] * 100]
+    print("%d characters indexed in %.1f s; %s; %.1f us per query"
+          % (len(book), build, counts[:6], (time.perf_counter() - start) / len(counts) * 1e6))
+    print("longest repeated substring:", repr(index.longest_repeated_substring()[:60]))
+
+    reports = ["Signal failure at King's Cross", "Severe delays near Bank", "Bank station closed", "Delays at Kingsbury"]
+    corpus = SuffixArrayIndex.from_documents(reports)
+    print([corpus.document_at(i) for i in corpus.locate("Bank")])  # [(1, 19), (2, 0)]
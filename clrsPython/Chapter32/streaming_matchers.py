@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# streaming_matchers.py
+
+"""String matching over text that arrives in chunks, for files too large to load whole.
+
+Each matcher takes an iterable of chunks (str or bytes, as from read_chunks) and
+yields the absolute shift of every occurrence of the pattern, including
+occurrences that span chunk boundaries.
+
+kmp_stream carries the KMP state q, the number of pattern characters matched so
+far, from one chunk to the next.  rabin_karp_stream carries the hash of the
+current window, plus the last m characters so that the character leaving the
+window is at hand.  find_stream uses the built-in bytes/str find on each chunk,
+keeping the last m-1 characters so matches across a boundary are found.
+mmap_find_all memory-maps a file and calls find on the mapping.  Both of these
+run at C speed; mmap_find_all leaves paging to the operating system, and
+find_stream works on pipes and other inputs that cannot be mapped.
+"""
+
+import mmap
+import os
+
+from clrsPython.Chapter32.kmp_matcher import compute_prefix_function
+
+
+def read_chunks(source, chunk_size=1 << 20):
+	"""Generate the contents of source in chunks.
+
+	Arguments:
+	source -- a path (read in binary mode), a file object, or an iterable of chunks
+	chunk_size -- number of bytes (or characters) per read from a path or file object
+	"""
+	if isinstance(source, (str, bytes, os.PathLike)):
+		with open(source, "rb") as f:
+			yield from read_chunks(f, chunk_size)
+	elif hasattr(source, "read"):
+		while True:
+			chunk = source.read(chunk_size)
+			if not chunk:
+				return
+			yield chunk
+	else:
+		yield from source
+
+
+def kmp_stream(chunks, P):
+	"""Generate the shift of each occurrence of the nonempty pattern P in the text formed by chunks.
+
+	Arguments:
+	chunks -- iterable of text chunks, all str or all bytes, of the same type as P
+	P -- the pattern
+	"""
+	m = len(P)
+	pi = compute_prefix_function(P, m)
+	last = m - 1  # adjust for 0-origin indexing
+	q = -1  # index in P of last character matched, carried across chunks
+	offset = 0  # absolute position of the current chunk
+	for chunk in chunks:
+		for i, c in enumerate(chunk):
+			while q > -1 and P[q + 1] != c:
+				q = pi[q]
+			if P[q + 1] == c:
+				q += 1
+			if q == last:
+				yield offset + i - last
+				q = pi[q]
+		offset += len(chunk)
+
+
+def rabin_karp_stream(chunks, P, d=256, q=1000003, conversion_func=ord):
+	"""Generate the shift of each occurrence of the nonempty pattern P in the text formed by chunks.
+
+	Arguments:
+	chunks -- iterable of text chunks, all str or all bytes, of the same type as P
+	P -- the pattern
+	d -- radix to use, all characters are interpreted as radix-d digits
+	q -- prime modulus to use
+	conversion_func -- mapping from a str character to a digit; bytes are used as is
+	"""
+	m = len(P)
+	h = pow(d, m - 1, q)  # value of the high-order digit position of an m-digit window
+	digits = list(P) if isinstance(P, (bytes, bytearray)) else [conversion_func(c) for c in P]
+	p = 0
+	for digit in digits:
+		p = (d * p + digit) % q
+	t = 0  # hash of the last m characters seen, carried across chunks
+	window = []  # digits of the last m characters, carried across chunks
+	offset = 0  # absolute position of buffer[0]
+	for chunk in chunks:
+		if isinstance(chunk, (bytes, bytearray)):
+			buffer = window + list(chunk)
+		else:
+			buffer = window + [conversion_func(c) for c in chunk]
+		for j in range(len(window), len(buffer)):
+			if j >= m:
+				t = (d * (t - buffer[j - m] * h) + buffer[j]) % q
+			else:
+				t = (d * t + buffer[j]) % q
+			if j >= m - 1 and t == p and buffer[j - m + 1:j + 1] == digits:  # a hit, then a valid shift?
+				yield offset + j - m + 1
+		keep = max(0, len(buffer) - m)
+		window = buffer[keep:]
+		offset += keep
+
+
+def find_stream(chunks, P):
+	"""Generate the shift of each occurrence of the nonempty pattern P in the text formed by chunks,
+	using the built-in find on each chunk plus the last len(P)-1 characters of the previous one."""
+	m = len(P)
+	tail = P[:0]
+	offset = 0  # absolute position of tail[0]
+	for chunk in chunks:
+		buffer = tail + chunk
+		s = buffer.find(P)
+		while s != -1:
+			yield offset + s
+			s = buffer.find(P, s + 1)
+		keep = max(0, len(buffer) - (m - 1))
+		tail = buffer[keep:]
+		offset += keep
+
+
+def mmap_find_all(path, P):
+	"""Generate the shift of each occurrence of the nonempty bytes pattern P in the file at path,
+	searching a read-only memory map of the file with the built-in find."""
+	with open(path, "rb") as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			return
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+			s = mapped.find(P)
+			while s != -1:
+				yield s
+				s = mapped.find(P, s + 1)
+
+
+# Testing
+if __name__ == "__main__":
+
+	import random
+	import tempfile
+	import time
+
+	T = "ababacbababacababacaba"
+	P = "ababaca"
+	chunks = [T[i:i + 5] for i in range(0, len(T), 5)]
+	print(list(kmp_stream(chunks, P)), list(rabin_karp_stream(chunks, P)), list(find_stream(chunks, P)))  # shifts 7 and 13
+
+	# Random texts and chunkings against str.startswith at every shift.
+	random.seed(32)
+	for _ in range(500):
+		P = "".join(random.choice("ab") for _ in range(random.randint(1, 4)))
+		T = "".join(random.choice("ab") for _ in range(random.randint(0, 40)))
+		expected = [s for s in range(len(T)) if T.startswith(P, s)]
+		cuts = sorted(random.sample(range(len(T) + 1), min(5, len(T) + 1)))
+		chunks = [T[a:b] for a, b in zip([0] + cuts, cuts + [len(T)])]
+		assert list(kmp_stream(chunks, P)) == expected
+		assert list(rabin_karp_stream(chunks, P, 2, 3)) == expected  # tiny modulus forces spurious hits
+		assert list(find_stream(chunks, P)) == expected
+		bytes_chunks = [chunk.encode() for chunk in chunks]
+		assert list(kmp_stream(bytes_chunks, P.encode())) == expected
+		assert list(rabin_karp_stream(bytes_chunks, P.encode())) == expected
+	print("streaming matchers agree with a brute-force scan")
+
+	# A ticket-gate log file, read in 64 KB chunks.
+	gates = ["GATE%03d" % g for g in range(400)]
+	lines = ["%05d %s %s\n" % (i, random.choice(gates), random.choice(["IN", "OUT", "REJECT"])) for i in range(200000)]
+	with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as log:
+		log.write("".join(lines))
+	P = b"GATE123 REJECT"
+	size = os.path.getsize(log.name)
+	results = {}
+	for name, search in [("kmp_stream", lambda: kmp_stream(read_chunks(log.name, 1 << 16), P)),
+						 ("rabin_karp_stream", lambda: rabin_karp_stream(read_chunks(log.name, 1 << 16), P)),
+						 ("find_stream", lambda: find_stream(read_chunks(log.name, 1 << 16), P)),
+						 ("mmap_find_all", lambda: mmap_find_all(log.name, P))]:
+		start = time.perf_counter()
+		results[name] = list(search())
+		print("%-18s %d matches in %.1f MB, %.3f s" % (name, len(results[name]), size / 1e6, time.perf_counter() - start))
+	assert len({tuple(shifts) for shifts in results.values()}) == 1
+	os.remove(log.name)
@@ -30,6 +30,8 @@
 #                                                                       #
 #########################################################################
 
+import numpy as np
+
 
 def compute_suffix_array(T, n, conversion_func=ord):
     """
@@ -84,6 +86,47 @@ def compute_suffix_array(T, n, conversion_func=ord):
     return SA
 
 
+def compute_suffix_array_np(T, n, conversion_func=ord):
+    """
+    Compute and return the suffix array for a text T by prefix doubling, with every
+    round done by NumPy array operations instead of Python loops.
+
+    Arguments:
+    T -- the text
+    n -- length of T
+    conversion_func -- mapping from text to decimal digit, as in compute_suffix_array
+
+    Returns:
+    The suffix array SA for T, the same list that compute_suffix_array returns.
+
+    Each round packs the pair (rank[i], rank[i + l]) into one int64 key, sorts the
+    keys, and gives new ranks with a cumulative sum over the positions where
+    consecutive sorted keys differ.  It stops as soon as all ranks are distinct.
+    """
+    if n == 0:
+        return []
+    if isinstance(T, str) and conversion_func is ord:
+        digits = np.frombuffer(T[:n].encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    else:
+        digits = np.fromiter((conversion_func(T[i]) for i in range(n)), dtype=np.int64, count=n)
+    rank = np.unique(digits, return_inverse=True)[1].astype(np.int64).reshape(n)
+
+    l = 1  # length of the substrings ranked so far
+    while True:
+        right_rank = np.zeros(n, dtype=np.int64)  # 0 stands for an empty second substring
+        right_rank[:n - l] = rank[l:] + 1
+        key = rank * (n + 1) + right_rank
+        SA = np.argsort(key)
+        sorted_key = key[SA]
+        boundary = np.empty(n, dtype=np.int64)
+        boundary[0] = 0
+        np.not_equal(sorted_key[1:], sorted_key[:-1], out=boundary[1:], casting="unsafe")
+        rank[SA] = np.cumsum(boundary)  # equal pairs get equal ranks
+        if rank[SA[-1]] == n - 1 or 2 * l >= n:  # all ranks distinct, or substrings cover the text
+            return SA.tolist()
+        l *= 2
+
+
 def make_ranks(substr_rank, rank, n):
     """
     Give each substring in the sorted order its rank, from 0 to the number of unique
@@ -225,3 +268,27 @@ if __name__ == "__main__":
     print(SA)  # should be 5, 4, 3, 2, 1, 0
     LCP = compute_lcp(T, SA, n)
     print(LCP)  # should be 0, 1, 2, 3, 4, 5
+
+    # The NumPy version gives the same suffix arrays.
+    for T in ["ratatat", "bippityboppityboo", "aaaaaa", "a", "2359023141526739921"]:
+        assert compute_suffix_array_np(T, len(T)) == compute_suffix_array(T, len(T))
+    T = "2359023141526739921"
+    assert compute_suffix_array_np(T, len(T), int) == compute_suffix_array(T, len(T), int)
+
+    # Benchmark on Moby-Dick.
+    import os
+    import time
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Chapter15", "moby-dick.txt")) as f:
+        book = f.read()
+    T = book[:100000]
+    start = time.perf_counter()
+    SA = compute_suffix_array(T, len(T))
+    python_time = time.perf_counter() - start
+    start = time.perf_counter()
+    SA_np = compute_suffix_array_np(T, len(T))
+    print("%d characters: compute_suffix_array %.2f s, compute_suffix_array_np %.2f s, same: %s"
+          % (len(T), python_time, time.perf_counter() - start, SA == SA_np))
+    for T in [book, book * 4]:
+        start = time.perf_counter()
+        SA_np = compute_suffix_array_np(T, len(T))
+        print("%d characters: compute_suffix_array_np %.1f s" % (len(T), time.perf_counter() - start))
@@ -76,6 +76,34 @@ def counting_sort(A, n, k, get_key_func=None):
 	return B
 
 
+def counting_sort_indices(keys, k):
+	"""Return the stable sorting permutation of a list of integer keys between 0 and k.
+
+	Same counting scheme as counting_sort, but it works on plain Python lists and
+	moves indices rather than elements, so the caller can reorder several parallel
+	lists with one permutation.
+
+	Arguments:
+	keys -- a list of integers between 0 and k
+	k -- upper bound for value of keys
+
+	Returns:
+	A list P of indices such that keys[P[0]] <= keys[P[1]] <= ..., ties in input order.
+	"""
+	C = [0] * (k+1)
+	for key in keys:
+		C[key] += 1
+	# Turn the counts into the first output position for each key.
+	total = 0
+	for i in range(k+1):
+		C[i], total = total, total + C[i]
+	P = [0] * len(keys)
+	for j, key in enumerate(keys):  # forward pass keeps equal keys in input order
+		P[C[key]] = j
+		C[key] += 1
+	return P
+
+
 # Testing
 if __name__ == "__main__":
 	from key_object import KeyObject
@@ -103,3 +131,8 @@ if __name__ == "__main__":
 	n = len(a)
 	b = counting_sort(a, n, 5, KeyObject.get_key)
 	print([str(obj) for obj in b])  # should be d, g, a, e, c, f, h, b
+
+	# Sorting permutation of parallel lists.
+	keys = [2, 5, 3, 0, 2, 3, 0, 3]
+	names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+	print([names[j] for j in counting_sort_indices(keys, 5)])  # should be d, g, a, e, c, f, h, b
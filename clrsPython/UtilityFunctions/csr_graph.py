@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# csr_graph.py
+
+"""Compressed sparse row (CSR) graph representation.
+
+The out-neighbors of vertex u are targets[offsets[u]:offsets[u+1]], with matching
+weights in weights[offsets[u]:offsets[u+1]] for weighted graphs.  Three flat lists
+replace one linked list and one Edge object per edge, so scanning a vertex's
+neighbors is a list slice instead of a chain of get_v() calls.  The structure is
+static: build a new one after the graph changes.
+"""
+
+
+class CSRGraph:
+
+	def __init__(self, card_V, offsets, targets, weights=None, directed=True):
+		"""Initialize a CSR graph from prebuilt lists.
+
+		Arguments:
+		card_V -- number of vertices, numbered 0..card_V-1
+		offsets -- list of card_V + 1 nondecreasing positions into targets
+		targets -- list of edge heads, grouped by tail
+		weights -- optional list of edge weights parallel to targets
+		directed -- False if every undirected edge is stored in both directions
+		"""
+		self.card_V = card_V
+		self.offsets = offsets
+		self.targets = targets
+		self.weights = weights
+		self.directed = directed
+
+	@classmethod
+	def from_edges(cls, card_V, edges, directed=True, weighted=False):
+		"""Build a CSR graph from (u, v) pairs, or (u, v, weight) triples if weighted.
+		Undirected edges are stored in both directions.  Edges keep their input order
+		within each vertex's neighbor list (counting sort on the tail)."""
+		tails, heads, weights = [], [], []
+		for edge in edges:
+			u, v = edge[0], edge[1]
+			tails.append(u)
+			heads.append(v)
+			if weighted:
+				weights.append(edge[2])
+			if not directed:
+				tails.append(v)
+				heads.append(u)
+				if weighted:
+					weights.append(edge[2])
+
+		offsets = [0] * (card_V + 1)
+		for u in tails:
+			offsets[u + 1] += 1
+		for u in range(card_V):
+			offsets[u + 1] += offsets[u]
+		position = offsets[:-1]
+		targets = [0] * len(heads)
+		csr_weights = [0] * len(heads) if weighted else None
+		for i, u in enumerate(tails):
+			j = position[u]
+			targets[j] = heads[i]
+			if weighted:
+				csr_weights[j] = weights[i]
+			position[u] = j + 1
+		return cls(card_V, offsets, targets, csr_weights, directed)
+
+	@classmethod
+	def from_adjacency_list_graph(cls, G):
+		"""Build a CSR graph with the same vertices, edges and edge order as an AdjacencyListGraph."""
+		card_V = G.get_card_V()
+		weighted = G.is_weighted()
+		offsets = [0] * (card_V + 1)
+		targets = []
+		weights = [] if weighted else None
+		for u in range(card_V):
+			for edge in G.get_adj_list(u):
+				targets.append(edge.get_v())
+				if weighted:
+					weights.append(edge.get_weight())
+			offsets[u + 1] = len(targets)
+		return cls(card_V, offsets, targets, weights, G.is_directed())
+
+	def get_card_V(self):
+		"""Return the number of vertices in this graph."""
+		return self.card_V
+
+	def get_card_E(self):
+		"""Return the number of edges in this graph (undirected edges counted once)."""
+		return len(self.targets) if self.directed else len(self.targets) // 2
+
+	def is_directed(self):
+		"""Return a boolean indicating whether this graph is directed."""
+		return self.directed
+
+	def is_weighted(self):
+		"""Return a boolean indicating whether edges are weighted."""
+		return self.weights is not None
+
+	def degree(self, u):
+		"""Return the out-degree of vertex u."""
+		return self.offsets[u + 1] - self.offsets[u]
+
+	def neighbors(self, u):
+		"""Return a list of the out-neighbors of vertex u."""
+		return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+	def weighted_neighbors(self, u):
+		"""Return a list of (v, weight) pairs for the out-edges of vertex u."""
+		lo, hi = self.offsets[u], self.offsets[u + 1]
+		return list(zip(self.targets[lo:hi], self.weights[lo:hi]))
+
+	def transpose(self):
+		"""Return the transpose of this graph (the graph itself if undirected)."""
+		if not self.directed:
+			return self
+		offsets = self.offsets
+		edges = []
+		for u in range(self.card_V):
+			for i in range(offsets[u], offsets[u + 1]):
+				if self.weights is None:
+					edges.append((self.targets[i], u))
+				else:
+					edges.append((self.targets[i], u, self.weights[i]))
+		return CSRGraph.from_edges(self.card_V, edges, True, self.weights is not None)
+
+	def __str__(self):
+		"""Return the adjacency lists formatted as a string."""
+		result = ""
+		for u in range(self.card_V):
+			result += str(u) + ": "
+			lo, hi = self.offsets[u], self.offsets[u + 1]
+			for i in range(lo, hi):
+				result += str(self.targets[i])
+				if self.weights is not None:
+					result += " (" + str(self.weights[i]) + ")"
+				result += " "
+			result += "\n"
+		return result
+
+
+# Testing
+if __name__ == "__main__":
+
+	graph1 = CSRGraph.from_edges(4, [(0, 1), (0, 2), (2, 3), (3, 0)])
+	print(graph1)
+	print(graph1.transpose())
+	graph2 = CSRGraph.from_edges(3, [(0, 1, 5), (1, 2, 7)], directed=False, weighted=True)
+	print(graph2)
+	print(graph2.get_card_E(), graph2.weighted_neighbors(1))
@@ -0,0 +1,126 @@
+"""
+Ranked station-name autocomplete for search boxes.
+
+Active stations are indexed by their normalised name (StationRecord.key, the
+same data_api._norm form the hash-table lookup uses) in a weighted radix trie
+(clrsPython.Chapter12.radix_trie). Every trie node caches its top completions,
+so a keystroke costs O(prefix length + k) however big the network is.
+
+A station's popularity weight defaults to its number of direct links and can be
+overridden per name with init_autocomplete(weights=...). Opening, closing and
+inserting stations, and edge edits, update the trie in place. A "reset" rebuilds it.
+
+Public functions:
+    init_autocomplete(weights=None, cache_k=10, force=False) -> None
+    complete_station_names(prefix: str, k: int = 10) -> list[str]
+    set_station_popularity(name: str, weight: float) -> bool
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Mapping
+
+from clrsPython.Chapter12.radix_trie import RadixTrie
+from utils import data_api
+
+_CONFIG: Dict[str, object] = {
+    "weights": {},
+    "cache_k": 10,
+}
+_TRIE: RadixTrie | None = None
+_NAME_BY_KEY: Dict[str, str] = {}
+
+
+def _weight(rec) -> float:
+    return _CONFIG["weights"].get(rec.key, len(rec.neighbors))
+
+
+def _update(station_id: int) -> None:
+    """Bring one station's trie entry in line with its record."""
+    rec = data_api.get_station_records()[station_id]
+    if rec.active:
+        _TRIE.insert(rec.key, _weight(rec))
+        _NAME_BY_KEY[rec.key] = rec.name
+    else:
+        _TRIE.delete(rec.key)
+        _NAME_BY_KEY.pop(rec.key, None)
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Apply station and edge edits to the trie; drop it on a full reset."""
+    global _TRIE
+    if _TRIE is None:
+        return
+    if event == "reset":
+        _TRIE = None
+    else:
+        for station_id in args:
+            _update(station_id)
+
+
+def init_autocomplete(
+    weights: Mapping[str, float] | None = None,
+    cache_k: int = 10,
+    force: bool = False,
+) -> None:
+    """
+    Set the popularity weights and cache size, then build the index.
+
+    weights maps station names (any case/spacing) to popularity; stations not
+    listed keep the default weight. cache_k is the largest k served from cache.
+    """
+    global _TRIE
+    config = {
+        "weights": {data_api._norm(name): w for name, w in (weights or {}).items()},
+        "cache_k": cache_k,
+    }
+    if _TRIE is not None and config == _CONFIG and not force:
+        return
+    _CONFIG.update(config)
+    _TRIE = None
+    _trie()
+
+
+def _trie() -> RadixTrie:
+    global _TRIE
+    if _TRIE is None:
+        records = data_api.get_station_records()
+        _NAME_BY_KEY.clear()
+        _NAME_BY_KEY.update((rec.key, rec.name) for rec in records if rec.active)
+        _TRIE = RadixTrie.from_items(
+            ((rec.key, _weight(rec)) for rec in records if rec.active),
+            _CONFIG["cache_k"],
+        )
+        data_api.add_mutation_listener(_on_mutation)
+    return _TRIE
+
+
+def _norm_prefix(prefix: str) -> str:
+    """Normalise like data_api._norm, but keep one trailing space so "king " skips "kingsbury"."""
+    key = data_api._norm(prefix)
+    if key and prefix[-1:].isspace():
+        key += " "
+    return key
+
+
+def complete_station_names(prefix: str, k: int = 10) -> List[str]:
+    """Return up to k active station names starting with prefix, most popular first (ties alphabetical)."""
+    trie = _trie()
+    return [_NAME_BY_KEY[key] for key, _w in trie.complete(_norm_prefix(prefix), k)]
+
+
+def set_station_popularity(name: str, weight: float) -> bool:
+    """Set one station's popularity weight. Returns False if the station is unknown or closed."""
+    station_id = data_api.get_station_id(name)
+    if station_id is None:
+        return False
+    _trie()
+    _CONFIG["weights"] = {**_CONFIG["weights"], data_api._norm(name): weight}
+    _update(station_id)
+    return True
+
+
+__all__ = [
+    "init_autocomplete",
+    "complete_station_names",
+    "set_station_popularity",
+]
@@ -0,0 +1,412 @@
+"""
+Closure impact analysis for the station graph.
+
+Precomputes, per connected component of the active network:
+- articulation points (stations whose closure splits the network),
+- bridges (links whose closure splits the network),
+- the block-cut tree and the bridge tree (2-edge-connected components),
+so "does closing X disconnect A from B?" is an O(log n) tree lookup instead
+of a fresh traversal per what-if.
+
+Public functions:
+    init_closure_index(force: bool = False) -> None
+    is_articulation_station(name: str) -> bool
+    is_bridge_link(a_name: str, b_name: str) -> bool
+    closing_station_disconnects(x_name: str, a_name: str, b_name: str) -> bool
+    closing_link_disconnects(u_name: str, v_name: str, a_name: str, b_name: str) -> bool
+    get_articulation_stations() -> list[tuple[int, str]]
+    get_bridge_links() -> list[tuple[str, str]]
+
+Notes:
+- The DFS is an iterative Tarjan lowlink pass (no recursion), so it is safe
+  on long chains.
+- The global index listens to utils.data_api mutations and lazily rebuilds
+  only the components touched since the last query.
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils import data_api
+
+
+class _Tree:
+    """Rooted tree over nodes 0..n-1 with O(1) ancestor tests and O(log n) LCA (binary lifting)."""
+
+    __slots__ = ("tin", "tout", "up")
+
+    def __init__(self, n: int, edges: Iterable[Tuple[int, int]]):
+        adj: List[List[int]] = [[] for _ in range(n)]
+        for a, b in edges:
+            adj[a].append(b)
+            adj[b].append(a)
+
+        parent = [0] * n
+        self.tin = [0] * n
+        self.tout = [0] * n
+        timer = 0
+        seen = [False] * n
+        seen[0] = True
+        stack = [(0, 0)]
+        while stack:
+            u, i = stack[-1]
+            if i == 0:
+                self.tin[u] = timer
+                timer += 1
+            if i < len(adj[u]):
+                stack[-1] = (u, i + 1)
+                v = adj[u][i]
+                if not seen[v]:
+                    seen[v] = True
+                    parent[v] = u
+                    stack.append((v, 0))
+            else:
+                stack.pop()
+                self.tout[u] = timer
+                timer += 1
+
+        self.up = [parent]
+        for _ in range(max(1, n.bit_length())):
+            prev = self.up[-1]
+            self.up.append([prev[prev[x]] for x in range(n)])
+
+    def is_ancestor(self, a: int, b: int) -> bool:
+        """True if a is an ancestor of b (a node is its own ancestor)."""
+        return self.tin[a] <= self.tin[b] and self.tout[b] <= self.tout[a]
+
+    def lca(self, a: int, b: int) -> int:
+        if self.is_ancestor(a, b):
+            return a
+        if self.is_ancestor(b, a):
+            return b
+        for level in reversed(self.up):
+            if not self.is_ancestor(level[a], b):
+                a = level[a]
+        return self.up[0][a]
+
+    def on_path(self, x: int, a: int, b: int) -> bool:
+        """True if node x lies on the tree path between a and b."""
+        top = self.lca(a, b)
+        return self.is_ancestor(top, x) and (self.is_ancestor(x, a) or self.is_ancestor(x, b))
+
+
+class _Component:
+    """Biconnectivity data for one connected component of the active network."""
+
+    __slots__ = ("vertices", "cut", "bridges", "bc_node", "bc_tree", "twoec_of", "br_tree")
+
+    def __init__(self, vertices: List[int]):
+        self.vertices = vertices
+        self.cut: Set[int] = set()
+        self.bridges: Set[Tuple[int, int]] = set()
+        self.bc_node: Dict[int, int] = {}
+        self.bc_tree: Optional[_Tree] = None
+        self.twoec_of: Dict[int, int] = {}
+        self.br_tree: Optional[_Tree] = None
+
+
+class ClosureImpactIndex:
+    """
+    Articulation points, bridges and block-cut / bridge trees over a list of
+    StationRecord-like objects (attributes: id, active, neighbors).
+    Only active stations, and links between two active stations, are considered.
+    """
+
+    def __init__(self, records: List[object]):
+        self._records = records
+        self._comp_of: List[int] = []
+        self._components: Dict[int, _Component] = {}
+        self._next_comp = 0
+        self._dirty: Set[int] = set()
+        self.rebuild()
+
+    # -- maintenance -------------------------------------------------------
+
+    def rebuild(self, records: Optional[List[object]] = None) -> None:
+        """Recompute everything from scratch (optionally over a new record list)."""
+        if records is not None:
+            self._records = records
+        self._comp_of = [-1] * len(self._records)
+        self._components = {}
+        self._dirty.clear()
+        self._build_from(range(len(self._records)))
+
+    def mark_dirty(self, *station_ids: int) -> None:
+        """Record that these stations (or their incident links) changed; rebuilt on next query."""
+        self._dirty.update(station_ids)
+
+    def on_mutation(self, event: str, *args) -> None:
+        """utils.data_api mutation listener."""
+        if event == "reset":
+            self.rebuild(data_api.get_station_records())
+        else:
+            self.mark_dirty(*args)
+
+    def _refresh(self) -> None:
+        """Rebuild only the components touched by stations marked dirty."""
+        if not self._dirty:
+            return
+        records = self._records
+        if len(self._comp_of) < len(records):
+            self._comp_of.extend([-1] * (len(records) - len(self._comp_of)))
+
+        touched = set(self._dirty)
+        for s in self._dirty:
+            touched.update(records[s].neighbors)
+        self._dirty.clear()
+
+        restart = set(touched)
+        for s in touched:
+            c = self._comp_of[s]
+            if c != -1 and c in self._components:
+                restart.update(self._components.pop(c).vertices)
+        for s in restart:
+            self._comp_of[s] = -1
+        self._build_from(sorted(restart))
+
+    def _active_neighbors(self, u: int) -> List[int]:
+        records = self._records
+        return [v for v in records[u].neighbors if getattr(records[v], "active", True)]
+
+    def _build_from(self, starts: Iterable[int]) -> None:
+        """Run the lowlink DFS from every unassigned active station in `starts`."""
+        records = self._records
+        for root in starts:
+            if self._comp_of[root] != -1 or not getattr(records[root], "active", True):
+                continue
+            comp_id = self._next_comp
+            self._next_comp += 1
+            self._components[comp_id] = self._analyse_component(root, comp_id)
+
+    def _analyse_component(self, root: int, comp_id: int) -> _Component:
+        """Iterative Tarjan: discovery/low times, cut vertices, bridges and blocks (by edge stack)."""
+        disc: Dict[int, int] = {root: 0}
+        low: Dict[int, int] = {root: 0}
+        timer = 1
+        vertices = [root]
+        self._comp_of[root] = comp_id
+
+        blocks: List[Set[int]] = []
+        cut: Set[int] = set()
+        bridges: Set[Tuple[int, int]] = set()
+        edge_stack: List[Tuple[int, int]] = []
+        root_children = 0
+
+        # Frame: [vertex, parent (skipped once), neighbour list, next index]
+        stack = [[root, -1, self._active_neighbors(root), 0]]
+        while stack:
+            frame = stack[-1]
+            u, parent, nbrs, i = frame
+            if i < len(nbrs):
+                frame[3] = i + 1
+                v = nbrs[i]
+                if v == parent:
+                    frame[1] = -1
+                    continue
+                if v not in disc:
+                    disc[v] = low[v] = timer
+                    timer += 1
+                    vertices.append(v)
+                    self._comp_of[v] = comp_id
+                    edge_stack.append((u, v))
+                    if u == root:
+                        root_children += 1
+                    stack.append([v, u, self._active_neighbors(v), 0])
+                elif disc[v] < disc[u]:
+                    edge_stack.append((u, v))
+                    if disc[v] < low[u]:
+                        low[u] = disc[v]
+                continue
+
+            # u is finished; fold its low value into the parent.
+            stack.pop()
+            if not stack:
+                break
+            p = stack[-1][0]
+            if low[u] < low[p]:
+                low[p] = low[u]
+            if low[u] >= disc[p]:
+                if p != root:
+                    cut.add(p)
+                block: Set[int] = set()
+                while True:
+                    a, b = edge_stack.pop()
+                    block.add(a)
+                    block.add(b)
+                    if a == p and b == u:
+                        break
+                blocks.append(block)
+            if low[u] > disc[p]:
+                bridges.add((p, u) if p < u else (u, p))
+
+        if root_children >= 2:
+            cut.add(root)
+        if not blocks:
+            blocks.append({root})  # isolated station
+
+        comp = _Component(vertices)
+        comp.cut = cut
+        comp.bridges = bridges
+
+        # Block-cut tree: blocks are nodes 0..B-1, cut vertices follow.
+        n_nodes = len(blocks)
+        tree_edges = []
+        for x in cut:
+            comp.bc_node[x] = n_nodes
+            n_nodes += 1
+        for b_id, block in enumerate(blocks):
+            for v in block:
+                if v in cut:
+                    tree_edges.append((b_id, comp.bc_node[v]))
+                else:
+                    comp.bc_node[v] = b_id
+        comp.bc_tree = _Tree(n_nodes, tree_edges)
+
+        # Bridge tree: flood fill 2-edge-connected components without crossing bridges.
+        label = 0
+        for s in vertices:
+            if s in comp.twoec_of:
+                continue
+            comp.twoec_of[s] = label
+            todo = [s]
+            while todo:
+                u = todo.pop()
+                for v in self._active_neighbors(u):
+                    if v not in comp.twoec_of and ((u, v) if u < v else (v, u)) not in bridges:
+                        comp.twoec_of[v] = label
+                        todo.append(v)
+            label += 1
+        comp.br_tree = _Tree(label, [(comp.twoec_of[a], comp.twoec_of[b]) for a, b in bridges])
+        return comp
+
+    # -- queries (station ids) ---------------------------------------------
+
+    def _component(self, s: int) -> Optional[_Component]:
+        self._refresh()
+        if s < 0 or s >= len(self._comp_of) or self._comp_of[s] == -1:
+            return None
+        return self._components[self._comp_of[s]]
+
+    def connected(self, a: int, b: int) -> bool:
+        """True if both stations are active and currently connected."""
+        ca = self._component(a)
+        return ca is not None and ca is self._component(b)
+
+    def is_articulation(self, x: int) -> bool:
+        comp = self._component(x)
+        return comp is not None and x in comp.cut
+
+    def is_bridge(self, u: int, v: int) -> bool:
+        comp = self._component(u)
+        return comp is not None and ((u, v) if u < v else (v, u)) in comp.bridges
+
+    def station_disconnects(self, x: int, a: int, b: int) -> bool:
+        """
+        True if a and b are connected now but would not be after closing station x.
+        Closing an endpoint (x == a or x == b) counts as disconnecting.
+        """
+        if not self.connected(a, b):
+            return False
+        if x == a or x == b:
+            return True
+        comp = self._component(a)
+        if x not in comp.cut:
+            return False
+        return comp.bc_tree.on_path(comp.bc_node[x], comp.bc_node[a], comp.bc_node[b])
+
+    def link_disconnects(self, u: int, v: int, a: int, b: int) -> bool:
+        """True if a and b are connected now but would not be after closing the link u-v."""
+        if not self.connected(a, b) or not self.is_bridge(u, v):
+            return False
+        comp = self._component(a)
+        if comp is not self._component(u):
+            return False
+        lbl = comp.twoec_of
+        ca, cb = lbl[a], lbl[b]
+        return comp.br_tree.on_path(lbl[u], ca, cb) and comp.br_tree.on_path(lbl[v], ca, cb)
+
+    def articulation_points(self) -> List[int]:
+        self._refresh()
+        return sorted(x for comp in self._components.values() for x in comp.cut)
+
+    def bridges(self) -> List[Tuple[int, int]]:
+        self._refresh()
+        return sorted(e for comp in self._components.values() for e in comp.bridges)
+
+
+# -- global index over utils.data_api ----------------------------------------
+
+_INDEX: ClosureImpactIndex | None = None
+
+
+def init_closure_index(force: bool = False) -> None:
+    """Build the global closure index once and subscribe it to data_api mutations."""
+    global _INDEX
+    if _INDEX is not None and not force:
+        return
+    if _INDEX is not None:
+        data_api.remove_mutation_listener(_INDEX.on_mutation)
+    _INDEX = ClosureImpactIndex(data_api.get_station_records())
+    data_api.add_mutation_listener(_INDEX.on_mutation)
+
+
+def _index() -> ClosureImpactIndex:
+    if _INDEX is None:
+        init_closure_index()
+    return _INDEX
+
+
+def _id(name: str) -> Optional[int]:
+    return data_api.get_station_id(name)
+
+
+def is_articulation_station(name: str) -> bool:
+    """True if closing this station splits its part of the network."""
+    sid = _id(name)
+    return sid is not None and _index().is_articulation(sid)
+
+
+def is_bridge_link(a_name: str, b_name: str) -> bool:
+    """True if closing the link a-b splits its part of the network."""
+    a, b = _id(a_name), _id(b_name)
+    return a is not None and b is not None and _index().is_bridge(a, b)
+
+
+def closing_station_disconnects(x_name: str, a_name: str, b_name: str) -> bool:
+    """True if A and B are connected now but closing station X would separate them."""
+    x, a, b = _id(x_name), _id(a_name), _id(b_name)
+    if x is None or a is None or b is None:
+        return False
+    return _index().station_disconnects(x, a, b)
+
+
+def closing_link_disconnects(u_name: str, v_name: str, a_name: str, b_name: str) -> bool:
+    """True if A and B are connected now but closing the link U-V would separate them."""
+    u, v, a, b = _id(u_name), _id(v_name), _id(a_name), _id(b_name)
+    if u is None or v is None or a is None or b is None:
+        return False
+    return _index().link_disconnects(u, v, a, b)
+
+
+def get_articulation_stations() -> list[tuple[int, str]]:
+    """Return (id, name) for every active station whose closure would split the network."""
+    records = data_api.get_station_records()
+    return [(sid, records[sid].name) for sid in _index().articulation_points()]
+
+
+def get_bridge_links() -> list[tuple[str, str]]:
+    """Return (name, name) for every active link whose closure would split the network."""
+    records = data_api.get_station_records()
+    return [(records[u].name, records[v].name) for u, v in _index().bridges()]
+
+
+__all__ = [
+    "ClosureImpactIndex",
+    "init_closure_index",
+    "is_articulation_station",
+    "is_bridge_link",
+    "closing_station_disconnects",
+    "closing_link_disconnects",
+    "get_articulation_stations",
+    "get_bridge_links",
+]
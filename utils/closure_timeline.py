@@ -0,0 +1,167 @@
+"""
+Offline connectivity over timelines of station closures and reopenings.
+
+A timeline is a list of events (time, station, action) with action "close" or
+"open", applied on top of the stations' current active flags. A query
+(time, a, b) asks whether a and b are connected after all events with
+event_time <= time. All queries of one timeline are answered together with the
+divide-and-conquer engine in clrsPython.Chapter19.offline_connectivity, which
+uses a rollback-capable disjoint-set forest instead of re-running a traversal
+per query.
+
+Public API:
+    ClosureTimelinePlanner(records)      - reusable across many timelines
+    init_timeline_planner(force=False) -> None
+    evaluate_timeline(events, queries) -> list[bool]
+
+Stations may be given as ids or names (names are matched after normalisation,
+including closed stations so they can be reopened).
+"""
+
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+from clrsPython.Chapter19.offline_connectivity import offline_connectivity
+from task1.module_wrapper import norm
+from utils import data_api
+
+
+class ClosureTimelinePlanner:
+    """Snapshot of the network's links, reused by every timeline evaluated against it."""
+
+    def __init__(self, records: List[object]):
+        self._n = len(records)
+        self._initially_open = [getattr(rec, "active", True) for rec in records]
+        self._ids: Dict[str, int] = {rec.key: rec.id for rec in records}
+        self._edges: List[Tuple[int, int]] = []
+        self._incident: List[List[int]] = [[] for _ in range(self._n)]
+        for rec in records:
+            for v in rec.neighbors:
+                if rec.id < v:
+                    self._incident[rec.id].append(len(self._edges))
+                    self._incident[v].append(len(self._edges))
+                    self._edges.append((rec.id, v))
+
+    def station_id(self, station) -> int:
+        """Resolve an id or a (possibly closed) station name to an id; raises KeyError if unknown."""
+        if isinstance(station, int):
+            return station
+        return self._ids[norm(station)]
+
+    def evaluate(self, events: Sequence[tuple], queries: Sequence[tuple]) -> List[bool]:
+        """
+        Answer every query of one timeline.
+
+        Args:
+            events: (time, station, "close" | "open") tuples, in any order
+            queries: (time, a, b) tuples, in any order
+
+        Returns:
+            One boolean per query, in the order given.
+        """
+        q = len(queries)
+        order = sorted(range(q), key=lambda i: queries[i][0])
+        qtimes = [queries[i][0] for i in order]
+
+        # Open intervals (in query-slot space) for every station the timeline touches.
+        timeline = [
+            (bisect_left(qtimes, t), self.station_id(s), action == "open")
+            for t, s, action in sorted(events, key=lambda ev: ev[0])
+        ]
+        state: Dict[int, bool] = {}
+        start: Dict[int, int] = {}
+        open_slots: Dict[int, List[Tuple[int, int]]] = {}
+        for slot, s, is_open in timeline:
+            if s not in state:
+                state[s] = self._initially_open[s]
+                start[s] = 0
+                open_slots[s] = []
+            if is_open and not state[s]:
+                start[s] = slot
+            elif not is_open and state[s] and slot > start[s]:
+                open_slots[s].append((start[s], slot - 1))
+            state[s] = is_open
+        for s, is_open in state.items():
+            if is_open and start[s] < q:
+                open_slots[s].append((start[s], q - 1))
+
+        full = [(0, q - 1)] if q else []
+
+        def slots_of(s: int) -> List[Tuple[int, int]]:
+            if s in open_slots:
+                return open_slots[s]
+            return full if self._initially_open[s] else []
+
+        # Links between two untouched open stations are alive throughout; the rest
+        # live on the intersection of their endpoints' open intervals.
+        static_edges = []
+        dynamic = set()
+        for s in open_slots:
+            dynamic.update(self._incident[s])
+        for e, (u, v) in enumerate(self._edges):
+            if e not in dynamic and self._initially_open[u] and self._initially_open[v]:
+                static_edges.append((u, v))
+        edge_intervals = []
+        for e in dynamic:
+            u, v = self._edges[e]
+            iu, iv = slots_of(u), slots_of(v)
+            i = j = 0
+            while i < len(iu) and j < len(iv):
+                lo = max(iu[i][0], iv[j][0])
+                hi = min(iu[i][1], iv[j][1])
+                if lo <= hi:
+                    edge_intervals.append((u, v, lo, hi))
+                if iu[i][1] < iv[j][1]:
+                    i += 1
+                else:
+                    j += 1
+
+        def is_open(s: int, slot: int) -> bool:
+            spans = slots_of(s)
+            k = bisect_right(spans, (slot, q)) - 1
+            return k >= 0 and spans[k][1] >= slot
+
+        slot_queries = []
+        for i in order:
+            _, a, b = queries[i]
+            slot_queries.append((self.station_id(a), self.station_id(b)))
+        connected = offline_connectivity(self._n, edge_intervals, slot_queries, static_edges)
+
+        answers = [False] * q
+        for slot, i in enumerate(order):
+            a, b = slot_queries[slot]
+            answers[i] = connected[slot] and is_open(a, slot) and is_open(b, slot)
+        return answers
+
+
+_PLANNER: ClosureTimelinePlanner | None = None
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any network edit invalidates the planner's snapshot; rebuild lazily."""
+    global _PLANNER
+    _PLANNER = None
+
+
+def init_timeline_planner(force: bool = False) -> None:
+    """Build the global planner from the data_api index (idempotent)."""
+    global _PLANNER
+    if _PLANNER is not None and not force:
+        return
+    _PLANNER = ClosureTimelinePlanner(data_api.get_station_records())
+    data_api.add_mutation_listener(_on_mutation)
+
+
+def evaluate_timeline(events: Sequence[tuple], queries: Sequence[tuple]) -> List[bool]:
+    """Answer a batch of (time, a, b) connectivity queries against one closure timeline."""
+    if _PLANNER is None:
+        init_timeline_planner()
+    return _PLANNER.evaluate(events, queries)
+
+
+__all__ = [
+    "ClosureTimelinePlanner",
+    "init_timeline_planner",
+    "evaluate_timeline",
+]
@@ -14,7 +14,7 @@ Notes:
 """
 
 from __future__ import annotations
-from typing import Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List
 
 from task1.data_extract import read_csv_file
 from task1.module_wrapper import build_index_from_rows
@@ -30,6 +30,34 @@ def _unwrap(node_or_obj):
 
 _HT = None
 _BY_ID: List[object] | None = None
+_LISTENERS: List[Callable[..., None]] = []
+
+
+def add_mutation_listener(callback: Callable[..., None]) -> None:
+    """
+    Register `callback(event, *args)` to be called after every index mutation.
+
+    Events:
+        "reset"                        - the index was (re)built from the CSV
+        "insert", station_id           - a new station record was appended
+        "activate", station_id         - a station was (re)opened
+        "deactivate", station_id       - a station was closed or soft-deleted
+        "edge", a_id, b_id             - an edge was created or updated
+    """
+    if callback not in _LISTENERS:
+        _LISTENERS.append(callback)
+
+
+def remove_mutation_listener(callback: Callable[..., None]) -> None:
+    """Unregister a callback added with add_mutation_listener (no error if absent)."""
+    if callback in _LISTENERS:
+        _LISTENERS.remove(callback)
+
+
+def _notify(event: str, *args) -> None:
+    """Forward a mutation event to every registered listener."""
+    for callback in list(_LISTENERS):
+        callback(event, *args)
 
 
 def init_index(force: bool = False) -> None:
@@ -39,6 +67,7 @@ def init_index(force: bool = False) -> None:
         return
     station_rows, edge_rows = read_csv_file()
     _HT, _BY_ID = build_index_from_rows(station_rows, edge_rows)
+    _notify("reset")
 
 
 def is_operational(name: str) -> bool:
@@ -84,6 +113,7 @@ def activate_station(name: str) -> bool:
         return False
     rec = _unwrap(hit)
     rec.active = True
+    _notify("activate", rec.id)
     return True
 
 
@@ -96,6 +126,7 @@ def deactivate_station(name: str) -> bool:
         return False
     rec = _unwrap(hit)
     rec.active = False
+    _notify("deactivate", rec.id)
     return True
 
 def is_station_active(name: str) -> bool:
@@ -123,6 +154,7 @@ def insert_station(name: str) -> int:
     
     _HT.insert(rec)
     _BY_ID.append(rec)
+    _notify("insert", new_id)
     
     return new_id
 
@@ -141,6 +173,7 @@ def delete_station_by_name(name: str) -> bool:
     
     rec = _unwrap(hit)
     rec.active = False
+    _notify("deactivate", rec.id)
     return True
 
 
@@ -200,6 +233,7 @@ def create_edge(a_name: str, b_name: str, time_minutes: int, line: str | None =
     if prev is None or t < prev[0]:
         rb.neighbors[ra.id] = (t, line)
 
+    _notify("edge", ra.id, rb.id)
     return True
 
 
@@ -233,6 +267,16 @@ def get_all_stations() -> list[tuple[int, str]]:
         init_index()
     return [(rec.id, rec.name) for rec in _BY_ID if getattr(rec, "active", True)]
 
+
+def get_station_records() -> list:
+    """
+    Return the StationRecord list indexed by station id (active and inactive).
+    The list is shared with the index - treat it as read-only and mutate through this API.
+    """
+    if _HT is None or _BY_ID is None:
+        init_index()
+    return _BY_ID
+
 __all__ = [
     "init_index",
     "is_operational",
@@ -246,4 +290,7 @@ __all__ = [
     "get_edge_info",
     "get_total_station_count",
     "get_all_stations",
+    "get_station_records",
+    "add_mutation_listener",
+    "remove_mutation_listener",
 ]
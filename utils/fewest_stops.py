@@ -0,0 +1,72 @@
+"""
+Fewest-stops queries over the active station network.
+
+The network is snapshotted into a compact CSR adjacency
+(clrsPython.UtilityFunctions.csr_graph) and searched with the
+direction-optimizing BFS from clrsPython.Chapter20. The snapshot is dropped on
+any utils.data_api mutation and rebuilt on the next query.
+
+Public functions:
+    fewest_stops(a_name: str, b_name: str) -> list[str] | None
+    stop_counts_from(names: list[str]) -> dict[str, int]
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from clrsPython.Chapter20.direction_optimizing_bfs import bfs_direction_optimizing, fewest_edges_path
+from clrsPython.UtilityFunctions.csr_graph import CSRGraph
+from utils import data_api
+
+_CSR: CSRGraph | None = None
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any network edit invalidates the CSR snapshot; rebuild lazily."""
+    global _CSR
+    _CSR = None
+
+
+def _graph() -> CSRGraph:
+    global _CSR
+    if _CSR is None:
+        records = data_api.get_station_records()
+        edges = [
+            (rec.id, v)
+            for rec in records if rec.active
+            for v in rec.neighbors
+            if rec.id < v and records[v].active
+        ]
+        _CSR = CSRGraph.from_edges(len(records), edges, directed=False)
+        data_api.add_mutation_listener(_on_mutation)
+    return _CSR
+
+
+def fewest_stops(a_name: str, b_name: str) -> Optional[List[str]]:
+    """Return the station names on a route from A to B with the fewest stops, or None if unreachable."""
+    a = data_api.get_station_id(a_name)
+    b = data_api.get_station_id(b_name)
+    if a is None or b is None:
+        return None
+    _dist, pi = bfs_direction_optimizing(_graph(), a, target=b)
+    path = fewest_edges_path(pi, a, b)
+    if path is None:
+        return None
+    records = data_api.get_station_records()
+    return [records[s].name for s in path]
+
+
+def stop_counts_from(names: List[str]) -> Dict[str, int]:
+    """Return {station name: fewest stops from the nearest of the given stations} for every reachable station."""
+    sources = [sid for sid in (data_api.get_station_id(n) for n in names) if sid is not None]
+    if not sources:
+        return {}
+    dist, _pi = bfs_direction_optimizing(_graph(), sources)
+    records = data_api.get_station_records()
+    return {records[s].name: int(d) for s, d in enumerate(dist) if d != float("inf")}
+
+
+__all__ = [
+    "fewest_stops",
+    "stop_counts_from",
+]
@@ -0,0 +1,75 @@
+"""
+Typo-tolerant station lookup.
+
+When data_api.get_station_id misses, these functions suggest the active
+stations whose normalised names (StationRecord.key) are within a small edit
+distance of the normalised query. Candidates come from a trigram inverted index
+and are verified with the bit-parallel edit distance in
+clrsPython.Chapter14.edit_distance, so a query does not scan every station.
+
+The index is dropped on any utils.data_api mutation and rebuilt on the next query.
+
+Public functions:
+    suggest_station_names(name: str, max_distance: int = 2, k: int = 5) -> list[tuple[str, int]]
+    get_station_id_fuzzy(name: str, max_distance: int = 2) -> int | None
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from clrsPython.Chapter14.edit_distance import NgramIndex
+from utils import data_api
+
+_INDEX: NgramIndex | None = None
+_ID_BY_KEY: Dict[str, int] = {}
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any station edit invalidates the index; rebuild lazily."""
+    global _INDEX
+    _INDEX = None
+
+
+def _index() -> NgramIndex:
+    global _INDEX
+    if _INDEX is None:
+        records = data_api.get_station_records()
+        _ID_BY_KEY.clear()
+        _ID_BY_KEY.update((rec.key, rec.id) for rec in records if rec.active)
+        _INDEX = NgramIndex(_ID_BY_KEY, q=3)
+        data_api.add_mutation_listener(_on_mutation)
+    return _INDEX
+
+
+def suggest_station_names(name: str, max_distance: int = 2, k: int = 5) -> List[Tuple[str, int]]:
+    """
+    Return up to k (station name, edit distance) pairs for the active stations
+    within max_distance of `name`, closest first (ties alphabetical by normalised name).
+    Distances are measured between normalised names.
+    """
+    matches = _index().search(data_api._norm(name), max_distance, k)
+    records = data_api.get_station_records()
+    return [(records[_ID_BY_KEY[key]].name, distance) for key, distance in matches]
+
+
+def get_station_id_fuzzy(name: str, max_distance: int = 2) -> Optional[int]:
+    """
+    Return the station id for `name`, tolerating typos.
+
+    An exact (normalised) match wins. Otherwise the closest station within
+    max_distance is returned, but only if no other station is equally close;
+    ambiguous or distant queries return None.
+    """
+    station_id = data_api.get_station_id(name)
+    if station_id is not None:
+        return station_id
+    matches = _index().search(data_api._norm(name), max_distance, 2)
+    if not matches or (len(matches) == 2 and matches[0][1] == matches[1][1]):
+        return None
+    return _ID_BY_KEY[matches[0][0]]
+
+
+__all__ = [
+    "suggest_station_names",
+    "get_station_id_fuzzy",
+]
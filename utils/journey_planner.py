@@ -0,0 +1,96 @@
+"""
+Connection Scan journey planning over the configured timetable.
+
+Connections are generated from the same links and headway configuration as
+utils.timetable (set with timetable.init_timetable) and stored in flat,
+departure-sorted arrays by clrsPython.Chapter22.connection_scan. An
+earliest-arrival query is one forward scan over them and a latest-departure
+query one backward scan, which is much cheaper than searching the
+time-expanded graph. The connections are dropped on any utils.data_api
+mutation or configuration change and rebuilt on the next query.
+
+Times are minutes after midnight. Legs are (from_name, to_name, departure,
+arrival, line).
+
+Public functions:
+    plan_earliest_arrival(a_name: str, b_name: str, depart: int) -> tuple[int, list] | None
+    plan_latest_departure(a_name: str, b_name: str, arrive_by: int) -> tuple[int, list] | None
+    earliest_arrival_times(name: str, depart: int) -> dict[str, int]
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from clrsPython.Chapter22.connection_scan import ConnectionScan
+from utils import data_api, timetable
+
+_CSA: ConnectionScan | None = None
+_CSA_CONFIG: Dict[str, object] | None = None
+
+Leg = Tuple[str, str, int, int, Optional[str]]
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any network edit invalidates the connections; rebuild lazily."""
+    global _CSA
+    _CSA = None
+
+
+def _connections() -> ConnectionScan:
+    global _CSA, _CSA_CONFIG
+    config = timetable.get_timetable_config()
+    if _CSA is None or config != _CSA_CONFIG:
+        _CSA = ConnectionScan.from_timetable(
+            len(data_api.get_station_records()),
+            timetable.get_scheduled_links(),
+            config["headways"],
+            config["default_headway"],
+            config["service_start"],
+            config["service_end"],
+        )
+        _CSA_CONFIG = config
+        data_api.add_mutation_listener(_on_mutation)
+    return _CSA
+
+
+def _named(result) -> Optional[Tuple[int, List[Leg]]]:
+    if result is None:
+        return None
+    time, legs = result
+    records = data_api.get_station_records()
+    return time, [(records[u].name, records[v].name, dep, arr, line) for u, v, dep, arr, line in legs]
+
+
+def plan_earliest_arrival(a_name: str, b_name: str, depart: int) -> Optional[Tuple[int, List[Leg]]]:
+    """Return (arrival_minutes, legs) for the earliest arrival at B leaving A at `depart`, or None."""
+    a = data_api.get_station_id(a_name)
+    b = data_api.get_station_id(b_name)
+    if a is None or b is None:
+        return None
+    return _named(_connections().earliest_arrival(a, b, depart))
+
+
+def plan_latest_departure(a_name: str, b_name: str, arrive_by: int) -> Optional[Tuple[int, List[Leg]]]:
+    """Return (departure_minutes, legs) for the latest departure from A that reaches B by `arrive_by`, or None."""
+    a = data_api.get_station_id(a_name)
+    b = data_api.get_station_id(b_name)
+    if a is None or b is None:
+        return None
+    return _named(_connections().latest_departure(a, b, arrive_by))
+
+
+def earliest_arrival_times(name: str, depart: int) -> Dict[str, int]:
+    """Return {station name: earliest arrival} for every station reachable leaving `name` at `depart`."""
+    a = data_api.get_station_id(name)
+    if a is None:
+        return {}
+    arrivals = _connections().earliest_arrivals_from(a, depart)
+    records = data_api.get_station_records()
+    return {records[s].name: t for s, t in enumerate(arrivals) if t != float("inf")}
+
+
+__all__ = [
+    "plan_earliest_arrival",
+    "plan_latest_departure",
+    "earliest_arrival_times",
+]
@@ -0,0 +1,87 @@
+"""
+Minimum spanning network of the active stations, kept up to date incrementally.
+
+Edge weights are travel times in minutes. The forest is a
+clrsPython.Chapter21.dynamic_mst.DynamicMST that listens to utils.data_api
+mutations, so create_edge and station closures/reopenings repair the tree
+locally instead of recomputing it with Prim's algorithm.
+
+Public functions:
+    init_network_mst(force: bool = False) -> None
+    get_network_mst_edges() -> list[tuple[str, str, int]]
+    get_network_mst_weight() -> int
+"""
+
+from __future__ import annotations
+from typing import List
+
+from clrsPython.Chapter21.dynamic_mst import DynamicMST
+from utils import data_api
+
+_MST: DynamicMST | None = None
+
+
+def _build() -> DynamicMST:
+    records = data_api.get_station_records()
+    edges = [
+        (rec.id, v, t)
+        for rec in records if rec.active
+        for v, (t, _line) in rec.neighbors.items()
+        if rec.id < v and records[v].active
+    ]
+    return DynamicMST.from_edges(len(records), edges)
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Apply a data_api mutation to the spanning forest."""
+    global _MST
+    if _MST is None:
+        return
+    records = data_api.get_station_records()
+    if event == "reset":
+        _MST = _build()
+    elif event == "insert":
+        while _MST.get_card_V() < len(records):
+            _MST.add_vertex()
+    elif event == "edge":
+        a, b = args
+        if a != b and records[a].active and records[b].active:
+            _MST.insert_edge(a, b, records[a].neighbors[b][0])
+    elif event == "deactivate":
+        _MST.delete_vertex_edges(args[0])
+    elif event == "activate":
+        s = args[0]
+        for v, (t, _line) in records[s].neighbors.items():
+            if v != s and records[v].active:
+                _MST.insert_edge(s, v, t)
+
+
+def init_network_mst(force: bool = False) -> None:
+    """Build the spanning forest once and subscribe it to data_api mutations."""
+    global _MST
+    if _MST is not None and not force:
+        return
+    _MST = _build()
+    data_api.add_mutation_listener(_on_mutation)
+
+
+def get_network_mst_edges() -> List[tuple[str, str, int]]:
+    """Return the spanning forest as (station name, station name, minutes) triples."""
+    if _MST is None:
+        init_network_mst()
+    records = data_api.get_station_records()
+    return [(records[u].name, records[v].name, w) for u, v, w in _MST.tree_edges()]
+
+
+def get_network_mst_weight() -> int:
+    """Return the total travel time of the spanning forest."""
+    if _MST is None:
+        init_network_mst()
+    return _MST.get_total_weight()
+
+
+__all__ = [
+    "init_network_mst",
+    "get_network_mst_edges",
+    "get_network_mst_weight",
+]
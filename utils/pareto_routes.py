@@ -0,0 +1,131 @@
+"""
+Pareto-optimal route options between two stations.
+
+Instead of one "best" route, returns every route that no other route beats on
+all of: travel minutes, interchanges and walking minutes. Links and their line
+names come from StationRecord.neighbors (neighbors[v] = (minutes, line));
+walking links between stations are optional configuration. The search is the
+multi-criteria label-setting algorithm in clrsPython.Chapter22.pareto_paths,
+with a bound on the labels kept per station. The counters from the last search
+are kept for monitoring label growth on long journeys.
+
+The router is dropped on any utils.data_api mutation and rebuilt on the next
+query with the same configuration.
+
+Public functions:
+    init_pareto_routes(footpaths=None, interchange_minutes=3,
+                       max_labels_per_station=64, force=False) -> None
+    pareto_routes(a_name: str, b_name: str) -> list[dict]
+    last_search_stats() -> dict
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+
+from clrsPython.Chapter22.pareto_paths import ParetoRouter
+from utils import data_api
+
+_CONFIG: Dict[str, object] = {
+    "footpaths": [],
+    "interchange_minutes": 3,
+    "max_labels_per_station": 64,
+}
+_ROUTER: ParetoRouter | None = None
+_LAST_STATS: Dict[str, int] = {}
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any network edit invalidates the router; rebuild lazily."""
+    global _ROUTER
+    _ROUTER = None
+
+
+def init_pareto_routes(
+    footpaths: Sequence[Tuple[str, str, int]] | None = None,
+    interchange_minutes: int = 3,
+    max_labels_per_station: int = 64,
+    force: bool = False,
+) -> None:
+    """
+    Set the routing configuration and build the router.
+
+    footpaths lists walking links (a_name, b_name, minutes), usable both ways.
+    interchange_minutes is added to the travel time of every change of line.
+    """
+    global _ROUTER
+    config = {
+        "footpaths": list(footpaths or []),
+        "interchange_minutes": interchange_minutes,
+        "max_labels_per_station": max_labels_per_station,
+    }
+    if _ROUTER is not None and config == _CONFIG and not force:
+        return
+    _CONFIG.update(config)
+    _ROUTER = None
+    _router()
+
+
+def _router() -> ParetoRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        records = data_api.get_station_records()
+        links = [
+            (rec.id, v, t, line)
+            for rec in records if rec.active
+            for v, (t, line) in rec.neighbors.items()
+            if v != rec.id and records[v].active
+        ]
+        footpaths = []
+        for a_name, b_name, minutes in _CONFIG["footpaths"]:
+            a = data_api.get_station_id(a_name)
+            b = data_api.get_station_id(b_name)
+            if a is not None and b is not None and a != b:
+                footpaths += [(a, b, int(minutes)), (b, a, int(minutes))]
+        _ROUTER = ParetoRouter(
+            len(records),
+            links,
+            footpaths,
+            _CONFIG["interchange_minutes"],
+            _CONFIG["max_labels_per_station"],
+        )
+        data_api.add_mutation_listener(_on_mutation)
+    return _ROUTER
+
+
+def pareto_routes(a_name: str, b_name: str) -> List[Dict[str, object]]:
+    """
+    Return the non-dominated route options from A to B, fastest first.
+
+    Each option is {"minutes", "interchanges", "walking_minutes", "legs"}, where
+    legs is a list of (from_name, to_name, line, minutes) and line is None for a walk.
+    Returns [] if either station is unknown/closed or B is unreachable.
+    """
+    global _LAST_STATS
+    a = data_api.get_station_id(a_name)
+    b = data_api.get_station_id(b_name)
+    if a is None or b is None:
+        return []
+    routes, stats = _router().search(a, b)
+    _LAST_STATS = stats.as_dict()
+    records = data_api.get_station_records()
+    return [
+        {
+            "minutes": minutes,
+            "interchanges": interchanges,
+            "walking_minutes": walking,
+            "legs": [(records[u].name, records[v].name, line, t) for u, v, line, t in legs],
+        }
+        for minutes, interchanges, walking, legs in routes
+    ]
+
+
+def last_search_stats() -> Dict[str, int]:
+    """Return the label counters of the most recent pareto_routes search (see LabelStats)."""
+    return dict(_LAST_STATS)
+
+
+__all__ = [
+    "init_pareto_routes",
+    "pareto_routes",
+    "last_search_stats",
+]
@@ -0,0 +1,146 @@
+"""
+Timetable-aware earliest-arrival queries over the active station network.
+
+Run times come from StationRecord.neighbors ((time_minutes, line) per link);
+per-line headways are configuration passed to init_timetable. The timetable is
+expanded into departure/arrival event nodes
+(clrsPython.Chapter22.time_expanded_network), numbered in topological order,
+so each query is one linear DAG shortest-paths pass with no heap. The network
+is dropped on any utils.data_api mutation and rebuilt on the next query with
+the same configuration.
+
+Times are minutes after midnight.
+
+Public functions:
+    init_timetable(headways=None, default_headway=5, service_start=300,
+                   service_end=1440, force=False) -> None
+    get_timetable_config() -> dict
+    get_timetable_links() -> list[tuple[int, int, int, str | None]]
+    get_scheduled_links() -> list[tuple[int, int, int, str | None]]
+    earliest_arrival(a_name: str, b_name: str, depart: int) -> tuple[int, list] | None
+    earliest_arrivals_from(name: str, depart: int) -> dict[str, int]
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+from clrsPython.Chapter22.time_expanded_network import TimeExpandedNetwork
+from utils import data_api
+
+_CONFIG: Dict[str, object] = {
+    "headways": {},
+    "default_headway": 5,
+    "service_start": 300,
+    "service_end": 1440,
+}
+_NETWORK: TimeExpandedNetwork | None = None
+
+Leg = Tuple[str, str, int, int, Optional[str]]
+
+
+def _on_mutation(event: str, *args) -> None:
+    """Any network edit invalidates the expanded timetable; rebuild lazily."""
+    global _NETWORK
+    _NETWORK = None
+
+
+def get_timetable_links() -> List[Tuple[int, int, int, Optional[str]]]:
+    """Return every directed link between active stations as (a_id, b_id, time_minutes, line)."""
+    records = data_api.get_station_records()
+    return [
+        (rec.id, v, t, line)
+        for rec in records if rec.active
+        for v, (t, line) in rec.neighbors.items()
+        if v != rec.id and records[v].active
+    ]
+
+
+def get_timetable_config() -> Dict[str, object]:
+    """Return a copy of the current timetable configuration (keys match init_timetable's arguments)."""
+    return {**_CONFIG, "headways": dict(_CONFIG["headways"])}
+
+
+def get_scheduled_links() -> List[Tuple[int, int, int, Optional[str]]]:
+    """Return get_timetable_links() with run times of at least one minute, so every ride moves forward in time."""
+    return [(a, b, max(1, t), line) for a, b, t, line in get_timetable_links()]
+
+
+def init_timetable(
+    headways: Dict[str, int] | None = None,
+    default_headway: int = 5,
+    service_start: int = 300,
+    service_end: int = 1440,
+    force: bool = False,
+) -> None:
+    """
+    Set the timetable configuration and build the time-expanded network.
+
+    headways maps a line name to the minutes between its departures; lines not
+    listed (including links with no line) use default_headway. Departures run
+    from service_start to service_end on every link.
+    """
+    global _NETWORK
+    config = {
+        "headways": dict(headways or {}),
+        "default_headway": default_headway,
+        "service_start": service_start,
+        "service_end": service_end,
+    }
+    if _NETWORK is not None and config == _CONFIG and not force:
+        return
+    _CONFIG.update(config)
+    _NETWORK = None
+    _network()
+
+
+def _network() -> TimeExpandedNetwork:
+    global _NETWORK
+    if _NETWORK is None:
+        _NETWORK = TimeExpandedNetwork(
+            len(data_api.get_station_records()),
+            get_scheduled_links(),
+            _CONFIG["headways"],
+            _CONFIG["default_headway"],
+            _CONFIG["service_start"],
+            _CONFIG["service_end"],
+        )
+        data_api.add_mutation_listener(_on_mutation)
+    return _NETWORK
+
+
+def earliest_arrival(a_name: str, b_name: str, depart: int) -> Optional[Tuple[int, List[Leg]]]:
+    """
+    Return (arrival_minutes, legs) for the earliest arrival at B leaving A at `depart`,
+    or None if B cannot be reached before service ends. Each leg is
+    (from_name, to_name, departure, arrival, line) for one ride on one train.
+    """
+    a = data_api.get_station_id(a_name)
+    b = data_api.get_station_id(b_name)
+    if a is None or b is None:
+        return None
+    result = _network().earliest_arrival(a, b, depart)
+    if result is None:
+        return None
+    arrival, legs = result
+    records = data_api.get_station_records()
+    return arrival, [(records[u].name, records[v].name, dep, arr, line) for u, v, dep, arr, line in legs]
+
+
+def earliest_arrivals_from(name: str, depart: int) -> Dict[str, int]:
+    """Return {station name: earliest arrival} for every station reachable leaving `name` at `depart`."""
+    a = data_api.get_station_id(name)
+    if a is None:
+        return {}
+    arrivals = _network().earliest_arrivals_from(a, depart)
+    records = data_api.get_station_records()
+    return {records[s].name: t for s, t in enumerate(arrivals) if t != float("inf")}
+
+
+__all__ = [
+    "init_timetable",
+    "get_timetable_config",
+    "get_timetable_links",
+    "get_scheduled_links",
+    "earliest_arrival",
+    "earliest_arrivals_from",
+]